@@ -1,600 +1,3314 @@
-"""
-    -*- coding: utf-8 -*-
-    This script is written in python 3 for both Applle and Windows machines
-    written by Jonathan Gomez Martinez (December 2017)
-    modified  by Gabriel Wang (February 2018) 
-    modified by Jian Chen (Jan 2019)
-    modified by Roberto Franzosi (January 2019)
-    modified by Jack Hester (January 2019)
-
-    This procedure takes *.txt files and runs StanfordCoreNLP to produce ConLL files for each individual file.
-    It then creates a merged ConLL file including all of the ConLL tables in a single ConLL file
-
-    arguments:
-        Stanford Core NLP Path: The first argment is the installlation path of stanford corenlp package
-        Corpus TXT files Path: The second argument should be the path to the *.txt files.
-        Filename/Output path
-            The third argument can be a specific file name in the Corpus TXT files Path or the OutputPath
-        OutputPath: The third argument should be the folder where the user would like his/her ConLL files saved
-        Memory: The fourth argument should be an integer value (1, 2, 3, 4, 5; try 4 first) specifying how much memory (RAM) a user is willing to give to CoreNLP
-            More memory can lead to quicker runtime on large *.txt files
-        mergeFiles: A boolean specifying whether or not to run the merge algorithm with 1 meaning yes and 0 meaning no
-        getDate: A boolean specifying whether or not to run the date grabbing algorithm with 1 meaning yes and 0 meaning no
-            Required parameter if running merge files algorithm
-        Separator: A specified separator in the file name that indicates the start of a date (e.g., The New York Times_12-21-1878; the separator is _)
-            Required parameter if running date grabbing algorithm
-        DateFieldLocation: The date start location (e.g., The New York Times_12-21-1878 the date DateFieldLocation is 2; the second field in the file with fields separated by _; 
-                The New York Times_Page 1_12-21-1878 the date start location is 3)
-            Required parameter if running date grabbing algorithm
-        DateFormat: The date format provided
-            Date formats: mm-dd-yyyy; m-d-yyyy; dd-mm-yyyy; yyyy-mm-dd; yyyy-dd-mm; yyyy-mm; yyyy;
-            Required parameter if running date grabbing algorithm
-    
-    TODO: Modify the all-files-in-dir mode & one-file mode, the current version is really bad practice
-    Useful debug tip: well, you may be in trouble if you are trying to debug the arguments
-    But just start with enumerating the sys.argv
-
-    Command prompt start
-    
-    cd "C:\\Program files (x86)\\PC-ACE\\NLP\\CoreNLP"
-
-    "" around paths are necessaryy when the path includes spaces
-
-    Python StanfordCoreNLP.py "C:\\Program files (x86)\\PC-ACE\\NLP\\stanford-corenlp-full-2018-02-27" "C:\\Users\rfranzo\\Documents\\ACCESS Databases\\PC-ACE\\NEW\\DATA\\CORPUS DATA\\Sample txt" "C:\\Users\rfranzo\\Desktop\\NLP_output" 4 1 1 _ 1 3
-
-"""
-
-from pycorenlp import StanfordCoreNLP
-import os
-import glob
-import time
-import datetime
-import pandas as pd
-import subprocess
-import sys
-import numpy as np
-import io
-import re
-from collections import OrderedDict
-from unidecode import unidecode
-import socket
-from contextlib import closing
-import ntpath
-import random
-from tkinter import filedialog
-import tkinter.messagebox as mb
-import tkinter as tk
-from tkinter import DISABLED
-
-def check_socket(host, port):
-    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-        
-        """
-        if sock.connect_ex((host, port)) == 0:
-            print ("Port is open")
-        else:
-            print ("Port is not open")
-        """
-
-def get_open_port():
-    # function to find a open port on local host
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind(("",0))
-    s.listen(1)
-    port = s.getsockname()[1]
-    s.close()
-    return port
-
-
-def RunCoreNLP(stanford_core_nlp_path, input_path, output_path, assigned_memory, merge_file_flag,get_date_flag=0,sep='_',date_field_position=3,date_format='mm-dd-yyyy',file_name=''):
-    check_socket('localhost',9000)
-    port = get_open_port() #find a open port for corenlp
-    
-    stanford_core_nlp_path = os.path.join(stanford_core_nlp_path,'*')
-    
-    #TODO: modify this later
-    #should be input path, need to talk about this later
-    is_path = os.path.isdir(output_path)
-    
-
-    #Check that the input directory contains txt files; exit otherwise
-    if len(glob.glob(os.path.join(input_path,"*.txt")))==0:
-        print ("There are no txt files in the input directory " + str(Path) + ". Program will exit.")
-        sys.exit(0)
-
-    command = ['java','-mx'+str(assigned_memory)+'g','-cp', str(stanford_core_nlp_path),'edu.stanford.nlp.pipeline.StanfordCoreNLPServer', '-port', str(port),'timeout','999999']
-    #Launch CoreNLP server, allowing us to run *.txt files without re-initializing CoreNLP
-    with open(os.devnull, 'w') as fp:
-        server = subprocess.Popen(command, stdout=fp) #avoid printing the entire document
-        #server = subprocess.Popen(command)  #this will print the entire document
-    time.sleep(5)#wait for the subprocess to set up the server
-
-    try:
-        subprocess.check_call(command)
-    except subprocess.CalledProcessError:
-        print ("")
-        sys.exit(0)
-
-    nlp = StanfordCoreNLP('http://localhost:'+str(port))  #Attach the server to a variable for cleaner code
-    #nlp = StanfordCoreNLP('http://localhost:8080')  #Attach the server to a variable for cleaner code
-
-    if(is_path): #This is the all-files-in-dir mode
-        InputDocs=[]
-        for f in os.listdir(input_path):
-            if not f[:2] == '~$': # ignore the temporary files
-                if f[-4::]=='.txt':# check if it is a .txt file
-                    InputDocs.append(os.path.join(input_path,f))
-    else: # one-file mode
-        InputDocs = [os.path.join(input_path,file_name)]
-    
-    startTime = time.localtime()
-    print("")
-    print("Started running Stanford CoreNLP at " + str(startTime[3]) + ':' + str(startTime[4])) #Prints start time for future reference
-
-    #The loop below opens each *.txt file in the input directory and passes the text to our local CoreNLP server.
-    #   The server then returns our ConLL table in a tab separated format which is then saved as a *.ConLL file
-    #   Opened files are closed as soon as they are no longer necessary to free-up resources
-    i = 0.0
-    CorrectlyProcessedFileNames = []
-    for file in InputDocs:
-        server.poll()
-        F = io.open(file, 'r', encoding='utf-8',errors='ignore')
-        text = F.read()
-        text = text.encode('utf-8')
-        #print(text)
-        F.close()
-        # x: ntpath
-        #x = file[len(Path)::] # Only keep the file name with .txt
-        #print ("......",x, ntpath.dirname(file),ntpath.basename(file))
-        x = ntpath.basename(file)
-
-        #CorrectlyProcessedFileNames.append(x)
-        print("")
-        print("Parsing file: " + x)
-        print("")
-        #print(x.find('_'))
-        try:
-            udata = text.decode("utf-8")
-            text = udata.encode("ascii", "ignore")
-            #print (text)
-            output = nlp.annotate(text.decode('utf-8'), properties={        #Passes text and preferences (properties) to CoreNLP
-                'annotators': 'tokenize,ssplit,pos,lemma, ner,parse',
-                'outputFormat': 'conll',
-                'timeout': '999999',
-                'outputDirectory': output_path,
-                'replaceExtension': True
-            })
-           # print(output)
-            # Replace normalized paranthese back
-            output = str(output).replace("-LRB-","(").replace("-lrb-","(") .replace("-RRB-",")") .replace("-rrb-",")") .replace("-LCB-","{") .replace("-lcb-","{") .replace("-RCB-","}") .replace("-rcb-","}") .replace("-LSB-","[") .replace("-lsb-","[") .replace("-RSB-","]") .replace("-rsb-","]") 
-
-            print("Writing CoNLL table: " + x)
-            text_file = io.open(os.path.join(output_path,x) + ".conll", "w", encoding='utf-8')
-            text_file.write(output)             #Output *.ConLL file
-            text_file.close()
-            print(str(100 * round(float(i) / len(InputDocs), 2)) + "% Complete") #Rough progress bar for reference mid-run
-            CorrectlyProcessedFileNames.append(x)
-            i += 1
-        except Exception as e:
-            print("")
-            print("Could not create CoNLL table for " + "\""+x+"\""+'. Message returned by Stanford server: '+"\""+str(e)+"\"")
-            print("")
-            server.poll()
-    endTime = time.localtime()
-
-    server.kill() #Server is killed before entire procedure is completed since we no longer need it
-    print("")
-    print("Finished running Stanford CoreNLP at " + str(endTime[3]) + ':' + str(endTime[4]))    #Time when ConLL tables finished computing, for future reference
-
-    if (len(CorrectlyProcessedFileNames) ==0):
-        print(str(len(InputDocs)) + " input documents were processed. No CoNLL table was produced! Program will exit.")
-        sys.exit(0)
-
-    #Here we merge all of the previously computed ConLL tables into a single merged ConLL table
-    ConLL = glob.glob(os.path.join(output_path,"*.conll"))   #Produce a list of ConLL tables in the output directory
-
-    #The loop below opens each *.ConLL file in the ouput directory, checks that the name corresponds to the processed txt filename (excluuding all other CoNLL tables)
-    #   and pulls the contents into memory, creating a running table of concatenated tables. Opened files are closed after being pulled into memory 
-    #   to preserve resources
-
-    if merge_file_flag == 1:
-        startTime = time.localtime()
-        print ("")
-        print("Started merging at " + str(startTime[3]) + ':' + str(startTime[4]))  #Time when merge started, for future reference
-        merge = None    #Initialize an empty variable to assure the  new merged table is in fact new
-        MergedDocNum = 1 #the N input documents in the merged CoNLL table are numbered 1 through N
-        for table in ConLL:
-            lineNum = 1
-            x = ntpath.basename(table)[:-6] #get the table name without .CoNLL so that the name can be compared with input document name
-
-            if x in CorrectlyProcessedFileNames:
-                print("")
-                print("Merging table: " + x)    #Prints the name of the table being worked on
-                print("")
-                if get_date_flag == 1:
-                    startSearch = 0
-                    iteration = 0
-                    while iteration < date_field_position-1:
-                        startSearch = x.find(sep, startSearch + 1) 
-                        iteration += 1
-                    altSeparator=".txt"
-                    end = x.find(sep, startSearch + 1)
-                    if end == -1:
-                        end = x.find(altSeparator, startSearch + 1)
-
-                    raw_date = x[startSearch+1:end]
-
-                    #https://docs.python.org/2/library/datetime.html#strftime-strptime-behavior
-                    #the strptime command (strptime(date_string, format) takes date_string and formats it according to format where format has the following values:
-                    # %m 09 %-m 9 (does not work on all platforms); %d 07 %-d 7 (does not work on all platforms);
-                    #loop through INPUT date formats and change format to Python style
-                    print('DATEFORMAT',date_format)
-                    
-                    try:
-                        if date_format == 'mm-dd-yyyy':
-                            print('!')
-                            date = datetime.datetime.strptime(raw_date, '%m-%d-%Y')
-                            dateStr = date.strftime('%m-%d-%Y')
-                        elif date_format == 'm-d-yyyy':
-                            date = datetime.datetime.strptime(raw_date, '%m-%d-%Y')
-                            dateStr = date.strftime('%m-%d-%Y')
-                        elif date_format == 'dd-mm-yyyy':
-                            date = datetime.datetime.strptime(raw_date, '%d-%m-%Y')
-                            dateStr = date.strftime('%d-%m-%Y')
-                        elif date_format == 'yyyy-mm-dd':
-                            date = datetime.datetime.strptime(raw_date, '%Y-%m-%d')
-                            dateStr = date.strftime('%Y-%m-%d')
-                        elif date_format == 'yyyy-dd-mm':
-                            date = datetime.datetime.strptime(raw_date, '%Y-%d-%m')
-                            dateStr = date.strftime('%Y-%d-%m')
-                        elif date_format == 'yyyy-mm':
-                            date = datetime.datetime.strptime(raw_date, '%Y-%m')
-                            dateStr = date.strftime('%Y-%m')
-                        elif date_format == 'yyyy':
-                            date = datetime.datetime.strptime(raw_date, '%Y')
-                            dateStr = date.strftime('%Y')
-                    except ValueError:
-                        print('Error: You might have provided the incorrect date format or the date (' + raw_date + ') in the filename is wrong. Please check!')
-                        pass
-
-                    if x == 'mergedConllTables': #Assures that the merged ConLL table is not merged into our new merged ConLL table (in the case of re-running script)
-                        continue
-                    if merge is None:
-                        hold = pd.DataFrame.from_csv(io.open(table, 'rb'), sep='\t', header=None, index_col=False)
-                        holdDocNum = pd.DataFrame(OrderedDict( (('MergedDocNum', np.ones(hold.shape[0]) * MergedDocNum) , ('name', x), ('date', date))) )
-                        hold = hold.merge(holdDocNum, left_index=True, right_index=True, how='inner')
-                        merge = hold
-                    else:
-                        hold = pd.DataFrame.from_csv(io.open(table, 'rb'), sep='\t', header=None, index_col=False)
-                        holdDocNum = pd.DataFrame(OrderedDict( (('MergedDocNum', np.ones(hold.shape[0]) * MergedDocNum) , ('name', x), ('date', date))) )
-                        hold = hold.merge(holdDocNum, left_index=True, right_index=True, how='inner')
-                        merge = pd.concat([merge, hold], axis=0, ignore_index=True)
-                    MergedDocNum += 1
-                if get_date_flag == 0:
-                    if x == 'mergedConllTables': #Assures that the merged ConLL table is not merged into our new merged ConLL table (in the case of re-running script)
-                        continue
-                    if merge is None:
-                        hold = pd.DataFrame.from_csv(io.open(table, 'rb'), sep='\t', header=None, index_col=False)
-                        holdDocNum = pd.DataFrame(OrderedDict((('DocNum', np.ones(hold.shape[0]) * MergedDocNum), ('name', x))))
-                        hold = hold.merge(holdDocNum, left_index=True, right_index=True, how='inner')
-                        merge = hold
-                    else:
-                        hold = pd.DataFrame.from_csv(io.open(table, 'rb'), sep='\t', header=None, index_col=False)
-                        holdDocNum = pd.DataFrame(
-                            OrderedDict((('DocNum', np.ones(hold.shape[0]) * MergedDocNum), ('name', x))))
-                        hold = hold.merge(holdDocNum, left_index=True, right_index=True, how='inner')
-                        merge = pd.concat([merge, hold], axis=0, ignore_index=True)
-                    MergedDocNum += 1
-
-        MergedDocNum -= 1 
-        if MergedDocNum == 0: #no tables were merged
-            if (len(ConLL) !=0): #there are CoNLL tables in the output directory
-                print("Although there are " + str(len(ConLL)) + " CoNLL tables in your output directory, nore are CoNLL tables for the input txt documents. No merged table produced.")
-                sys.exit(0)
-            else:
-                print ("No CoNLL tables produced for the input txt documents. No merged table produced.")
-                sys.exit(0)
-
-        counter = np.arange(1,merge.shape[0]+1)
-        merge.insert(7, 'RecordNum', counter)
-        sentenceID = 0
-        docID = 1
-        sentIDs = []
-        for i in range(merge.shape[0]):
-            if int(merge.iloc[i][8]) > docID:
-               docID = docID + 1
-               sentenceID = 0
-            if(str(merge.iloc[i][0]) == '1'):
-                sentenceID += 1
-            sentIDs.append(sentenceID)
-        merge.insert(9, 'SentenceID', sentIDs)
-        merge.to_csv(os.path.join(output_path,"mergedConllTables.conll"), sep='\t', index=False, header=False)    #Outputs merged ConLL table as a *.ConLL file into our output directory
-        endTime = time.localtime()
-        print("")
-        print("Finished merging CoNLL tables at " + str(endTime[3]) + ':' + str(endTime[4]))     #Time when merge finished, for future reference
-        
-        return
-    
-#%%
-text_label = """For information about this program, hit \"Read Me\"\nTo run the program, select the Stanford CoreNLP and corpus txt files paths and hit buttons below.\nTo exit the program, hit \"Quit\""""
-
-introduction_main = """reserved for introduction"""
-
-#%%
-"""
-########################
-            GUI
-#######################
-"""
-queries_x_cord = 120
-
-
-label_x_cord = 342
-label_x_cord_wn = 375
-
-help_button_x_cord = 50
-labels_x_cord = 150
-entry_box_x_cord = 350
-basic_y_cord = 90
-y_step = 40
-
-def exit_window():
-    global window
-    window.destroy()
-    exit()
-    
-def empty():
-    print('empty function for debug')
-    return 
-
-"""
-msgboxes
-"""
-def main_msgbox():
-    mb.showinfo(title='Introduction', message=introduction_main)
-    
-def helper_buttons(canvas,x_cord,y_cord,text_title,text_msg):
-    
-    def msg_box():
-        mb.showinfo(title=text_title, message=text_msg)
-    tk.Button(canvas, text='? HELP', command=msg_box).place(x=x_cord,y=y_cord)
-
-"""
-button-associated functions
-"""
-def select_output_dir():
-    global output_file_path
-    
-    file_path = filedialog.askdirectory(initialdir = os.getcwd())
-    output_file_path.set(file_path)
-    print(file_path)
-    return file_path
-
-def select_stanford_corenlp_dir():
-    global stanford_core_NLP_path
-    
-    file_path = filedialog.askdirectory(initialdir = os.getcwd())
-    stanford_core_NLP_path.set(file_path)
-    print(file_path)
-    return file_path
-
-def select_input_path():
-    global input_file_path
-    file_path = filedialog.askdirectory(initialdir = os.getcwd())
-    input_file_path.set(file_path)
-    print(file_path)
-    return file_path
-
-def memory_dropdown():
-    print(assigned_memory.get())
-
-def test_input_and_run_query():
-    
-    CoreNLPPath = stanford_core_NLP_path.get()
-    
-    Path = input_file_path.get()
-    
-    Output = output_file_path.get()
-    
-    mem = memory_var.get()
-    
-    mergeFiles = merge_file_or_not.get()
-    
-    getDate = find_date_or_not.get()
-    
-    separator = separator_var.get()
-    
-    DateFieldLocation = date_loc_var.get()
-    
-    DateFormat = date_format.get()
-    
-    print(CoreNLPPath, Path, Output,mem,mergeFiles,getDate,separator,DateFieldLocation,DateFormat)
-    
-    RunCoreNLP(CoreNLPPath, Path, Output,mem,mergeFiles,getDate,separator,DateFieldLocation,DateFormat)
-    return
-
-window = tk.Tk()
-window.title('Noun and Verb Analysis')
-window.geometry('1000x600')
-
-"""
-variables
-"""
-global stanford_core_NLP_path, input_file_path,output_file_path,memory_var,separator_var,date_loc_var,date_format,find_date_or_not,merge_file_or_not
-
-stanford_core_NLP_path = tk.StringVar()
-stanford_core_NLP_path.set('')
-
-input_file_path = tk.StringVar()
-input_file_path.set('')
-
-output_file_path = tk.StringVar()
-output_file_path.set('')
-
-memory_var = tk.IntVar()
-memory_var.set(4)
-
-separator_var = tk.StringVar()
-separator_var.set('_')
-
-date_loc_var = tk.IntVar()
-date_loc_var.set(3)
-
-date_format = tk.StringVar()
-date_format.set('mm-dd-yyyy')
-
-
-
-
-# Create a Tkinter variable
-
-
-
-#For more information about a specific button, hit the \"? HELP\" button next to it.
-
-intro = tk.Label(window, 
-                 anchor = 'w',
-                 text=text_label)
-intro.pack()
-
-
-quit_button = tk.Button(window, text='QUIT', width=20,height=2, command=exit_window)
-quit_button.place(x=550,y=500)
-
-execute_button = tk.Button(window, text='Execute StanfordCoreNLP', width=20,height=2, command=test_input_and_run_query)
-execute_button.place(x=350,y=500)
-
-intro_button = tk.Button(window, text='Read Me',command=main_msgbox,width=20,height=2)
-intro_button.place(x=150,y=500)
-
-
-select_input_dir_button=tk.Button(window, width = 22,text='select CoreNLP file directory', command=select_stanford_corenlp_dir)
-select_input_dir_button.place(x=queries_x_cord,y=basic_y_cord)
-tk.Label(window, textvariable=stanford_core_NLP_path).place(x=label_x_cord, y= basic_y_cord)
-
-select_input_dir_button=tk.Button(window, width = 22,text='select INPUT file directory', command=select_input_path)
-select_input_dir_button.place(x=queries_x_cord,y=basic_y_cord+y_step)
-tk.Label(window, textvariable=input_file_path).place(x=label_x_cord, y= basic_y_cord+y_step)
-
-select_save_file_button=tk.Button(window, width = 22,text='select OUTPUT file directory', command=select_output_dir)
-select_save_file_button.place(x=queries_x_cord,y=basic_y_cord+y_step*2)
-tk.Label(window, textvariable=output_file_path).place(x=label_x_cord, y= basic_y_cord+y_step*2)
-
-"""
-check box
-"""
-def print_checkboxes():
-    if merge_file_or_not.get() == 1:
-        merge_file_checkbox_msg.config(text="A merged CoNLL table will be produced")
-    elif merge_file_or_not.get() == 0:
-        merge_file_checkbox_msg.config(text="No merged CoNLL table will be produced")
-
-    if find_date_or_not.get() == 1:
-        find_date_checkbox_msg.config(text="Date Option On.")
-        date_format_menu.configure(state="normal")
-        entry_sep.configure(state="normal")
-        loc_menu.configure(state='normal')
-    elif find_date_or_not.get() == 0:
-        find_date_checkbox_msg.config(text="Date Option Off.")
-        date_format_menu.configure(state="disabled")
-        entry_sep.configure(state="disabled")
-        loc_menu.configure(state="disabled")
-        #w.config(state=DISABLED)
-        
-    
-
-merge_file_checkbox_msg = tk.Label(window, text='A merged CoNLL table will be produced.')
-merge_file_checkbox_msg.place(x=label_x_cord_wn,y=basic_y_cord+y_step*3)
-merge_file_or_not = tk.IntVar()
-merge_file_or_not.set(1)
-merge_file_checkbox = tk.Checkbutton(window, text='Merge CoNLL tables?', variable=merge_file_or_not, onvalue=1, offvalue=0,
-                    command=print_checkboxes)
-merge_file_checkbox.place(x=queries_x_cord,y=basic_y_cord+y_step*3)
-merge_file_checkbox_msg.place(x=label_x_cord,y=basic_y_cord+y_step*3)
-
-find_date_checkbox_msg = tk.Label(window, text='Date Option Off.')
-find_date_checkbox_msg.place(x=label_x_cord_wn,y=basic_y_cord+y_step*5)
-find_date_or_not = tk.IntVar()
-find_date_or_not.set(0)
-find_date_checkbox = tk.Checkbutton(window, text='Find Date?', variable=find_date_or_not, onvalue=1, offvalue=0,
-                    command=print_checkboxes)
-find_date_checkbox.place(x=queries_x_cord,y=basic_y_cord+y_step*5)
-find_date_checkbox_msg.place(x=label_x_cord,y=basic_y_cord+y_step*5)
-
-date_format_lb = tk.Label(window,text='Date Format: ')
-date_format_lb.place(x=queries_x_cord,y=basic_y_cord+y_step*6)
-date_format_menu = tk.OptionMenu(window, date_format, 'mm-dd-yyyy', 'm-d-yyyy', 'dd-mm-yyyy','yyyy-mm-dd','yyyy-dd-mm','yyyy-mm','yyyy')
-date_format_menu.configure(width=10)
-date_format_menu.place(x=label_x_cord, y = basic_y_cord+y_step*6)
-if find_date_or_not.get() == 0:
-    date_format_menu.configure(state='disabled')    
-
-mem_menu_lb = tk.Label(window, text='Memory Option: ')
-mem_menu_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*4)
-mem_menu = tk.OptionMenu(window,memory_var,1,2,3,4)
-mem_menu.configure(width=10)
-mem_menu.place(x=label_x_cord,y=basic_y_cord+y_step*4)
-
-entry_sep_lb = tk.Label(window, text='Date Separator: ')
-entry_sep_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*7)
-entry_sep = tk.Entry(window, textvariable=separator_var)
-entry_sep.place(x=label_x_cord,y=basic_y_cord+y_step*7)
-if find_date_or_not.get() == 0:
-    entry_sep.configure(state='disabled') 
-    
-loc_menu_lb = tk.Label(window, text='Date Position: ')
-loc_menu_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*8)
-loc_menu = tk.OptionMenu(window,date_loc_var,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30)
-loc_menu.configure(width=10)
-loc_menu.place(x=label_x_cord,y=basic_y_cord+y_step*8)
-if find_date_or_not.get() == 0:
-    loc_menu.configure(state='disabled') 
-
-
-
-"""
-MAJOR BUTTONS
-"""
-try:
-    
-    CoreNLPPath = sys.argv[1]
-    Path = sys.argv[2]
-    # if the third argument is a path, then it is output path
-    # else it is the specific input file
-    is_path = os.path.isdir(sys.argv[3]) 
-
-    if is_path:
-        outputPath = sys.argv[3]
-        mem = sys.argv[4]
-        mergeFiles = sys.argv[5]
-        mergeFiles = int(mergeFiles)
-        if mergeFiles == 1:
-            getDate = sys.argv[6]
-            getDate = int(getDate)
-            if getDate == 1:
-                separator = sys.argv[7]
-                DateFieldLocation = sys.argv[8]
-                DateFieldLocation = int(DateFieldLocation)
-                DateFormat = str(sys.argv[9])
-        RunCoreNLP(CoreNLPPath, Path, Output,mem,mergeFiles,getDate,separator,DateFieldLocation,DateFormat)
-    else:
-        filename = sys.argv[3]
-        outputPath = sys.argv[4]
-        mem = sys.argv[5]
-        mergeFiles = sys.argv[6]
-        mergeFiles = int(mergeFiles)
-        if mergeFiles == 1:
-            getDate = sys.argv[7]
-            getDate = int(getDate)
-            if getDate == 1:
-                separator = sys.argv[8]
-                DateFieldLocation = sys.argv[9]
-                DateFieldLocation = int(DateFieldLocation)
-                DateFormat = str(sys.argv[10])
-    RunCoreNLP(CoreNLPPath, Path, Output,mem,mergeFiles,getDate,separator,DateFieldLocation,DateFormat,filename)
-    
-except Exception as e:
-    print ("\nCommand line arguments are empty, incorrect, or out of order, ERROR: "+e.__doc__)
-    print ("\nGraphical User Interface will be activated")   
-    window.mainloop()
-        
\ No newline at end of file
+"""
+    -*- coding: utf-8 -*-
+    This script is written in python 3 for both Applle and Windows machines
+    written by Jonathan Gomez Martinez (December 2017)
+    modified  by Gabriel Wang (February 2018) 
+    modified by Jian Chen (Jan 2019)
+    modified by Roberto Franzosi (January 2019)
+    modified by Jack Hester (January 2019)
+
+    This procedure takes *.txt files and runs StanfordCoreNLP to produce ConLL files for each individual file.
+    It then creates a merged ConLL file including all of the ConLL tables in a single ConLL file
+
+    arguments:
+        Stanford Core NLP Path: The first argment is the installlation path of stanford corenlp package
+        Corpus TXT files Path: The second argument should be the path to the *.txt files.
+        Filename/Output path
+            The third argument can be a specific file name in the Corpus TXT files Path or the OutputPath
+        OutputPath: The third argument should be the folder where the user would like his/her ConLL files saved
+        Memory: The fourth argument should be an integer value (1, 2, 3, 4, 5; try 4 first) specifying how much memory (RAM) a user is willing to give to CoreNLP
+            More memory can lead to quicker runtime on large *.txt files
+        mergeFiles: A boolean specifying whether or not to run the merge algorithm with 1 meaning yes and 0 meaning no
+        getDate: A boolean specifying whether or not to run the date grabbing algorithm with 1 meaning yes and 0 meaning no
+            Required parameter if running merge files algorithm
+        Separator: A specified separator in the file name that indicates the start of a date (e.g., The New York Times_12-21-1878; the separator is _)
+            Required parameter if running date grabbing algorithm
+        DateFieldLocation: The date start location (e.g., The New York Times_12-21-1878 the date DateFieldLocation is 2; the second field in the file with fields separated by _; 
+                The New York Times_Page 1_12-21-1878 the date start location is 3)
+            Required parameter if running date grabbing algorithm
+        DateFormat: The date format provided
+            Date formats: mm-dd-yyyy; m-d-yyyy; dd-mm-yyyy; yyyy-mm-dd; yyyy-dd-mm; yyyy-mm; yyyy;
+                dd-month-yyyy; month-dd-yyyy; yyyy-month-dd; month-yyyy (month names, e.g., March or Mar); iso (e.g., 2019-01-31T14:05:00Z);
+            Required parameter if running date grabbing algorithm
+    
+        Memory can also be auto (heap chosen from the corpus and the memory available)
+    options (after the arguments; python StanfordCoreNLP_GUI.py --help lists them all):
+        --parallel-requests, --servers, --keep-server-alive, --server-url, --no-cache, --no-conll-files, --merge-format,
+        --unicode-policy, --chunk-size, --batch-bytes, --annotators, --output-format, --extra-columns, --no-recursive, --resume, --max-retries,
+        --incremental-merge, ...
+        --queue QUEUE_DIR: several hosts, each with its own CoreNLP server, annotate one corpus through a work queue in a shared directory
+    Without arguments (or with --gui) the graphical user interface opens; with arguments the run needs no display.
+    The script can also be imported (import StanfordCoreNLP_GUI) to call RunCoreNLP, which returns a summary of the run;
+        tkinter and pandas are only imported when needed
+
+    Command prompt start
+    
+    cd "C:\\Program files (x86)\\PC-ACE\\NLP\\CoreNLP"
+
+    "" around paths are necessaryy when the path includes spaces
+
+    Python StanfordCoreNLP.py "C:\\Program files (x86)\\PC-ACE\\NLP\\stanford-corenlp-full-2018-02-27" "C:\\Users\rfranzo\\Documents\\ACCESS Databases\\PC-ACE\\NEW\\DATA\\CORPUS DATA\\Sample txt" "C:\\Users\rfranzo\\Desktop\\NLP_output" 4 1 1 _ 1 3
+
+"""
+
+import requests
+import os
+import glob
+import time
+import datetime
+import subprocess
+import sys
+import io
+import re
+import csv
+from unidecode import unidecode
+import socket
+import signal
+import tempfile
+import hashlib
+import codecs
+import gzip
+import threading
+import queue
+from collections import deque
+from contextlib import closing, nullcontext
+import json
+import ntpath
+import random
+import zipfile
+import tarfile
+import shutil
+import atexit
+#pandas and numpy (for the merged table and the statistics) and tkinter (for the window) are imported when first needed,
+#   so that the command line and the functions of this file can be used without them, and without a display
+
+def check_socket(host, port):
+    # True when something accepts connections on host:port
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        sock.settimeout(1)
+        return sock.connect_ex((host, port)) == 0
+
+def get_open_port():
+    # function to find a open port on local host
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(("",0))
+    s.listen(1)
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+def get_http_session(parallel_requests, num_servers=1):
+    # one pooled session shared by all the worker threads, so that connections to the server(s) are kept alive
+    #   and reused instead of opening (and closing) a new connection for every document
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max(1, num_servers), pool_maxsize=max(1, parallel_requests))
+    session.mount('http://', adapter)
+    return session
+
+def annotate_text(session, server_url, text, properties, server_seconds=None, offset=0):
+    # POST the text to the CoreNLP server and return the annotated document as a CoNLL table;
+    #   the server reports errors (e.g., timeouts) as non-200 responses which are raised here so that they are not written out as CoNLL tables
+    #   server_seconds: a list to which the time until the response headers arrived is appended; the server only answers
+    #   once the document is annotated, so this is the annotation time on the server (plus the upload), the rest of the round-trip the download
+    #   With the json or protobuf output format (see OUTPUT_FORMATS), the document is converted to a CoNLL table here, with the extra
+    #   columns of properties['conllExtraColumns'] (see EXTRA_COLUMNS); offset is added to the character offsets (the start of a chunk)
+    server_properties = dict((k, v) for k, v in properties.items() if k != 'conllExtraColumns')
+    r = session.post(server_url, params={'properties': json.dumps(server_properties)}, data=text.encode('utf-8'))
+    if server_seconds is not None:
+        server_seconds.append(r.elapsed.total_seconds())
+    if r.status_code != 200:
+        r.encoding = 'utf-8'
+        raise Exception(r.text.strip() or 'HTTP error ' + str(r.status_code))
+    output_format = properties.get('outputFormat', 'conll')
+    if output_format == 'conll':
+        r.encoding = 'utf-8'
+        return r.text
+    extra_columns = [column for column in properties.get('conllExtraColumns', '').split(',') if column]
+    if output_format == 'json':
+        return json_to_conll(r.content, extra_columns, offset)
+    return protobuf_to_conll(r.content, extra_columns, offset)
+
+#The formats in which the server can return the annotations: conll (the CoNLL table itself), json or protobuf, converted to the same
+#   CoNLL table here (see json_to_conll and protobuf_to_conll). protobuf is the most compact answer and the cheapest for the server to write;
+#   json (not pretty-printed) is larger than conll. Both keep annotations that the CoNLL output leaves out, available as extra columns (see EXTRA_COLUMNS)
+OUTPUT_FORMATS = {'conll': {'outputFormat': 'conll'},
+                  'json': {'outputFormat': 'json', 'output.prettyPrint': 'false'},
+                  'protobuf': {'outputFormat': 'serialized', 'serializer': 'edu.stanford.nlp.pipeline.ProtobufAnnotationSerializer'}}
+
+#The extra columns of the CoNLL tables converted from json or protobuf, after the 7 columns of the CoNLL output (id, word, lemma, POS, NER, head, deprel),
+#   in this order: offsets, the character offsets of the token in the text sent to the server (after normalization, see read_text),
+#   end excluded; ner-spans, the named entity mention of the token in BIO form (e.g., B-PERSON, I-PERSON, O)
+EXTRA_COLUMNS = [('offsets', ['CharacterOffsetBegin', 'CharacterOffsetEnd']),
+                 ('ner-spans', ['NERSpan'])]
+
+def ner_span_tags(length, mentions):
+    # the BIO tags of the length tokens of a sentence, from its mentions: (first token, last token + 1, entity type), tokens from 0
+    tags = ['O'] * length
+    for begin, end, entity_type in mentions:
+        for k in range(begin, min(end, length)):
+            tags[k] = ('B-' if k == begin else 'I-') + entity_type
+    return tags
+
+def ner_runs(ner_tags):
+    # the mentions of a sentence without entity mentions: the runs of tokens with the same NER tag (other than O)
+    mentions = []
+    for k, tag in enumerate(ner_tags):
+        if tag in ('O', '_', None):
+            continue
+        if len(mentions) > 0 and mentions[-1][1] == k and mentions[-1][2] == tag:
+            mentions[-1][1] = k + 1
+        else:
+            mentions.append([k, k + 1, tag])
+    return mentions
+
+def conll_records(records, tokens, heads, extra_columns, offset, mentions):
+    # append the CoNLL records of a sentence to records; tokens: (word, lemma, POS, NER, begin, end) of each token,
+    #   heads: {token number: (head, deprel)}, tokens numbered from 1; mentions: see ner_span_tags (None to use ner_runs)
+    spans = None
+    if 'ner-spans' in extra_columns:
+        spans = ner_span_tags(len(tokens), mentions if mentions is not None else ner_runs([token[3] for token in tokens]))
+    for n, (word, lemma, pos, ner, begin, end) in enumerate(tokens):
+        head, deprel = heads.get(n + 1, ('_', '_'))
+        fields = [str(n + 1), word, lemma or '_', pos or '_', ner or '_', str(head), deprel]
+        for column in extra_columns:
+            if column == 'offsets':
+                fields += [str(begin + offset), str(end + offset)]
+            elif column == 'ner-spans':
+                fields.append(spans[n])
+        records.append('\t'.join(fields))
+    records.append('')
+
+def json_to_conll(data, extra_columns=(), offset=0):
+    # the CoNLL table (as written by the server with outputFormat conll) of a document returned by the server as json,
+    #   with the extra_columns (see EXTRA_COLUMNS); heads and deprels from the basic dependencies, "_" for what was not annotated
+    document = json.loads(data)
+    records = []
+    for sentence in document.get('sentences', []):
+        heads = dict((dependency['dependent'], (dependency['governor'], dependency['dep'])) for dependency in sentence.get('basicDependencies', []))
+        tokens = [(token['word'], token.get('lemma'), token.get('pos'), token.get('ner'), token.get('characterOffsetBegin', 0), token.get('characterOffsetEnd', 0))
+                  for token in sentence['tokens']]
+        mentions = None
+        if 'entitymentions' in sentence:
+            mentions = [(mention['tokenBegin'], mention['tokenEnd'], mention['ner']) for mention in sentence['entitymentions']]
+        conll_records(records, tokens, heads, extra_columns, offset, mentions)
+    return '\n'.join(records) + '\n' if len(records) > 0 else ''
+
+def protobuf_to_conll(data, extra_columns=(), offset=0):
+    # as json_to_conll, for a document returned by the server as protobuf (outputFormat serialized); requires the stanza package
+    #   for the CoreNLP protobuf classes
+    try:
+        from stanza.protobuf import Document, parseFromDelimitedString
+    except ImportError:
+        raise Exception("The protobuf output of CoreNLP requires the stanza package (pip install stanza).")
+    document = Document()
+    parseFromDelimitedString(document, data)
+    records = []
+    for sentence in document.sentence:
+        heads = dict((edge.target, (edge.source, edge.dep)) for edge in sentence.basicDependencies.edge)
+        for root in sentence.basicDependencies.root:
+            heads[root] = (0, 'ROOT')
+        tokens = [(token.word, token.lemma if token.HasField('lemma') else None, token.pos if token.HasField('pos') else None,
+                   token.ner if token.HasField('ner') else None, token.beginChar, token.endChar) for token in sentence.token]
+        mentions = None
+        if len(sentence.mentions) > 0:
+            mentions = [(mention.tokenStartInSentenceInclusive, mention.tokenEndInSentenceExclusive, mention.entityType) for mention in sentence.mentions]
+        conll_records(records, tokens, heads, extra_columns, offset, mentions)
+    return '\n'.join(records) + '\n' if len(records) > 0 else ''
+
+#CoreNLP escapes brackets in words and lemmas (e.g., ( is -LRB- and its lemma -lrb-); the POS tags of brackets (-LRB-, -RRB-, ...) are left as they are
+BRACKETS = {'-LRB-': '(', '-lrb-': '(', '-RRB-': ')', '-rrb-': ')',
+            '-LCB-': '{', '-lcb-': '{', '-RCB-': '}', '-rcb-': '}',
+            '-LSB-': '[', '-lsb-': '[', '-RSB-': ']', '-rsb-': ']'}
+BRACKET_FIELD = re.compile(r'\t(-(?:[LR][RCS]B|[lr][rcs]b)-)(?=[\t\n]|$)')
+
+def restore_bracket(match):
+    # the escaped bracket matched by BRACKET_FIELD is restored only in the word (2nd) and lemma (3rd) columns of its line
+    output = match.string
+    start = match.start()
+    column = output.count('\t', output.rfind('\n', 0, start) + 1, start)
+    if column < 2:
+        return '\t' + BRACKETS[match.group(1)]
+    return match.group(0)
+
+def restore_brackets(output):
+    # a single pass over the CoNLL table, instead of one str.replace per escaped bracket
+    return BRACKET_FIELD.sub(restore_bracket, output)
+
+def normalize_text(text, unicode_policy='transliterate'):
+    # non-ASCII characters are kept ('unicode'), transliterated to ASCII with unidecode ('transliterate'; e.g., é becomes e, “ becomes ")
+    #   or dropped ('ascii')
+    if unicode_policy == 'unicode' or text.isascii():
+        return text
+    if unicode_policy == 'transliterate':
+        return unidecode(text)
+    return text.encode("ascii", "ignore").decode('ascii')
+
+#Input documents are *.txt files and *.txt members of zip and tar archives, read in place (archives are not unpacked).
+#   An archive member is known by the path of the archive joined with its name in the archive (e.g., corpus.zip/2019/article_1.txt);
+#   ARCHIVE_MEMBERS maps these paths to where the members are, DOCUMENT_NAMES every document to its name (see find_documents)
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_MEMBERS = {} # path -> (archive file, member name (zip) or offset of its data (tar), size, mtime)
+DOCUMENT_NAMES = {}
+DOCUMENT_SHA256 = {} # path -> (size, mtime, SHA-256) of the content last read (see read_text and file_sha256)
+open_archives = {} # archive file -> handle, kept open during a run (see read_document and close_archives)
+archives_lock = threading.Lock()
+
+def zip_documents(archive):
+    # the *.txt members of a zip archive
+    documents = []
+    with zipfile.ZipFile(archive) as z:
+        for info in z.infolist():
+            if info.is_dir() or not info.filename.endswith('.txt') or info.filename.startswith('__MACOSX/') or ntpath.basename(info.filename).startswith('~$'):
+                continue
+            path = os.path.join(archive, info.filename)
+            ARCHIVE_MEMBERS[path] = (archive, info.filename, info.file_size, time.mktime(info.date_time + (0, 0, -1)))
+            documents.append(path)
+    return documents
+
+def tar_documents(archive):
+    # the *.txt members of a tar archive; a compressed archive (gzip, bzip2 or xz) is first decompressed, in a single pass, to a temporary
+    #   tar file (removed at exit) so that its members can be read in any order, at the offset of their data
+    tar_file = archive
+    if not archive.endswith('.tar'):
+        import bz2
+        import lzma
+        with io.open(archive, 'rb') as f:
+            magic = f.read(6)
+        opener = gzip.open if magic[:2] == b'\x1f\x8b' else bz2.open if magic[:3] == b'BZh' else lzma.open if magic == b'\xfd7zXZ\x00' else io.open
+        decompressed = tempfile.NamedTemporaryFile(suffix='.tar', delete=False)
+        with opener(archive, 'rb') as f:
+            shutil.copyfileobj(f, decompressed, 1048576)
+        decompressed.close()
+        atexit.register(lambda: os.path.exists(decompressed.name) and os.remove(decompressed.name))
+        tar_file = decompressed.name
+    documents = []
+    with tarfile.open(tar_file, 'r:') as t:
+        for member in t:
+            if not member.isfile() or not member.name.endswith('.txt') or ntpath.basename(member.name).startswith('~$'):
+                continue
+            path = os.path.join(archive, member.name)
+            ARCHIVE_MEMBERS[path] = (tar_file, member.offset_data, member.size, member.mtime)
+            documents.append(path)
+    return documents
+
+def find_documents(input_path, file_name='', recursive=True):
+    # the *.txt files in input_path and in its subdirectories (with recursive) and the *.txt members of the zip and tar archives found there,
+    #   in the order of their paths; file_name: a single file (or archive) in input_path instead.
+    #   The name of a document (its CoNLL table is <name>.conll in the output directory) is its path relative to input_path
+    close_archives() # the archives are listed anew
+    if file_name != '':
+        paths = [os.path.join(input_path, file_name)]
+    else:
+        paths = []
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            if not recursive:
+                dirs[:] = []
+            paths.extend(os.path.join(root, f) for f in sorted(files) if not f[:2] == '~$') # ignore the temporary files
+    documents = []
+    for path in paths:
+        if path.endswith('.txt'):
+            documents.append(path)
+        elif path.endswith('.zip'):
+            documents.extend(zip_documents(path))
+        elif path.endswith(ARCHIVE_SUFFIXES):
+            documents.extend(tar_documents(path))
+    for document in documents:
+        DOCUMENT_NAMES[document] = os.path.relpath(document, input_path).replace(os.sep, '/')
+    return documents
+
+def document_name(file):
+    return DOCUMENT_NAMES.get(file, ntpath.basename(file))
+
+def document_stat(file):
+    # size and modification time of a document
+    if file in ARCHIVE_MEMBERS:
+        archive, member, size, mtime = ARCHIVE_MEMBERS[file]
+        return size, mtime
+    stat = os.stat(file)
+    return stat.st_size, stat.st_mtime
+
+def document_size(file):
+    try:
+        return document_stat(file)[0]
+    except (IOError, OSError):
+        return 0
+
+def close_archives():
+    # close the archives opened by read_document: at the end of every run and before the documents are listed again, so that an archive
+    #   replaced between two runs (in the same process, e.g., a second Execute in the GUI) is not read through the handle of the old one,
+    #   and that no handle keeps an archive (or the temporary tar file of a compressed one) locked on Windows
+    with archives_lock:
+        for handle in open_archives.values():
+            handle.close()
+        open_archives.clear()
+
+def read_document(file):
+    # the bytes of a document; the archives are kept open during the run (one handle per archive, shared by the threads)
+    if file not in ARCHIVE_MEMBERS:
+        with io.open(file, 'rb') as f:
+            return f.read()
+    archive, member, size, mtime = ARCHIVE_MEMBERS[file]
+    with archives_lock:
+        if archive not in open_archives:
+            open_archives[archive] = zipfile.ZipFile(archive) if isinstance(member, str) else io.open(archive, 'rb')
+        handle = open_archives[archive]
+        if not isinstance(member, str): # tar: read size bytes at the offset of the member's data
+            handle.seek(member)
+            return handle.read(size)
+    return handle.read(member) # zipfile reads from several threads
+
+def decode_text(data):
+    # the text of a document and the encoding it was decoded from: a byte order mark if there is one, else UTF-8 if the bytes are valid UTF-8,
+    #   else the encoding detected by charset_normalizer (if installed; only from 4 KB up, detection on shorter texts is a guess),
+    #   else Windows-1252 (the encoding of most non UTF-8 English text), else Latin-1. No byte is dropped
+    for bom, encoding in ((codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'), (codecs.BOM_UTF8, 'utf-8-sig'),
+                          (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')):
+        if data.startswith(bom):
+            return data.decode(encoding, errors='replace'), encoding
+    try:
+        return data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    if len(data) >= 4096:
+        try:
+            from charset_normalizer import from_bytes
+            best = from_bytes(data).best()
+            if best is not None:
+                return str(best), best.encoding
+        except ImportError:
+            pass
+    try:
+        return data.decode('cp1252'), 'cp1252'
+    except UnicodeDecodeError:
+        return data.decode('latin-1'), 'latin-1'
+
+def read_text(file, unicode_policy='transliterate'):
+    # the text of a *.txt file as it is sent to the CoreNLP server; the SHA-256 of its content is kept for file_sha256
+    data = read_document(file)
+    try:
+        DOCUMENT_SHA256[file] = document_stat(file) + (hashlib.sha256(data).hexdigest(),)
+    except (IOError, OSError):
+        pass
+    text, encoding = decode_text(data)
+    return normalize_text(text, unicode_policy).replace('\r\n', '\n').strip()
+
+class DocumentPrefetcher:
+    # reads and normalizes the documents ahead of the workers, on reader threads, in the order in which they are expected to be needed,
+    #   so that disk (or archive) reading overlaps the annotation; at most depth texts are kept in memory.
+    #   read(file) returns the prefetched text of the file, or reads it right away when it was not prefetched
+    def __init__(self, files, unicode_policy='transliterate', depth=16, threads=2):
+        self.files = list(files)
+        self.unicode_policy = unicode_policy
+        self.depth = depth
+        self.texts = {}
+        self.taken = set()
+        self.next = 0
+        self.stopped = False
+        self.condition = threading.Condition()
+        for n in range(threads):
+            thread = threading.Thread(target=self.reader)
+            thread.daemon = True
+            thread.start()
+
+    def reader(self):
+        while True:
+            with self.condition:
+                while len(self.texts) >= self.depth and not self.stopped:
+                    self.condition.wait()
+                if self.stopped or self.next >= len(self.files):
+                    return
+                file = self.files[self.next]
+                self.next += 1
+                if file in self.taken:
+                    continue
+            try:
+                text = read_text(file, self.unicode_policy)
+            except Exception as e:
+                text = e
+            with self.condition:
+                if file not in self.taken:
+                    self.texts[file] = text
+                    self.condition.notify_all()
+
+    def read(self, file, unicode_policy=None):
+        with self.condition:
+            text = self.texts.pop(file, None)
+            self.taken.add(file)
+            self.condition.notify_all()
+        if text is None:
+            return read_text(file, self.unicode_policy)
+        if isinstance(text, Exception):
+            raise text
+        return text
+
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.texts = {}
+            self.condition.notify_all()
+
+#Chunk boundaries: a blank line (paragraph; the server always ends a sentence there) or the end of a sentence as found by the server's
+#   own sentence splitter (see sentence_ends), so that no sentence is cut; only a sentence longer than a chunk is cut, at a space
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+NON_BMP = re.compile('[\U00010000-\U0010FFFF]')
+SENTENCE_MARGIN = 1000 # characters past the end of a chunk sent to find its sentence ends (see split_text)
+
+def last_match_end(pattern, text):
+    # the end of the last match of pattern in text, or None
+    end = None
+    for match in pattern.finditer(text):
+        end = match.end()
+    return end
+
+def sentence_ends(session, server_url, text, properties=None):
+    # the offsets in text (a window of a document; see split_text) of the ends of its sentences, from a tokenize,ssplit request to the server
+    #   (a small fraction of the time of the full annotation); the tokenize and ssplit options of properties, if any, are passed on so that the sentences are the same
+    split_properties = dict((k, v) for k, v in (properties or {}).items() if k.startswith('tokenize.') or k.startswith('ssplit.'))
+    split_properties.update({'annotators': 'tokenize,ssplit', 'outputFormat': 'json', 'output.prettyPrint': 'false'})
+    r = session.post(server_url, params={'properties': json.dumps(split_properties)}, data=text.encode('utf-8'))
+    if r.status_code != 200:
+        r.encoding = 'utf-8'
+        raise Exception(r.text.strip() or 'HTTP error ' + str(r.status_code))
+    ends = [sentence['tokens'][-1]['characterOffsetEnd'] for sentence in json.loads(r.content).get('sentences', []) if sentence.get('tokens')]
+    if NON_BMP.search(text): # the server counts UTF-16 code units: a character outside the BMP counts 2
+        positions = {}
+        unit = 0
+        for position, character in enumerate(text):
+            positions[unit] = position
+            unit += 2 if ord(character) > 0xFFFF else 1
+        positions[unit] = len(text)
+        ends = [positions[end] for end in ends if end in positions]
+    return ends
+
+def split_text(text, chunk_size, sentence_ends=None):
+    # the text cut into chunks of at most chunk_size characters, at the last paragraph break or sentence end of each chunk;
+    #   sentence_ends: a function returning the ends of the sentences of a piece of text (e.g., with sentence_ends above), only called
+    #   for a chunk holding no paragraph break, with the chunk and the next SENTENCE_MARGIN characters (so that the server sees where the
+    #   last sentence of the chunk goes on; the sentence cut off at the end of the piece is not a sentence end). Only a window of the text
+    #   is ever sent, never the whole document. A sentence longer than chunk_size (or, without sentence_ends, a paragraph) is cut at a space:
+    #   the server then numbers the tokens (and heads) of each part as a sentence of its own. chunk_size 0 never cuts.
+    #   The chunks put back together are the text (blank chunks are dropped)
+    if chunk_size <= 0 or len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    start = 0
+    while len(text) - start > chunk_size:
+        window = text[start:start + chunk_size]
+        cut = last_match_end(PARAGRAPH_BREAK, window)
+        if cut is None and sentence_ends is not None:
+            piece = text[start:start + chunk_size + SENTENCE_MARGIN]
+            ends = [end for end in sentence_ends(piece) if 0 < end <= chunk_size and (end < len(piece) or start + end == len(text))]
+            if len(ends) > 0:
+                cut = ends[-1]
+        if cut is None: # a runaway sentence
+            cut = window.rfind(' ') + 1 or chunk_size
+        chunks.append(text[start:start + cut])
+        start += cut
+    chunks.append(text[start:])
+    return [chunk for chunk in chunks if chunk.strip()]
+
+def annotate_chunks(session, server_url, chunks, properties, parallel_requests=1, server_seconds=None, offsets=None, slots=None):
+    # annotate the chunks of a document, up to parallel_requests at the same time, and stitch their CoNLL tables back together
+    #   in the order of the chunks: token ids and heads are numbered within each sentence and every chunk ends with a whole sentence
+    #   (see split_text), so the stitched table is numbered as if the document had been sent whole (SentenceID is counted when merging);
+    #   only a sentence longer than a chunk, cut in parts, is numbered differently
+    #   offsets: the start of each chunk in the document, so that the character offsets (see EXTRA_COLUMNS) are those of the document
+    #   slots: a semaphore held by every request in flight to the server (see dispatch_documents), so that the chunks of a document
+    #   and the other documents sent to the same server never have more than parallel_requests requests in flight together
+    if offsets is None:
+        offsets = [0] * len(chunks)
+    if slots is None:
+        slots = nullcontext()
+    if len(chunks) == 1:
+        with slots:
+            return annotate_text(session, server_url, chunks[0], properties, server_seconds, offsets[0])
+    outputs = [None] * len(chunks)
+    errors = []
+    waiting = deque(range(len(chunks)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if len(waiting) == 0 or len(errors) > 0:
+                    return
+                index = waiting.popleft()
+            try:
+                with slots:
+                    outputs[index] = annotate_text(session, server_url, chunks[index], properties, server_seconds, offsets[index])
+            except Exception as e:
+                with lock:
+                    errors.append('chunk ' + str(index + 1) + ' of ' + str(len(chunks)) + ': ' + str(e))
+
+    threads = [threading.Thread(target=worker) for k in range(max(1, min(parallel_requests, len(chunks))))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if len(errors) > 0:
+        raise Exception(errors[0])
+    return ''.join(output.rstrip('\n') + '\n\n' for output in outputs if output.strip())
+
+def write_conll_table(output, output_path, x):
+    # x: the name of the document; the tables of documents in subdirectories (or archives) go to the same subdirectories of output_path
+    if '/' in x:
+        os.makedirs(os.path.dirname(os.path.join(output_path, x)), exist_ok=True)
+    text_file = io.open(os.path.join(output_path,x) + ".conll", "w", encoding='utf-8')
+    text_file.write(output)             #Output *.ConLL file
+    text_file.close()
+
+def annotate_file(session, server_url, file, output_path, properties, cache=None, unicode_policy='transliterate', chunk_size=0, parallel_requests=1, metrics=None, reader=None, slots=None):
+    # annotate a single *.txt file and, unless output_path is None, write its CoNLL table to output_path as <name>.txt.conll
+    #   the table is also stored in the annotation cache, if any
+    #   A text longer than chunk_size characters (when not 0) is annotated in chunks (see split_text), up to parallel_requests at a time
+    #   metrics: a dict in which the seconds spent in each stage are stored: read (with the cutting into chunks), http (round-trips to the server; wall-clock time
+    #   when the chunks are sent in parallel), server (see annotate_text; summed over the chunks), postprocess and write (including the cache),
+    #   with the bytes of the file and the number of chunks
+    #   reader: the function reading the text of the file (read_text by default; e.g., DocumentPrefetcher.read)
+    #   slots: the semaphore bounding the requests in flight to the server (see annotate_chunks)
+    #   returns the file name, the CoNLL table and None when the file was annotated, the file name, None and the error message otherwise
+    x = document_name(file)
+    if metrics is None:
+        metrics = {}
+
+    def split_ends(piece):
+        with slots or nullcontext():
+            return sentence_ends(session, server_url, piece, properties)
+
+    try:
+        start = time.time()
+        metrics['bytes'] = document_size(file)
+        text = (reader or read_text)(file, unicode_policy)
+        chunks = split_text(text, chunk_size, split_ends)
+        offsets = []
+        position = 0
+        for chunk in chunks: # the chunks follow each other in the text (blank chunks are dropped)
+            position = text.find(chunk, position)
+            offsets.append(position)
+            position += len(chunk)
+        metrics['chunks'] = len(chunks)
+        metrics['read'] = time.time() - start
+        start = time.time()
+        server_seconds = []
+        output = annotate_chunks(session, server_url, chunks, properties, parallel_requests, server_seconds, offsets, slots)
+        metrics['http'] = time.time() - start
+        metrics['server'] = sum(server_seconds)
+        start = time.time()
+        # Replace normalized paranthese back
+        output = restore_brackets(output)
+        metrics['postprocess'] = time.time() - start
+        start = time.time()
+        if output_path is not None:
+            write_conll_table(output, output_path, x)
+        if cache is not None:
+            cache.put(cache.key(text, properties, chunk_size), output)
+        metrics['write'] = time.time() - start
+        return x, output, None
+    except Exception as e:
+        return x, None, str(e)
+
+#Line put between the documents of a batch: CoreNLP starts a new sentence at every blank line, so the marker is a sentence of its own
+#   whose single token tells where a document ends in the CoNLL table
+BATCH_MARKER = 'CoreNLPDocumentBoundary7f3a'
+
+def split_batch_table(output, documents):
+    # the CoNLL tables of the documents of a batch, cut at the sentences made of the marker; None when the table does not hold documents tables
+    tables = [[]]
+    for sentence in output.split('\n\n'):
+        lines = [line for line in sentence.split('\n') if line.strip()]
+        if len(lines) == 0:
+            continue
+        if all(line.split('\t')[1:2] == [BATCH_MARKER] for line in lines):
+            tables.append([])
+        else:
+            tables[-1].append('\n'.join(lines))
+    if len(tables) != documents:
+        return None
+    return [''.join(sentence + '\n\n' for sentence in table) for table in tables]
+
+def shift_offsets(output, shift, column=7):
+    # the CoNLL table with shift added to its character offsets (the columns column and column + 1; see EXTRA_COLUMNS)
+    records = []
+    for line in output.split('\n'):
+        fields = line.split('\t')
+        if len(fields) > column + 1:
+            fields[column] = str(int(fields[column]) + shift)
+            fields[column + 1] = str(int(fields[column + 1]) + shift)
+        records.append('\t'.join(fields))
+    return '\n'.join(records)
+
+def annotate_batch(session, server_url, files, output_path, properties, cache=None, unicode_policy='transliterate', reader=None, chunk_size=0, slots=None):
+    # annotate several small *.txt files in a single request, the texts separated by BATCH_MARKER between blank lines,
+    #   and cut the CoNLL table back into one table per file (token ids and heads are numbered within each sentence
+    #   and no sentence spans two documents, so each table is numbered as if its document had been sent alone);
+    #   the tables are then written and cached as by annotate_file.
+    #   Files that cannot be read, whose text holds the marker or is longer than chunk_size (see annotate_file), are annotated on their own;
+    #   if the table cannot be cut back into as many tables as files, every file is annotated on its own.
+    #   The tables are cached under the same keys as by annotate_file (with chunk_size), so that a batched run and a run document by
+    #   document find each other's tables
+    #   slots: the semaphore bounding the requests in flight to the server (see annotate_chunks)
+    #   returns a list of (file name, CoNLL table or None, error message or None, metrics) in the order of files;
+    #   the http and server times of the request are shared equally by the files of the batch
+    annotated = [None] * len(files)
+    texts = []
+    batch = []
+    for n, file in enumerate(files):
+        start = time.time()
+        try:
+            text = (reader or read_text)(file, unicode_policy)
+        except Exception as e:
+            annotated[n] = (document_name(file), None, str(e), {})
+            continue
+        if BATCH_MARKER in text or 0 < chunk_size < len(text):
+            metrics = {}
+            annotated[n] = annotate_file(session, server_url, file, output_path, properties, cache, unicode_policy, chunk_size, metrics=metrics, reader=lambda file, unicode_policy, text=text: text, slots=slots) + (metrics,)
+            continue
+        batch.append(n)
+        texts.append(text)
+        annotated[n] = (document_name(file), None, None, {'bytes': document_size(file), 'chunks': 1, 'read': time.time() - start, 'batch': 0})
+    if len(batch) == 0:
+        return annotated
+    try:
+        start = time.time()
+        server_seconds = []
+        with slots or nullcontext():
+            output = annotate_text(session, server_url, ('\n\n' + BATCH_MARKER + '\n\n').join(texts), properties, server_seconds)
+        http = time.time() - start
+        tables = split_batch_table(output, len(batch))
+        extra_columns = [column for column in properties.get('conllExtraColumns', '').split(',') if column]
+        if tables is not None and 'offsets' in extra_columns: # offsets in the batch, made offsets in each document
+            column = 7 + extra_columns.index('offsets')
+            start = 0
+            for k, text in enumerate(texts):
+                tables[k] = shift_offsets(tables[k], -start, column)
+                start += len(text) + len('\n\n' + BATCH_MARKER + '\n\n')
+    except Exception as e:
+        for n in batch:
+            annotated[n] = (annotated[n][0], None, str(e), annotated[n][3])
+        return annotated
+    if tables is None:
+        for n, text in zip(batch, texts): # the texts already read
+            metrics = {}
+            annotated[n] = annotate_file(session, server_url, files[n], output_path, properties, cache, unicode_policy, chunk_size, metrics=metrics, reader=lambda file, unicode_policy, text=text: text, slots=slots) + (metrics,)
+        return annotated
+    for n, text, output in zip(batch, texts, tables):
+        x, none, error, metrics = annotated[n]
+        metrics['batch'] = len(batch)
+        metrics['http'] = http / len(batch)
+        metrics['server'] = sum(server_seconds) / len(batch)
+        try:
+            start = time.time()
+            output = restore_brackets(output)
+            metrics['postprocess'] = time.time() - start
+            start = time.time()
+            if output_path is not None:
+                write_conll_table(output, output_path, x)
+            if cache is not None:
+                cache.put(cache.key(text, properties, chunk_size), output)
+            metrics['write'] = time.time() - start
+            annotated[n] = (x, output, None, metrics)
+        except Exception as e:
+            annotated[n] = (x, None, str(e), metrics)
+    return annotated
+
+def corenlp_version(stanford_core_nlp_path):
+    # the version of the CoreNLP installation, from the name of its jar (e.g., stanford-corenlp-3.9.2.jar)
+    for jar in sorted(glob.glob(os.path.join(stanford_core_nlp_path, 'stanford-corenlp-*.jar'))):
+        version = re.match(r'stanford-corenlp-([0-9.]+)\.jar$', ntpath.basename(jar))
+        if version:
+            return version.group(1)
+    return ntpath.basename(os.path.normpath(stanford_core_nlp_path))
+
+def annotation_properties(properties):
+    # the properties that change the annotation: outputDirectory, replaceExtension and timeout do not
+    return dict((k, v) for k, v in properties.items() if k not in ('outputDirectory', 'replaceExtension', 'timeout'))
+
+def properties_hash(properties, unicode_policy='transliterate', chunk_size=0):
+    # a hash of the settings that make the CoNLL table of a document (see RunManifest): the properties, as in the keys of the
+    #   annotation cache (see AnnotationCache.key; the annotators, output format and extra columns), the unicode policy and the chunk size
+    settings = dict(annotation_properties(properties), unicodePolicy=unicode_policy, chunkSize=chunk_size)
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+class AnnotationCache:
+    # on-disk cache of CoNLL tables, keyed by a hash of the text sent to the server, of the properties that change the annotation
+    #   and of the CoreNLP version, so that unchanged documents are not sent to the server again when a corpus is re-run.
+    #   The tables are stored gzipped in <cache_dir>/<first 2 characters of the key>/<key>.conll.gz;
+    #   when the cache grows over max_bytes the least recently used tables are evicted
+    def __init__(self, cache_dir, max_bytes, version):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.sizes = {}
+        for root, dirs, files in os.walk(cache_dir):
+            for f in files:
+                if f.endswith('.conll.gz'):
+                    self.sizes[os.path.join(root, f)] = os.path.getsize(os.path.join(root, f))
+        self.total_bytes = sum(self.sizes.values())
+
+    def key(self, text, properties, chunk_size=0):
+        # outputDirectory, replaceExtension and timeout do not change the annotation;
+        #   the chunk size does (a sentence longer than a chunk is cut) but only for the texts that are cut into chunks;
+        #   chunkSplit tells the tables of chunks cut at the server's sentence ends from those of earlier versions (cut at every period)
+        settings = annotation_properties(properties)
+        if chunk_size > 0 and len(text) > chunk_size:
+            settings['chunkSize'] = chunk_size
+            settings['chunkSplit'] = 'ssplit'
+        key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8'))
+        key.update(b'\0' + self.version.encode('utf-8') + b'\0')
+        key.update(text.encode('utf-8'))
+        return key.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.conll.gz')
+
+    def get(self, key):
+        # the cached CoNLL table, or None
+        cache_file = self.path(key)
+        try:
+            with gzip.open(cache_file, 'rt', encoding='utf-8') as f:
+                output = f.read()
+            os.utime(cache_file, None) # most recently used
+        except (IOError, OSError, EOFError):
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return output
+
+    def put(self, key, output):
+        cache_file = self.path(key)
+        if not os.path.isdir(os.path.dirname(cache_file)):
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temp_file = cache_file + '.' + str(threading.get_ident()) + '.tmp'
+        with gzip.open(temp_file, 'wt', encoding='utf-8') as f:
+            f.write(output)
+        os.replace(temp_file, cache_file)
+        with self.lock:
+            self.total_bytes += os.path.getsize(cache_file) - self.sizes.get(cache_file, 0)
+            self.sizes[cache_file] = os.path.getsize(cache_file)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        # remove the least recently used tables until the cache is back to 90% of max_bytes
+        for cache_file in sorted(self.sizes, key=lambda cache_file: os.path.getmtime(cache_file) if os.path.isfile(cache_file) else 0):
+            if self.total_bytes <= 0.9 * self.max_bytes:
+                break
+            try:
+                os.remove(cache_file)
+            except OSError:
+                pass
+            self.total_bytes -= self.sizes.pop(cache_file)
+            self.evictions += 1
+
+    def summary(self):
+        return "Annotation cache: " + str(self.hits) + " hits, " + str(self.misses) + " misses, " + str(self.evictions) + " evictions (" + str(round(self.total_bytes / 1048576.0, 1)) + " of " + str(round(self.max_bytes / 1048576.0, 1)) + " MB used)"
+
+
+#registry of the servers left running between runs (see keep_server_alive in RunCoreNLP): one <key>-<pid>.json file per server,
+#   where key identifies the CoreNLP installation and the memory option
+SERVER_REGISTRY_DIR = os.path.join(tempfile.gettempdir(), 'StanfordCoreNLP_servers')
+
+def server_registry_key(stanford_core_nlp_path, assigned_memory):
+    return hashlib.md5((os.path.abspath(stanford_core_nlp_path) + '|' + str(assigned_memory)).encode('utf-8')).hexdigest()[:12]
+
+def read_server_registry(registry_file):
+    try:
+        with io.open(registry_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+def write_server_registry(registry_file, entry):
+    # written through a temporary file of its own (see write_json_file): several runs (e.g., the GUI and the command line)
+    #   and the heartbeat thread of each run can update the entry of a shared persistent server at the same time
+    if not os.path.isdir(SERVER_REGISTRY_DIR):
+        os.makedirs(SERVER_REGISTRY_DIR)
+    write_json_file(registry_file, entry, str(os.getpid()) + '-' + str(threading.get_ident()))
+
+def remove_server_registry(registry_file):
+    try:
+        os.remove(registry_file)
+    except OSError: # already removed by the watchdog or by another run
+        pass
+
+def registered_servers(stanford_core_nlp_path, assigned_memory):
+    # the registry entries of the servers started by earlier runs with the same CoreNLP installation and memory option
+    entries = []
+    key = server_registry_key(stanford_core_nlp_path, assigned_memory)
+    for registry_file in sorted(glob.glob(os.path.join(SERVER_REGISTRY_DIR, key + '-*.json'))):
+        entry = read_server_registry(registry_file)
+        if entry is not None:
+            entry['registry_file'] = registry_file
+            entries.append(entry)
+    return entries
+
+def run_server_watchdog(registry_file, interval=30):
+    # runs in its own process (see CoreNLPServer.register) for as long as the registered server is alive;
+    #   shuts the server down once no run has used it for idle_timeout minutes
+    while True:
+        entry = read_server_registry(registry_file)
+        if entry is None: # the server was stopped by a run
+            return
+        if not check_socket('localhost', entry['port']): # the server died
+            remove_server_registry(registry_file)
+            return
+        if time.time() - entry['last_used'] > entry['idle_timeout'] * 60:
+            os.kill(entry['pid'], signal.SIGTERM)
+            remove_server_registry(registry_file)
+            return
+        time.sleep(min(interval, entry['idle_timeout'] * 60))
+
+#The servers started by this program that are not kept alive for the next runs (see CoreNLPServer.persistent): killed when the program
+#   exits, even in the middle of a run (e.g., when the window is closed while RunCoreNLP runs in its background thread)
+started_servers = set()
+
+def kill_started_servers():
+    for server in list(started_servers):
+        try:
+            server.kill()
+        except Exception:
+            pass
+
+atexit.register(kill_started_servers)
+
+class CoreNLPServer:
+    # a StanfordCoreNLPServer subprocess (one JVM) listening on its own port with its own heap (-mx)
+    #   several servers can be started to use all the cores of a machine; a server that dies can be restarted
+    #   A persistent server is left running at the end of the run and recorded in the server registry, so that the next run
+    #   can attach to it (see attach) and skip loading the models; it shuts itself down after idle_timeout minutes without use
+    def __init__(self, stanford_core_nlp_path, assigned_memory, persistent=False, idle_timeout=30):
+        self.stanford_core_nlp_path = stanford_core_nlp_path
+        self.assigned_memory = assigned_memory
+        self.persistent = persistent
+        self.idle_timeout = idle_timeout
+        self.process = None
+        self.pid = None
+        self.host = 'localhost'
+        self.port = None
+        self.registry_file = None
+        self.restarts = 0
+        self.lock = threading.Lock()
+        self.started = None
+
+    @classmethod
+    def attach(cls, stanford_core_nlp_path, assigned_memory, entry):
+        # a persistent server started by an earlier run, from its registry entry
+        server = cls(stanford_core_nlp_path, assigned_memory, True, entry['idle_timeout'])
+        server.pid = entry['pid']
+        server.port = entry['port']
+        server.started = entry['started']
+        server.registry_file = entry['registry_file']
+        return server
+
+    @classmethod
+    def at_url(cls, server_url):
+        # a server started outside this program; it is never restarted nor killed
+        server = cls(None, None)
+        server_url = server_url.rstrip('/').split('://')[-1]
+        server.host, port = server_url.rsplit(':', 1) if ':' in server_url else (server_url, 80)
+        server.port = int(port)
+        server.started = time.time()
+        return server
+
+    def command(self):
+        return ['java','-mx'+str(self.assigned_memory)+'g','-cp', str(self.stanford_core_nlp_path),'edu.stanford.nlp.pipeline.StanfordCoreNLPServer', '-port', str(self.port),'-timeout','999999']
+
+    def start(self):
+        self.port = get_open_port() #find a open port for corenlp
+        self.started = time.time()
+        #Launch CoreNLP server, allowing us to run *.txt files without re-initializing CoreNLP
+        with open(os.devnull, 'w') as fp:
+            if self.persistent: # not killed with this program (e.g., when the command prompt is closed)
+                self.process = subprocess.Popen(self.command(), stdout=fp, **detached_process_options())
+            else:
+                self.process = subprocess.Popen(self.command(), stdout=fp) #avoid printing the entire document
+                started_servers.add(self)
+            #self.process = subprocess.Popen(self.command())  #this will print the entire document
+        self.pid = self.process.pid
+        if self.persistent:
+            self.register()
+
+    def register(self):
+        # record the server in the registry and start its idle watchdog
+        self.registry_file = os.path.join(SERVER_REGISTRY_DIR, server_registry_key(self.stanford_core_nlp_path, self.assigned_memory) + '-' + str(self.pid) + '.json')
+        write_server_registry(self.registry_file, {'pid': self.pid, 'port': self.port, 'stanford_core_nlp_path': self.stanford_core_nlp_path,
+                                                   'assigned_memory': self.assigned_memory, 'started': self.started,
+                                                   'last_used': time.time(), 'idle_timeout': self.idle_timeout})
+        with open(os.devnull, 'w') as fp:
+            subprocess.Popen([sys.executable, os.path.abspath(__file__), '--server-watchdog', self.registry_file], stdout=fp, stderr=fp, **detached_process_options())
+
+    def touch(self):
+        # tell the watchdog that the server is in use
+        if self.registry_file is not None:
+            entry = read_server_registry(self.registry_file)
+            if entry is not None:
+                entry['last_used'] = time.time()
+                try:
+                    write_server_registry(self.registry_file, entry)
+                except OSError: # the entry was removed meanwhile (server stopped by another run or by its watchdog)
+                    pass
+
+    def url(self):
+        return 'http://'+self.host+':'+str(self.port)
+
+    def is_alive(self):
+        if self.process is not None:
+            return self.process.poll() is None
+        return self.port is not None and check_socket(self.host, self.port) # attached server
+
+    def wait_until_ready(self, timeout=300):
+        # poll the server until it answers on its /ready endpoint (servers older than 3.9.2 answer any path with their home page),
+        #   waiting 0.1 seconds before the second attempt and doubling the wait up to half a second between the following ones
+        #   returns the number of seconds since the JVM was launched
+        delay = 0.1
+        while True:
+            if self.process is not None and not self.is_alive():
+                raise Exception("The Stanford CoreNLP server exited during startup (exit code " + str(self.process.poll()) + "). Check the CoreNLP path, your Java installation and the memory option.")
+            if check_socket(self.host, self.port):
+                try:
+                    if requests.get(self.url() + '/ready', timeout=5).status_code < 500:
+                        return time.time() - self.started
+                except requests.exceptions.RequestException:
+                    pass
+            if time.time() - self.started > timeout:
+                raise Exception("The Stanford CoreNLP server did not start within " + str(timeout) + " seconds.")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    def warm_up(self, properties):
+        # the server loads the models of the requested annotators (parse, ner, ...) with the first document it receives;
+        #   send it a tiny document so that the model-loading time is not charged to the first real document
+        #   returns the number of seconds taken
+        start = time.time()
+        with requests.Session() as session:
+            annotate_text(session, self.url(), "This is a short sentence.", properties)
+        return time.time() - start
+
+    def wait_and_warm_up(self, properties, timeout=300):
+        # returns the measured (ready, warm-up) latencies in seconds
+        ready_time = self.wait_until_ready(timeout)
+        return ready_time, self.warm_up(properties)
+
+    def restart(self, properties):
+        if self.stanford_core_nlp_path is None:
+            raise Exception("The Stanford CoreNLP server at " + self.url() + " was not started by this program.")
+        self.kill()
+        self.restarts += 1
+        self.start()
+        return self.wait_and_warm_up(properties)
+
+    def release(self):
+        # end of the run: persistent servers are left running for the next run, the others are killed
+        if self.persistent:
+            self.touch()
+        elif self.stanford_core_nlp_path is not None:
+            self.kill()
+
+    def kill(self):
+        started_servers.discard(self)
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+                self.process.wait()
+        elif self.pid is not None and self.is_alive():
+            os.kill(self.pid, signal.SIGTERM)
+        if self.registry_file is not None:
+            remove_server_registry(self.registry_file)
+            self.registry_file = None
+
+def detached_process_options():
+    # Popen options for a process that outlives this program
+    if sys.platform == 'win32':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+    return {'start_new_session': True}
+
+def start_servers(servers, properties, timeout=300):
+    # launch all the servers at once and wait, in parallel, until each one is ready and has loaded the annotators,
+    #   so that startup takes exactly as long as the slowest JVM needs
+    #   returns the servers that came up
+    for server in servers:
+        server.start()
+    latencies = {}
+    errors = {}
+
+    def startup(server):
+        try:
+            latencies[server] = server.wait_and_warm_up(properties, timeout)
+        except Exception as e:
+            errors[server] = str(e)
+
+    threads = [threading.Thread(target=startup, args=(server,)) for server in servers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for server in servers:
+        if server in errors:
+            print("Could not start the Stanford CoreNLP server on port " + str(server.port) + ": " + errors[server])
+            server.kill()
+        else:
+            ready_time, warm_up_time = latencies[server]
+            print("Stanford CoreNLP server on port " + str(server.port) + " ready in " + str(round(ready_time, 1)) + " seconds; annotators loaded in " + str(round(warm_up_time, 1)) + " seconds (startup latency " + str(round(ready_time + warm_up_time, 1)) + " seconds)")
+    return [server for server in servers if server not in errors]
+
+def acquire_servers(stanford_core_nlp_path, assigned_memory, num_servers, properties, keep_server_alive=0, idle_timeout=30, server_url=''):
+    # the servers for this run: the server at server_url if one is given; otherwise, with keep_server_alive, the servers left running
+    #   by earlier runs (with the same CoreNLP installation and memory option), and newly started servers for the rest
+    if server_url:
+        servers = [CoreNLPServer.at_url(server_url)]
+        try:
+            servers[0].wait_and_warm_up(properties, timeout=10)
+        except Exception as e:
+            print("Could not connect to the Stanford CoreNLP server at " + server_url + ": " + str(e))
+            return []
+        print("Using the Stanford CoreNLP server at " + servers[0].url())
+        return servers
+    servers = []
+    if keep_server_alive == 1:
+        for entry in registered_servers(stanford_core_nlp_path, assigned_memory):
+            server = CoreNLPServer.attach(stanford_core_nlp_path, assigned_memory, entry)
+            if len(servers) < num_servers and server.is_alive():
+                try:
+                    server.touch()
+                    server.warm_up(properties)
+                except Exception:
+                    continue
+                print("Attached to the running Stanford CoreNLP server on port " + str(server.port) + " (started " + str(int((time.time() - server.started) / 60)) + " minutes ago)")
+                servers.append(server)
+    new_servers = [CoreNLPServer(stanford_core_nlp_path, assigned_memory, keep_server_alive == 1, idle_timeout) for n in range(num_servers - len(servers))]
+    if len(new_servers) > 0:
+        servers += start_servers(new_servers, properties)
+    return servers
+
+def start_registry_heartbeat(servers, interval=60):
+    # keep the registry entries of persistent servers fresh while the run lasts, so that their watchdog does not shut them down mid-run
+    #   returns the event that stops the heartbeat
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(interval):
+            for server in servers:
+                server.touch()
+
+    thread = threading.Thread(target=heartbeat)
+    thread.daemon = True
+    thread.start()
+    return stop
+
+def schedule_documents(InputDocs, num_servers, indices=None):
+    # size-aware scheduling of the input documents over the servers: the documents are taken from the largest to the smallest
+    #   and each one is given to the server with the least amount of text assigned so far,
+    #   so that the largest files do not all land on the same JVM
+    #   indices: the InputDocs to be scheduled (all by default)
+    #   returns one queue of InputDocs indices per server
+    if indices is None:
+        indices = range(len(InputDocs))
+    queues = [deque() for n in range(num_servers)]
+    loads = [0] * num_servers
+    sizes = dict((index, document_size(InputDocs[index])) for index in indices)
+    for index in sorted(indices, key=lambda index: sizes[index], reverse=True):
+        n = loads.index(min(loads))
+        queues[n].append(index)
+        loads[n] += sizes[index]
+    return queues
+
+def dispatch_documents(servers, queues, InputDocs, session, output_path, properties, parallel_requests, cache=None, unicode_policy='transliterate', chunk_size=0, batch_bytes=0, max_restarts=3, max_attempts=2, progress=None, cancel=None, reader=None):
+    # run parallel_requests worker threads per server, each taking documents from its server's queue; the requests in flight to a server,
+    #   chunks of long documents included (see annotate_chunks), are bounded by parallel_requests;
+    #   a worker whose queue is empty takes (the smallest) documents still waiting in the other queues.
+    #   With batch_bytes, documents smaller than batch_bytes are sent together, up to batch_bytes per request (see annotate_batch).
+    #   When a server dies (e.g., out of memory) it is restarted and the documents it was working on are requeued. A server that cannot be
+    #   restarted (restarts used up, restart failed, or a server started outside this program) is given up: its workers stop, and its queue
+    #   and the documents it was working on go to the servers still alive (the last server alive is never given up: its errors are reported).
+    #   Yields (InputDocs index, file name, CoNLL table or None, error message or None, metrics) in the order in which the documents complete;
+    #   metrics: the stage timings of the last attempt (see annotate_file), the number of retries and the seconds spent over all the attempts
+    #   progress: called (from the worker threads) with ('annotating', {'name', 'port'}) when a document is sent to a server
+    #   and with ('status', {'message'}) when a server is restarted
+    #   cancel: a threading.Event; once set, no more documents are sent, the documents already sent are completed
+    #   and the documents still waiting are yielded with the error 'cancelled'
+    #   reader: the function reading the texts (see annotate_file)
+    results = queue.Queue()
+    queues_lock = threading.Lock()
+    attempts = [0] * len(InputDocs)
+    seconds = [0.0] * len(InputDocs)
+    sizes = {}
+    if batch_bytes > 0:
+        for q in queues:
+            for index in q:
+                sizes[index] = document_size(InputDocs[index])
+    dead = set() # the servers given up
+    slots = [threading.BoundedSemaphore(max(1, parallel_requests)) for server in servers] # parallel_requests requests in flight per server, chunks included
+
+    def size(index):
+        if index not in sizes:
+            sizes[index] = document_size(InputDocs[index])
+        return sizes[index]
+
+    def give_up_server(n, indices):
+        # server n died and will not be restarted: its queue is scheduled over the servers still alive (each queue kept from the largest
+        #   to the smallest document) and the documents indices it was working on are put first in their queues; False when no other server is alive
+        with queues_lock:
+            live = [k for k in range(len(servers)) if k != n and k not in dead]
+            if len(live) == 0:
+                return False
+            if n not in dead:
+                dead.add(n)
+                message = "The Stanford CoreNLP server on port " + str(servers[n].port) + " cannot be restarted; its documents go to the other servers."
+                print(message)
+                if progress is not None:
+                    progress('status', {'message': message})
+            waiting = list(queues[n])
+            queues[n].clear()
+            for k, q in zip(live, schedule_documents(InputDocs, len(live), waiting)):
+                if len(q) > 0:
+                    merged = sorted(list(queues[k]) + list(q), key=size, reverse=True)
+                    queues[k].clear()
+                    queues[k].extend(merged)
+            for i, index in enumerate(indices):
+                queues[live[i % len(live)]].appendleft(index)
+            return True
+
+    def next_documents(n):
+        # the next document of the worker's queue (or the smallest one waiting in the longest queue) and, when it is smaller than batch_bytes,
+        #   the smallest documents of the same queue that fit in batch_bytes with it (the queues go from the largest to the smallest document)
+        with queues_lock:
+            if (cancel is not None and cancel.is_set()) or n in dead:
+                return []
+            if len(queues[n]) > 0:
+                q = queues[n]
+                batch = [q.popleft()]
+            else:
+                q = queues[max(range(len(queues)), key=lambda k: len(queues[k]))]
+                if len(q) == 0:
+                    return []
+                batch = [q.pop()]
+            if batch_bytes > 0:
+                total = sizes[batch[0]]
+                while len(q) > 0 and total + sizes[q[-1]] <= batch_bytes:
+                    batch.append(q.pop())
+                    total += sizes[batch[-1]]
+            return batch
+
+    def worker(n):
+        server = servers[n]
+        while True:
+            batch = next_documents(n)
+            if len(batch) == 0:
+                return
+            url = server.url()
+            for index in batch:
+                attempts[index] += 1
+                if progress is not None:
+                    progress('annotating', {'name': document_name(InputDocs[index]), 'port': server.port})
+            start = time.time()
+            if len(batch) == 1:
+                metrics = {}
+                annotated = [annotate_file(session, url, InputDocs[batch[0]], output_path, properties, cache, unicode_policy, chunk_size, parallel_requests, metrics, reader, slots[n]) + (metrics,)]
+            else:
+                annotated = annotate_batch(session, url, [InputDocs[index] for index in batch], output_path, properties, cache, unicode_policy, reader, chunk_size, slots[n])
+            elapsed = (time.time() - start) / len(batch)
+            server_died = any(error is not None for x, output, error, metrics in annotated) and not server.is_alive()
+            if server_died:
+                with server.lock:
+                    # only the first worker noticing the dead server restarts it
+                    if not server.is_alive() and server.restarts < max_restarts:
+                        print("")
+                        print("The Stanford CoreNLP server on port " + str(server.port) + " stopped working. Restarting it...")
+                        if progress is not None:
+                            progress('status', {'message': "The Stanford CoreNLP server on port " + str(server.port) + " stopped working. Restarting it..."})
+                        try:
+                            server.restart(properties)
+                        except Exception as e:
+                            print("Could not restart the Stanford CoreNLP server: " + str(e))
+                            server.kill()
+            given_up = False
+            if server_died and not server.is_alive():
+                retry = [index for index, (x, output, error, metrics) in zip(batch, annotated) if error is not None and attempts[index] < max_attempts]
+                given_up = give_up_server(n, retry)
+            for index, (x, output, error, metrics) in zip(batch, annotated):
+                seconds[index] += elapsed
+                if error is not None and server_died and attempts[index] < max_attempts and (server.is_alive() or given_up):
+                    if not given_up:
+                        with queues_lock:
+                            queues[n].appendleft(index)
+                    continue
+                metrics['retries'] = attempts[index] - 1
+                metrics['seconds'] = seconds[index]
+                results.put((index, x, output, error, metrics))
+
+    num_documents = sum(len(q) for q in queues)
+    threads = []
+    for n in range(len(servers)):
+        for k in range(max(1, parallel_requests)):
+            thread = threading.Thread(target=worker, args=(n,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+    done = 0
+    while done < num_documents:
+        try:
+            item = results.get(timeout=0.5)
+        except queue.Empty:
+            # all the workers stopped (cancelled) and nothing is left to yield
+            if not any(thread.is_alive() for thread in threads) and results.empty():
+                break
+            continue
+        done += 1
+        yield item
+    for thread in threads:
+        thread.join()
+    for q in queues: # documents never sent (cancelled)
+        while len(q) > 0:
+            index = q.popleft()
+            yield (index, document_name(InputDocs[index]), None, 'cancelled', {'retries': 0, 'seconds': 0.0})
+
+
+def count_tokens(output):
+    # the number of tokens (non blank records) of a CoNLL table
+    if not output:
+        return 0
+    return output.count('\n') - output.count('\n\n') + (0 if output.endswith('\n') else 1)
+
+def count_sentences(output):
+    # the number of sentences of a CoNLL table (a new sentence starts at every token numbered 1)
+    if not output:
+        return 0
+    return output.count('\n1\t') + (1 if output.startswith('1\t') else 0)
+
+class RunMetrics:
+    # per document instrumentation of a run, appended as JSON lines to corenlp_metrics.jsonl in the output directory
+    #   (one line per document, in input order, then one summary line; every line carries the start time of its run):
+    #   the seconds spent in each stage (see annotate_file; merge is the time spent appending the table to the merged table),
+    #   the bytes of the input file, the number of tokens, sentences, chunks and retries, and where the table came from
+    #   (server, cache or resume). summary() adds percentiles of the stage times and the throughput of the run
+    STAGES = ['read', 'http', 'server', 'postprocess', 'write', 'merge']
+
+    def __init__(self, output_path):
+        self.metrics_file = os.path.join(output_path, 'corenlp_metrics.jsonl')
+        self.run = datetime.datetime.now().isoformat(timespec='seconds')
+        self.documents = []
+        self.metrics = io.open(self.metrics_file, 'a', encoding='utf-8')
+
+    def write(self, entry):
+        entry['run'] = self.run
+        self.metrics.write(json.dumps(entry) + '\n')
+        self.metrics.flush()
+
+    def record(self, x, metrics, output, error):
+        entry = dict(metrics)
+        entry['name'] = x
+        entry['status'] = 'done' if error is None else ('cancelled' if error == 'cancelled' else 'failed')
+        entry['tokens'] = count_tokens(output)
+        entry['sentences'] = count_sentences(output)
+        for stage in self.STAGES + ['seconds']:
+            if stage in entry:
+                entry[stage] = round(entry[stage], 6)
+        self.documents.append(entry)
+        self.write(entry)
+
+    def summary(self, seconds):
+        # the summary lines printed at the end of the run (also written to the metrics file); seconds: the wall-clock time of the run
+        seconds = max(seconds, 0.001)
+        done = [entry for entry in self.documents if entry['status'] == 'done']
+        megabytes = sum(entry.get('bytes', 0) for entry in done) / 1048576.0
+        tokens = sum(entry['tokens'] for entry in done)
+        summary = {'summary': True, 'seconds': round(seconds, 3), 'documents': len(done),
+                   'failed': sum(1 for entry in self.documents if entry['status'] == 'failed'),
+                   'retries': sum(entry.get('retries', 0) for entry in self.documents),
+                   'from_server': sum(1 for entry in done if entry.get('source') == 'server'),
+                   'megabytes': round(megabytes, 3), 'tokens': tokens, 'sentences': sum(entry['sentences'] for entry in done),
+                   'docs_per_sec': round(len(done) / seconds, 3), 'mb_per_sec': round(megabytes / seconds, 3), 'tokens_per_sec': round(tokens / seconds, 1)}
+        lines = [str(len(done)) + " documents in " + str(round(seconds, 1)) + " s: " + str(summary['docs_per_sec']) + " docs/sec, " +
+                 str(summary['mb_per_sec']) + " MB/sec, " + str(summary['tokens_per_sec']) + " tokens/sec (" + str(summary['retries']) + " retries)",
+                 "Milliseconds per document (p50 / p90 / p99 / max):"]
+        for stage in self.STAGES:
+            values = [entry[stage] for entry in done if stage in entry]
+            if len(values) == 0:
+                continue
+            import numpy as np
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            summary[stage] = {'p50': round(p50, 6), 'p90': round(p90, 6), 'p99': round(p99, 6), 'max': round(max(values), 6), 'total': round(sum(values), 3)}
+            lines.append("    " + (stage + ':').ljust(13) + " / ".join(str(round(v * 1000, 1)) for v in (p50, p90, p99, max(values))) + "  (total " + str(round(sum(values), 1)) + " s)")
+        self.write(summary)
+        return lines
+
+    def close(self):
+        self.metrics.close()
+
+def file_sha256(file):
+    # the SHA-256 of the content of a file: the one computed when its text was read (see read_text) if the file is unchanged since,
+    #   else read 1 MB at a time (an archive member at once)
+    known = DOCUMENT_SHA256.get(file)
+    if known is not None and known[:2] == document_stat(file):
+        return known[2]
+    if file in ARCHIVE_MEMBERS:
+        return hashlib.sha256(read_document(file)).hexdigest()
+    digest = hashlib.sha256()
+    with io.open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1048576), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def document_unchanged(file, entry):
+    # True if the file is the one described by the entry (of the manifest or of the merged table index): same size and modification time
+    #   or, failing that, same content
+    size, mtime = document_stat(file)
+    if size != entry.get('size'):
+        return False
+    return mtime == entry.get('mtime') or file_sha256(file) == entry.get('sha256')
+
+class RunManifest:
+    # append-only record (corenlp_manifest.jsonl in the output directory, one JSON object per line) of every document completed
+    #   by the runs in that directory: input path, size, mtime, SHA-256 of the content, status ('done' or 'failed'), error,
+    #   seconds spent annotating it, path of its CoNLL table (or of the merged table), time of completion and the hash of the settings
+    #   of the run (see properties_hash), so that a run with other annotators, output format or extra columns does not resume
+    #   the tables of another. Each line is flushed to disk as soon as it is written, so that a run killed partway can be resumed
+    #   (see resume_status); a line cut short by the kill is ignored
+    def __init__(self, output_path, properties=''):
+        self.manifest_file = os.path.join(output_path, 'corenlp_manifest.jsonl')
+        self.properties = properties # the hash of the settings of this run
+        self.entries = {} # the last entry of each input path
+        self.failures = {} # the number of failed attempts of each content (SHA-256) with the settings of this run
+        if os.path.isfile(self.manifest_file):
+            with io.open(self.manifest_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if 'input' not in entry:
+                        continue
+                    self.entries[entry['input']] = entry
+                    if entry.get('status') == 'failed' and entry.get('properties') == properties:
+                        self.failures[entry['sha256']] = self.failures.get(entry['sha256'], 0) + 1
+        self.manifest = io.open(self.manifest_file, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+
+    def unchanged(self, file, entry):
+        return document_unchanged(file, entry)
+
+    def resume_status(self, file, max_retries=3):
+        # 'done' (with the path of its CoNLL table) for a file completed by an earlier run with the same settings and unchanged since,
+        #   'failed' for a file that failed max_retries times (with the same content and settings), None for a file to annotate
+        entry = self.entries.get(os.path.abspath(file))
+        if entry is None or not self.unchanged(file, entry):
+            return None, None
+        if entry['status'] == 'done' and entry.get('properties') == self.properties:
+            return 'done', entry.get('output')
+        if self.failures.get(entry['sha256'], 0) >= max_retries:
+            return 'failed', entry.get('error')
+        return None, None
+
+    def record(self, file, status, seconds=0.0, output=None, error=None):
+        size, mtime = document_stat(file)
+        entry = {'input': os.path.abspath(file), 'size': size, 'mtime': mtime, 'sha256': file_sha256(file),
+                 'status': status, 'error': error, 'seconds': round(seconds, 3), 'output': output,
+                 'finished': datetime.datetime.now().isoformat(timespec='seconds'), 'properties': self.properties}
+        with self.lock:
+            self.manifest.write(json.dumps(entry) + '\n')
+            self.manifest.flush()
+            os.fsync(self.manifest.fileno())
+            if status == 'failed':
+                self.failures[entry['sha256']] = self.failures.get(entry['sha256'], 0) + 1
+            self.entries[entry['input']] = entry
+
+    def close(self):
+        self.manifest.close()
+
+#Month names (English; full or abbreviated) in the date formats with month
+MONTH_NAMES = dict((name, n + 1) for n, names in enumerate([('january', 'jan'), ('february', 'feb'), ('march', 'mar'), ('april', 'apr'), ('may',), ('june', 'jun'),
+                                                            ('july', 'jul'), ('august', 'aug'), ('september', 'sep', 'sept'), ('october', 'oct'),
+                                                            ('november', 'nov'), ('december', 'dec')]) for name in names)
+
+#The date formats: their parts (yyyy, mm or m, dd or d, month), in the order in which they appear; any of - . / or a space between the parts.
+#   'iso' is an ISO 8601 date or timestamp (e.g., 2019-01-31, 2019-01-31T14:05:00Z); only the date is kept, as written (a UTC offset is not applied)
+DATE_FORMATS = ['mm-dd-yyyy', 'm-d-yyyy', 'dd-mm-yyyy', 'yyyy-mm-dd', 'yyyy-dd-mm', 'yyyy-mm', 'yyyy',
+                'dd-month-yyyy', 'month-dd-yyyy', 'yyyy-month-dd', 'month-yyyy', 'iso']
+ISO_OFFSET = re.compile(r'(?i)(T\d[\d:.,]*)(?:Z|[+-]\d\d(?::?\d\d)?)$') # the UTC offset at the end of an ISO 8601 timestamp
+
+class FilenameDateParser:
+    # the dates in the names of the documents: the field at date_field_position (1 for the first) of the base name without .txt,
+    #   fields separated by sep, parsed with date_format (see DATE_FORMATS). The format is compiled once into a regular expression;
+    #   parse_all parses the names in bulk (vectorized with pandas) and keeps the dates, which date() then looks up.
+    #   A date that cannot be found or parsed is None (a null, not the date of the previous document)
+    #   and is listed in failures with its field and the reason
+    def __init__(self, sep='_', date_field_position=3, date_format='mm-dd-yyyy'):
+        self.sep = sep
+        self.date_field_position = date_field_position
+        self.date_format = date_format
+        self.dates = {}
+        self.failures = [] # (name, field, reason)
+        if date_format != 'iso':
+            parts = {'yyyy': r'(?P<year>\d{4})', 'mm': r'(?P<month>\d{1,2})', 'm': r'(?P<month>\d{1,2})',
+                     'dd': r'(?P<day>\d{1,2})', 'd': r'(?P<day>\d{1,2})', 'month': r'(?P<month_name>[A-Za-z]{3,9})\.?'}
+            pattern = r'[-./ ]'.join(parts[part] for part in date_format.split('-'))
+            self.regex = re.compile(r'^\s*' + pattern + r'\s*$')
+
+    def field(self, name):
+        # the date field of a document name, or None when the name has fewer fields
+        name = name.rsplit('/', 1)[-1] # document names use / (see find_documents)
+        if name.endswith('.txt'):
+            name = name[:-4]
+        fields = name.split(self.sep)
+        if self.date_field_position < 1 or len(fields) < self.date_field_position:
+            return None
+        return fields[self.date_field_position - 1]
+
+    def parse_all(self, names):
+        # parse the dates of all the names at once; returns the number of names whose date could not be found or parsed
+        names = [name for name in dict.fromkeys(names) if name not in self.dates]
+        if len(names) == 0:
+            return 0
+        import pandas as pd
+        fields = pd.Series([self.field(name) for name in names], dtype=object)
+        if self.date_format == 'iso': # the date as written in the name: the UTC offset of a timestamp is dropped, not applied
+            dates = pd.to_datetime(fields.str.strip().str.replace(ISO_OFFSET, r'\1', regex=True), errors='coerce', format='ISO8601')
+        else:
+            parts = fields.str.extract(self.regex)
+            year = pd.to_numeric(parts['year'], errors='coerce')
+            if 'month_name' in parts:
+                month = parts['month_name'].str.lower().str.rstrip('.').map(MONTH_NAMES)
+            elif 'month' in parts:
+                month = pd.to_numeric(parts['month'], errors='coerce')
+            else:
+                month = pd.Series(1, index=parts.index)
+            day = pd.to_numeric(parts['day'], errors='coerce') if 'day' in parts else pd.Series(1, index=parts.index)
+            dates = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': day}), errors='coerce')
+        failed = 0
+        for name, field, valid, date in zip(names, fields, dates.notna().values, dates.dt.date.values):
+            if not valid:
+                self.dates[name] = None
+                self.failures.append((name, field, 'no field ' + str(self.date_field_position) + ' (separator ' + self.sep + ')' if field is None else
+                                      'not a ' + self.date_format + ' date'))
+                failed += 1
+            else:
+                self.dates[name] = date
+        return failed
+
+    def date(self, name):
+        # the date (datetime.date) of a document name, or None
+        if name not in self.dates:
+            self.parse_all([name])
+        return self.dates[name]
+
+    def write_failures(self, report_file):
+        # the names whose date could not be found or parsed, as a tab separated file (name, field, reason)
+        with io.open(report_file, 'w', encoding='utf-8') as f:
+            f.write('name\tfield\treason\n')
+            for name, field, reason in self.failures:
+                f.write(name + '\t' + ('' if field is None else field) + '\t' + reason + '\n')
+
+def conll_dtypes(extra_columns=()):
+    # compact types of the columns of a CoNLL table: int32 token ids and character offsets, categories (each value stored once per chunk,
+    #   a small code per record) for the few distinct values of POS, NER, head (a number or "_"), deprel and NERSpan, text for word and lemma
+    #   (as categories they take less memory, but reading them takes longer)
+    dtypes = {0: 'int32', 1: str, 2: str, 3: 'category', 4: 'category', 5: 'category', 6: 'category'}
+    column = 7
+    for name, columns in EXTRA_COLUMNS:
+        if name in extra_columns:
+            for extra in columns:
+                dtypes[column] = 'int32' if extra.startswith('CharacterOffset') else 'category'
+                column += 1
+    return dtypes
+
+def read_conll_table(table, chunksize=None, dtype=str):
+    # the CoNLL table as text columns (no quoting: a quote is a token like any other; "NA" or "null" are words, not missing values)
+    #   or, with dtype (e.g., conll_dtypes()), as typed columns; with chunksize, an iterator over tables of at most chunksize records
+    import pandas as pd
+    return pd.read_csv(table, sep='\t', header=None, quoting=csv.QUOTE_NONE, dtype=dtype, keep_default_na=False, na_filter=False, skip_blank_lines=True, encoding='utf-8', chunksize=chunksize)
+
+class MergedConllWriter:
+    # writes the merged CoNLL table one document at a time, chunksize records at a time, so that memory use does not depend on the size of the corpus;
+    #   the counters (RecordNum, DocNum and the records and sentences of each document) are kept in memory
+    #   Each record gets the columns RecordNum (1 to N over the merged table), DocNum (1 to the number of merged tables),
+    #   SentenceID (1 to the number of sentences in its document: a new sentence starts at every token numbered 1),
+    #   the name of the table and, with get_date_flag, the date found in that name (see FilenameDateParser; empty when none was found)
+    #   The tables are not parsed: the columns are added at the end of each line of text (see MergedParquetWriter for typed columns);
+    #   peak_bytes is the size of the largest chunk of records held
+    def __init__(self, merged_file, get_date_flag=0, sep='_', date_field_position=3, date_format='mm-dd-yyyy', chunksize=100000, extra_columns=()):
+        self.merged_file = merged_file
+        self.extra_columns = extra_column_names(extra_columns) # the columns after deprel (see EXTRA_COLUMNS)
+        self.peak_bytes = 0
+        self.get_date_flag = get_date_flag
+        self.sep = sep
+        self.date_field_position = date_field_position
+        self.date_format = date_format
+        self.chunksize = chunksize
+        self.RecordNum = 0
+        self.DocNum = 0
+        self.date = None
+        self.date_parser = FilenameDateParser(sep, date_field_position, date_format) if get_date_flag == 1 else None
+        self.documents = [] # (name, records, sentences) of each merged table
+        self.open()
+
+    def open(self):
+        self.merged = io.open(self.merged_file, 'w', encoding='utf-8', newline='')
+
+    def lines(self, table, from_file):
+        # the lines of the table (blank lines dropped), chunksize at a time
+        f = io.open(table, 'r', encoding='utf-8') if from_file else io.StringIO(table)
+        with f:
+            chunk = []
+            for line in f:
+                line = line.rstrip('\r\n')
+                if line.strip():
+                    chunk.append(line)
+                    if len(chunk) == self.chunksize:
+                        yield chunk
+                        chunk = []
+            if len(chunk) > 0:
+                yield chunk
+
+    def append(self, x, table, from_file=False, source=None):
+        # table: the CoNLL table (as returned by the server) or, with from_file, the path of a CoNLL table
+        #   source: the input document of the table (recorded by IncrementalMergedConllWriter)
+        #   returns the number of records appended; a table whose first field is not a token id, or whose lines do not all have
+        #   the same number of columns, is not merged: an exception is raised, and the chunks of the table already written are truncated
+        #   from the merged table (the next table gets the DocNum and RecordNums it would have had)
+        if x == 'mergedConllTables': #Assures that the merged ConLL table is not merged into our new merged ConLL table (in the case of re-running script)
+            return 0
+        if self.get_date_flag == 1:
+            self.date = self.date_parser.date(x)
+        suffix = '\t' + x + ('\t' + (self.date.strftime('%Y-%m-%d') if self.date is not None else '') if self.get_date_flag == 1 else '') + '\n'
+        DocNum = str(self.DocNum + 1)
+        records = 0
+        SentenceID = 0
+        tabs = None
+        start = self.merged.tell()
+        try:
+            for chunk in self.lines(table, from_file):
+                if tabs is None:
+                    tabs = chunk[0].count('\t')
+                    if not chunk[0].split('\t', 1)[0].isdigit():
+                        raise Exception("not a CoNLL table (" + chunk[0][:80] + ")")
+                if any(line.count('\t') != tabs for line in chunk):
+                    raise Exception("the lines of the CoNLL table do not all have " + str(tabs + 1) + " columns")
+                text = []
+                RecordNum = self.RecordNum + records
+                for line in chunk:
+                    RecordNum += 1
+                    if line.startswith('1\t'):
+                        SentenceID += 1
+                    text.append('%s\t%d\t%s\t%d%s' % (line, RecordNum, DocNum, SentenceID, suffix))
+                text = ''.join(text)
+                self.peak_bytes = max(self.peak_bytes, len(text))
+                self.merged.write(text)
+                records += len(chunk)
+        except Exception:
+            if records > 0:
+                self.merged.seek(start)
+                self.merged.truncate()
+            raise
+        if records == 0: # no tokens
+            return 0
+        self.DocNum += 1
+        self.RecordNum += records
+        self.documents.append((x, records, SentenceID))
+        return records
+
+    def close(self):
+        self.merged.close()
+
+    def memory_summary(self):
+        # the memory used by the merge: the largest chunk of records held, and the peak memory of the process
+        peak = peak_rss_mb()
+        return ("largest chunk of records in memory " + str(round(self.peak_bytes / 1048576.0, 1)) + " MB, peak memory of the process " +
+                (str(round(peak, 1)) + " MB" if peak is not None else "n/a"))
+
+class MergedParquetWriter(MergedConllWriter):
+    # writes the merged table as a typed, compressed, columnar Parquet file instead of a headerless tab separated file,
+    #   so that it can be memory-mapped and read one column at a time (e.g., pandas.read_parquet(path, columns=['lemma', 'POS']))
+    #   Same records as the merged CoNLL table, with the columns named; every row group holds the records of a single document
+    #   (a document longer than chunksize records spans several row groups). Requires pyarrow
+    CONLL_COLUMNS = ['id', 'word', 'lemma', 'POS', 'NER', 'head', 'deprel']
+
+    def __init__(self, merged_file, get_date_flag=0, sep='_', date_field_position=3, date_format='mm-dd-yyyy', chunksize=100000, compression='zstd', extra_columns=()):
+        self.compression = compression
+        self.extra_columns = extra_column_names(extra_columns) # needed by open, called by MergedConllWriter.__init__
+        self.dtypes = conll_dtypes(self.extra_columns)
+        self.peak_rows = 0
+        MergedConllWriter.__init__(self, merged_file, get_date_flag, sep, date_field_position, date_format, chunksize, extra_columns)
+
+    def open(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise Exception("The Parquet output of the merged table requires the pyarrow package (pip install pyarrow).")
+        self.pa = pyarrow
+        fields = [pyarrow.field('id', pyarrow.int32()),
+                  pyarrow.field('word', pyarrow.string()),
+                  pyarrow.field('lemma', pyarrow.string()),
+                  pyarrow.field('POS', pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+                  pyarrow.field('NER', pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+                  pyarrow.field('head', pyarrow.int32()),
+                  pyarrow.field('deprel', pyarrow.dictionary(pyarrow.int32(), pyarrow.string()))]
+        if 'offsets' in self.extra_columns:
+            fields += [pyarrow.field('CharacterOffsetBegin', pyarrow.int32()), pyarrow.field('CharacterOffsetEnd', pyarrow.int32())]
+        if 'ner-spans' in self.extra_columns:
+            fields.append(pyarrow.field('NERSpan', pyarrow.dictionary(pyarrow.int32(), pyarrow.string())))
+        fields += [pyarrow.field('RecordNum', pyarrow.int64()),
+                   pyarrow.field('DocNum', pyarrow.int32()),
+                   pyarrow.field('SentenceID', pyarrow.int32()),
+                   pyarrow.field('name', pyarrow.dictionary(pyarrow.int32(), pyarrow.string()))]
+        if self.get_date_flag == 1:
+            fields.append(pyarrow.field('date', pyarrow.date32()))
+        self.schema = pyarrow.schema(fields)
+        self.merged = pyarrow.parquet.ParquetWriter(self.merged_file, self.schema, compression=self.compression)
+
+    def append(self, x, table, from_file=False, source=None):
+        # the records are parsed into compact columns (see conll_dtypes): int32 ids, categories for the tags and for the name,
+        #   which is the same on every record of a document (the date, one per document, is added by write); the memory of a chunk
+        #   is only measured when it has more records than any before
+        import pandas as pd
+        import numpy as np
+        if x == 'mergedConllTables':
+            return 0
+        if self.get_date_flag == 1:
+            self.date = self.date_parser.date(x)
+        if not from_file:
+            table = io.StringIO(table)
+        try:
+            chunks = read_conll_table(table, self.chunksize, self.dtypes)
+        except pd.errors.EmptyDataError: # no tokens
+            return 0
+        self.DocNum += 1
+        records = 0
+        SentenceID = 0
+        name = pd.Categorical([x])
+        for chunk in chunks:
+            n = chunk.shape[0]
+            columns = chunk.shape[1]
+            sentenceIDs = (SentenceID + np.cumsum(chunk[0].values == 1)).astype(np.int32)
+            SentenceID = sentenceIDs[-1]
+            codes = np.zeros(n, dtype=np.int8) # the name of every record: one category
+            # RecordNum stays int64: a large corpus can have more than 2**31 records
+            chunk.insert(columns, 'RecordNum', np.arange(self.RecordNum + 1, self.RecordNum + n + 1, dtype=np.int64))
+            chunk.insert(columns + 1, 'DocNum', np.full(n, self.DocNum, dtype=np.int32))
+            chunk.insert(columns + 2, 'SentenceID', sentenceIDs)
+            chunk.insert(columns + 3, 'name', pd.Categorical.from_codes(codes, dtype=name.dtype))
+            if n > self.peak_rows:
+                self.peak_rows = n
+                self.peak_bytes = max(self.peak_bytes, int(chunk.memory_usage(index=False, deep=True).sum()))
+            self.write(chunk)
+            self.RecordNum += n
+            records += n
+        self.documents.append((x, records, int(SentenceID)))
+        return records
+
+    def write(self, chunk):
+        import pandas as pd
+        import numpy as np
+        pa = self.pa
+        fields = [field for field in self.schema if field.name != 'date']
+        if chunk.shape[1] != len(fields):
+            names = self.CONLL_COLUMNS + [name for column, names in EXTRA_COLUMNS if column in self.extra_columns for name in names]
+            raise Exception("expected a CoNLL table with " + str(len(names)) + " columns (" + ", ".join(names) + ")")
+        columns = []
+        for column, field in zip(chunk.columns, fields):
+            values = chunk[column]
+            if field.name == 'head': # "_" (e.g., no head without the parse annotator) becomes null; converted once per category
+                heads = pd.to_numeric(pd.Series(values.cat.categories.astype(str)), errors='coerce').values
+                columns.append(pa.array(heads[values.cat.codes.values], type=field.type, from_pandas=True))
+            elif field.name in ('id', 'CharacterOffsetBegin', 'CharacterOffsetEnd'):
+                columns.append(pa.array(values.values, type=field.type))
+            elif hasattr(values, 'cat'): # the categories become the dictionary (or are looked up, for word and lemma) without going through strings
+                dictionary = pa.DictionaryArray.from_arrays(pa.array(values.cat.codes.values.astype(np.int32)), pa.array(values.cat.categories.astype(str), type=pa.string()))
+                columns.append(dictionary if pa.types.is_dictionary(field.type) else dictionary.dictionary_decode())
+            elif pa.types.is_dictionary(field.type):
+                columns.append(pa.array(values.values, type=pa.string()).dictionary_encode().cast(field.type))
+            else:
+                columns.append(pa.array(values.values, type=field.type))
+        if self.get_date_flag == 1: # the date of the document (or null), a single value repeated over the records
+            columns.append(pa.repeat(pa.scalar(self.date, type=pa.date32()), len(chunk)))
+        self.merged.write_table(pa.Table.from_arrays(columns, schema=self.schema), row_group_size=len(chunk))
+
+def shift_record_numbers(data, shift, column):
+    # the records of a merged CoNLL table (bytes) with shift added to their RecordNum, the column-th column from the end;
+    #   a text pass, the tables are not parsed
+    records = []
+    for line in data.split(b'\n'):
+        if line:
+            fields = line.split(b'\t')
+            fields[-column] = str(int(fields[-column]) + shift).encode('ascii')
+            line = b'\t'.join(fields)
+        records.append(line)
+    return b'\n'.join(records)
+
+class MergedTableIndex:
+    # sidecar index of the merged CoNLL table (mergedConllTables.conll.index.jsonl, one JSON object per line), so that the next runs
+    #   can update the merged table instead of rebuilding it (see IncrementalMergedConllWriter):
+    #   a first line with the settings that shape the records (annotation, dates, extra columns), then one line per merged document
+    #   (its name, input path, size, mtime and SHA-256, DocNum, first RecordNum, records, sentences (its last SentenceID),
+    #   and the byte offsets of its records in the merged table; a later line of a document replaces an earlier one)
+    #   and, at the end of every update, a line with the state of the merged table: last RecordNum and DocNum, and its size in bytes.
+    #   The index is usable when the settings are unchanged and the merged table is at least as long as recorded
+    #   (bytes past that, left by a run that did not finish, are cut off)
+    def __init__(self, merged_file, settings):
+        self.merged_file = merged_file
+        self.index_file = merged_file + '.index.jsonl'
+        self.settings = settings
+        self.entries = {} # name -> entry
+        self.state = None
+        header = None
+        if os.path.isfile(self.index_file):
+            with io.open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        line = json.loads(line)
+                    except ValueError: # cut short by a kill
+                        continue
+                    if 'settings' in line:
+                        header = line['settings']
+                    elif 'document' in line:
+                        self.entries[line['document']['name']] = line['document']
+                    elif 'state' in line:
+                        self.state = line['state']
+        self.valid = (header == settings and self.state is not None and os.path.isfile(merged_file) and os.path.getsize(merged_file) >= self.state['bytes'])
+        if not self.valid:
+            self.entries = {}
+            self.state = None
+
+    def unchanged(self, file):
+        # True if the document was merged by an earlier run and its input is unchanged since
+        entry = self.entries.get(document_name(file))
+        return entry is not None and document_unchanged(file, entry)
+
+    def entry(self, file, x, DocNum, first_record, records, sentences, start, end):
+        size, mtime = document_stat(file)
+        return {'name': x, 'input': os.path.abspath(file), 'size': size, 'mtime': mtime, 'sha256': file_sha256(file),
+                'DocNum': DocNum, 'first_record': first_record, 'records': records, 'sentences': sentences, 'start': start, 'end': end}
+
+    def write(self, new_entries, state, rewrite=False):
+        # append the entries of the documents merged by this run and the new state; with rewrite, write the whole index anew
+        #   (written to a temporary file first, so that an interrupted rewrite leaves the old index)
+        for entry in new_entries:
+            self.entries[entry['name']] = entry
+        self.state = state
+        if rewrite or not os.path.isfile(self.index_file):
+            temp_file = self.index_file + '.tmp'
+            with io.open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'settings': self.settings}) + '\n')
+                for entry in sorted(self.entries.values(), key=lambda entry: entry['start']):
+                    f.write(json.dumps({'document': entry}) + '\n')
+                f.write(json.dumps({'state': state}) + '\n')
+            os.replace(temp_file, self.index_file)
+        else:
+            with io.open(self.index_file, 'a', encoding='utf-8') as f:
+                for entry in new_entries:
+                    f.write(json.dumps({'document': entry}) + '\n')
+                f.write(json.dumps({'state': state}) + '\n')
+        self.valid = True
+
+class IncrementalMergedConllWriter(MergedConllWriter):
+    # the merged CoNLL table, updated with the documents of this run when the index (see MergedTableIndex) is usable, rebuilt otherwise:
+    #   the new documents are appended (the merged table is not read), numbered after the last DocNum and RecordNum;
+    #   a changed document (merged before, under the same name) is spliced in place of its old records and keeps its DocNum
+    #   (a document left without records keeps its DocNum, unused, so that a full rebuild would number the documents after it one less).
+    #   The splices are made when the writer is closed: the records before the first changed document are kept, the ones after it
+    #   are copied with their RecordNum shifted by the difference in records (see shift_record_numbers), without parsing the tables.
+    #   The documents of the run are appended in input order; the index is then updated
+    def __init__(self, merged_file, index, get_date_flag=0, sep='_', date_field_position=3, date_format='mm-dd-yyyy', chunksize=100000, extra_columns=()):
+        self.index = index
+        self.new_entries = []
+        self.splices = {} # name -> entry of the new records of a changed document, in the splice file
+        self.splice_writer = None
+        self.appended = 0
+        MergedConllWriter.__init__(self, merged_file, get_date_flag, sep, date_field_position, date_format, chunksize, extra_columns)
+        if index.valid:
+            self.RecordNum = index.state['RecordNum']
+            self.DocNum = index.state['DocNum']
+
+    def open(self):
+        if self.index.valid:
+            with io.open(self.merged_file, 'r+b') as f: # bytes left by a run that did not finish
+                f.truncate(self.index.state['bytes'])
+            self.merged = io.open(self.merged_file, 'a', encoding='utf-8', newline='')
+        else:
+            self.merged = io.open(self.merged_file, 'w', encoding='utf-8', newline='')
+
+    def append(self, x, table, from_file=False, source=None):
+        entry = self.index.entries.get(x)
+        if entry is not None: # a changed document: its new records go to the splice file, numbered as its old ones
+            if self.splice_writer is None:
+                self.splice_writer = MergedConllWriter(self.merged_file + '.splice.tmp', self.get_date_flag, self.sep, self.date_field_position, self.date_format, self.chunksize, self.extra_columns)
+                self.splice_writer.date_parser = self.date_parser
+            self.splice_writer.DocNum = entry['DocNum'] - 1
+            self.splice_writer.RecordNum = entry['first_record'] - 1
+            start = self.splice_writer.merged.tell()
+            records = self.splice_writer.append(x, table, from_file)
+            self.splices[x] = self.index.entry(source, x, entry['DocNum'], entry['first_record'], records,
+                                               self.splice_writer.documents[-1][2] if records > 0 else 0, start, self.splice_writer.merged.tell())
+            return records
+        start = self.merged.tell()
+        records = MergedConllWriter.append(self, x, table, from_file)
+        if records > 0:
+            self.new_entries.append(self.index.entry(source, x, self.DocNum, self.RecordNum - records + 1, records, self.documents[-1][2], start, self.merged.tell()))
+            self.appended += 1
+        return records
+
+    def close(self):
+        MergedConllWriter.close(self)
+        if self.splice_writer is not None:
+            self.splice_writer.close()
+            self.peak_bytes = max(self.peak_bytes, self.splice_writer.peak_bytes)
+            self.splice()
+        state = {'RecordNum': self.RecordNum, 'DocNum': self.DocNum, 'bytes': os.path.getsize(self.merged_file),
+                 'updated': datetime.datetime.now().isoformat(timespec='seconds')}
+        self.index.write(self.new_entries, state, rewrite=len(self.splices) > 0 or not self.index.valid)
+
+    def splice(self):
+        # rewrite the merged table with the new records of the changed documents (see the class)
+        column = 5 if self.get_date_flag == 1 else 4 # RecordNum, from the end: RecordNum, DocNum, SentenceID, name (, date)
+        entries = sorted(list(self.index.entries.values()) + self.new_entries, key=lambda entry: entry['start'])
+        temp_file = self.merged_file + '.tmp'
+        shift = 0
+        spliced = []
+        with io.open(self.merged_file, 'rb') as merged, io.open(self.merged_file + '.splice.tmp', 'rb') as splices, io.open(temp_file, 'wb') as output:
+            for entry in entries:
+                if entry['name'] in self.splices:
+                    new_entry = self.splices[entry['name']]
+                    splices.seek(new_entry['start'])
+                    data = splices.read(new_entry['end'] - new_entry['start'])
+                    new_entry['first_record'] += shift
+                    shift_before = shift
+                    shift += new_entry['records'] - entry['records']
+                    entry = new_entry # a document without records any more keeps its (empty) place and its DocNum
+                else:
+                    merged.seek(entry['start'])
+                    data = merged.read(entry['end'] - entry['start'])
+                    entry = dict(entry, first_record=entry['first_record'] + shift)
+                    shift_before = shift
+                if shift_before != 0:
+                    data = shift_record_numbers(data, shift_before, column)
+                start = output.tell()
+                output.write(data)
+                spliced.append(dict(entry, start=start, end=output.tell()))
+        os.replace(temp_file, self.merged_file)
+        os.remove(self.merged_file + '.splice.tmp')
+        self.RecordNum += shift
+        self.index.entries = dict((entry['name'], entry) for entry in spliced)
+        self.new_entries = []
+
+def merged_table_writer(output_path, merge_format='conll', get_date_flag=0, sep='_', date_field_position=3, date_format='mm-dd-yyyy', extra_columns=(), index=None):
+    # the writer of the merged table in output_path: mergedConllTables.conll (merge_format 'conll') or mergedConllTables.parquet ('parquet');
+    #   extra_columns: the extra columns of the CoNLL tables (see EXTRA_COLUMNS), named in the Parquet file
+    #   index: with the merged CoNLL table, its index (see MergedTableIndex), for a merged table updated rather than rebuilt
+    if merge_format == 'parquet':
+        return MergedParquetWriter(os.path.join(output_path,"mergedConllTables.parquet"), get_date_flag, sep, date_field_position, date_format, extra_columns=extra_columns)
+    if index is not None:
+        return IncrementalMergedConllWriter(os.path.join(output_path,"mergedConllTables.conll"), index, get_date_flag, sep, date_field_position, date_format, extra_columns=extra_columns)
+    return MergedConllWriter(os.path.join(output_path,"mergedConllTables.conll"), get_date_flag, sep, date_field_position, date_format, extra_columns=extra_columns)
+
+#Annotator presets: the annotators run by the server. parse (the constituency parser) is by far the most expensive in time and memory;
+#   depparse (the neural dependency parser) fills the same head and deprel columns of the CoNLL table much faster.
+#   Without a parser, the head and deprel columns are "_" (and without ner, so is NER)
+ANNOTATOR_PRESETS = {'parse': 'tokenize,ssplit,pos,lemma, ner,parse',
+                     'depparse': 'tokenize,ssplit,pos,lemma,ner,depparse',
+                     'ner': 'tokenize,ssplit,pos,lemma,ner',
+                     'pos-lemma': 'tokenize,ssplit,pos,lemma'}
+
+#Heap needed by the annotators: GB for the models, MB per KB of text of each document being annotated (rough figures;
+#   the constituency parser's memory grows much faster with the length of the sentences than the others')
+ANNOTATOR_HEAP = [('parse', 3, 2.0), ('depparse', 2, 0.5), ('ner', 2, 0.3), ('lemma', 1, 0.2)]
+
+def available_memory_gb():
+    # the memory available for new processes in GB (MemAvailable on Linux), or None when it cannot be found
+    try:
+        with io.open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1048576.0
+    except (IOError, OSError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 1073741824.0
+    except (ValueError, AttributeError, OSError):
+        pass
+    try: # Windows
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong), ('ullTotalPhys', ctypes.c_ulonglong),
+                        ('ullAvailPhys', ctypes.c_ulonglong), ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong), ('sullAvailExtendedVirtual', ctypes.c_ulonglong)]
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+        return status.ullAvailPhys / 1073741824.0
+    except Exception:
+        return None
+
+def profile_corpus(InputDocs, annotators, num_servers=1, chunk_size=0):
+    # pre-flight profile of the corpus and of the machine: the size distribution of the documents, the memory available and the cores,
+    #   and the heap (GB per server) and parallel requests (per server) that fit them:
+    #   parallel requests up to the cores shared by the servers, the heap for the models plus the largest request (document or chunk)
+    #   being annotated by every parallel request; parallel requests are reduced until num_servers heaps fit in 75% of the memory available
+    import numpy as np
+    sizes = np.array([document_size(file) for file in InputDocs] or [0], dtype=np.int64)
+    cores = os.cpu_count() or 1
+    memory = available_memory_gb()
+    base_gb, mb_per_kb = 1, 0.2
+    for annotator, base, per_kb in ANNOTATOR_HEAP:
+        if annotator in annotators.replace(' ', '').split(','):
+            base_gb, mb_per_kb = base, per_kb
+            break
+    largest_kb = sizes.max() / 1024.0
+    if chunk_size > 0:
+        largest_kb = min(largest_kb, chunk_size / 1024.0)
+    threads = max(1, cores // max(1, num_servers))
+
+    def heap(threads):
+        return int(np.ceil(base_gb + threads * largest_kb * mb_per_kb / 1024.0))
+    if memory is not None:
+        while threads > 1 and heap(threads) * num_servers > 0.75 * memory:
+            threads -= 1
+    assigned_memory = heap(threads)
+    warning = None
+    if memory is not None and assigned_memory * num_servers > 0.75 * memory:
+        warning = ("The largest document (" + str(int(largest_kb)) + " KB) may need more memory than is available; "
+                   "consider splitting the documents (chunk size), fewer servers or a lighter annotator preset.")
+    return {'documents': len(InputDocs), 'megabytes': round(sizes.sum() / 1048576.0, 3),
+            'kb_p50': round(np.percentile(sizes, 50) / 1024.0, 1), 'kb_p90': round(np.percentile(sizes, 90) / 1024.0, 1),
+            'kb_max': round(sizes.max() / 1024.0, 1), 'cores': cores, 'available_gb': round(memory, 1) if memory is not None else None,
+            'assigned_memory': assigned_memory, 'parallel_requests': threads, 'warning': warning}
+
+def write_run_metadata(output_path, metadata):
+    # the configuration of a run, appended as a JSON line to corenlp_runs.jsonl in the output directory
+    with io.open(os.path.join(output_path, 'corenlp_runs.jsonl'), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(metadata) + '\n')
+
+def extra_column_names(extra_columns):
+    # the extra columns (a comma separated list or a list of names of EXTRA_COLUMNS), in the order of EXTRA_COLUMNS
+    if isinstance(extra_columns, str):
+        extra_columns = [column.strip() for column in extra_columns.split(',') if column.strip()]
+    for column in extra_columns:
+        if column not in dict(EXTRA_COLUMNS):
+            raise Exception("Unknown extra column " + column + " (" + ", ".join(name for name, columns in EXTRA_COLUMNS) + ").")
+    return [name for name, columns in EXTRA_COLUMNS if name in extra_columns]
+
+def corenlp_properties(annotators, output_path, output_format='conll', extra_columns=()):
+    # the preferences (properties) passed to CoreNLP; annotators: a preset (see ANNOTATOR_PRESETS) or a list of annotators
+    #   output_format: the format in which the server returns the annotations (see OUTPUT_FORMATS);
+    #   extra_columns: the extra columns of the CoNLL tables (see EXTRA_COLUMNS), only with the json and protobuf formats
+    if output_format not in OUTPUT_FORMATS:
+        raise Exception("Unknown output format " + str(output_format) + " (" + ", ".join(OUTPUT_FORMATS) + ").")
+    extra_columns = extra_column_names(extra_columns)
+    if len(extra_columns) > 0 and output_format == 'conll':
+        raise Exception("The extra columns (" + ", ".join(extra_columns) + ") require the json or protobuf output format.")
+    properties = {
+        'annotators': ANNOTATOR_PRESETS.get(annotators, annotators),
+        'outputFormat': 'conll',
+        'timeout': '999999',
+        'outputDirectory': output_path,
+        'replaceExtension': True
+    }
+    properties.update(OUTPUT_FORMATS[output_format])
+    if len(extra_columns) > 0:
+        properties['conllExtraColumns'] = ','.join(extra_columns) # not sent to the server (see annotate_text); part of the cache key
+    return properties
+
+#The texts of the documents not found in the annotation cache are kept from the lookup until they are sent to the server,
+#   no more than prefetch texts (as many as DocumentPrefetcher holds) and this many characters; the others are read (and normalized)
+#   again when they are sent
+MISS_TEXT_CHARS = 16 * 1048576
+
+def RunCoreNLP(stanford_core_nlp_path, input_path, output_path, assigned_memory, merge_file_flag,get_date_flag=0,sep='_',date_field_position=3,date_format='mm-dd-yyyy',file_name='',parallel_requests=4,num_servers=1,keep_server_alive=0,idle_timeout=30,server_url='',use_cache=1,cache_dir='',cache_size_mb=1024,write_conll_files=1,merge_format='conll',unicode_policy='transliterate',chunk_size=0,resume=0,max_retries=3,annotators='parse',batch_bytes=0,recursive=1,prefetch=16,output_format='conll',extra_columns='',incremental_merge=0,progress=None,cancel=None):
+    # assigned_memory: the heap of each CoreNLP server in GB, or 'auto' to choose it from the corpus and the memory available (see profile_corpus)
+    # parallel_requests: the number of documents sent to each CoreNLP server at the same time (1 = one document at a time),
+    #   or 'auto' to choose it from the cores and the memory available
+    # num_servers: the number of CoreNLP servers (JVMs) started, each on its own port and with assigned_memory GB of heap
+    # keep_server_alive: 1 to leave the server(s) running at the end of the run and re-use the ones left running by earlier runs,
+    #   skipping the loading of the models; they are shut down after idle_timeout minutes without use
+    # server_url: the URL of an already running CoreNLP server to use instead of starting one (e.g., http://localhost:9000)
+    # use_cache: 1 to take the CoNLL tables of unchanged documents from the annotation cache instead of the server;
+    #   the cache is kept in cache_dir (by default the corenlp_cache subdirectory of the output directory) and limited to cache_size_mb MB
+    # write_conll_files: 1 to write the CoNLL table of each document to the output directory (<name>.txt.conll);
+    #   with merge_file_flag 1 and write_conll_files 0, only the merged table is written
+    # merge_format: 'conll' for the merged table as a tab separated file (mergedConllTables.conll),
+    #   'parquet' for a typed, compressed, columnar file (mergedConllTables.parquet; requires pyarrow)
+    # unicode_policy: what happens to the non-ASCII characters of the input documents (see normalize_text):
+    #   'transliterate' to ASCII, keep them ('unicode') or drop them ('ascii')
+    # chunk_size: documents longer than chunk_size characters are sent to the server in chunks of at most chunk_size characters,
+    #   cut at paragraph breaks or at the ends of the sentences found by the server (see split_text) and annotated in parallel
+    #   (up to parallel_requests at a time); 0 to send every document whole. The CoNLL table is the one of the whole document,
+    #   except for a sentence longer than chunk_size, cut at a space (its parts are numbered as separate sentences).
+    #   The parse annotator needs much more memory and time on long documents; chunks keep a single long document from running
+    #   the server out of memory
+    # batch_bytes: documents smaller than batch_bytes bytes are sent to the server several at a time, up to batch_bytes per request
+    #   (see annotate_batch), which saves the per request overhead on corpora of short documents; 0 to send every document on its own
+    # recursive: 1 to take the *.txt files of the subdirectories of input_path too; the *.txt files in zip and tar archives are read in place
+    #   (see find_documents). The encoding of each file is detected (see decode_text)
+    # prefetch: the number of documents read (and normalized) ahead of the annotation (see DocumentPrefetcher)
+    # resume: 1 to skip the documents completed by earlier runs in output_path and unchanged since (see RunManifest),
+    #   taking their CoNLL tables from the output directory, and to retry the documents that failed, up to max_retries times;
+    #   every completed document is recorded in corenlp_manifest.jsonl in output_path, resume or not
+    # annotators: an annotator preset (see ANNOTATOR_PRESETS: 'parse', 'depparse', 'ner' or 'pos-lemma')
+    #   or a comma separated list of CoreNLP annotators
+    # output_format: the format in which the server returns the annotations, converted to CoNLL tables here when not conll
+    #   (see OUTPUT_FORMATS: 'conll', 'json' or 'protobuf'; protobuf requires the stanza package)
+    # extra_columns: with the json and protobuf formats, the columns added after the 7 CoNLL columns (see EXTRA_COLUMNS),
+    #   a comma separated list of 'offsets' (the character offsets of each token) and 'ner-spans' (the named entity mentions, in BIO form)
+    # incremental_merge: 1 to update the merged CoNLL table of an earlier run instead of rebuilding it (see IncrementalMergedConllWriter):
+    #   the documents merged by earlier runs and unchanged since are neither annotated nor merged again, the new ones are appended
+    #   and the changed ones replaced; the merged table is rebuilt when the annotation or merge settings changed. Not with merge_format 'parquet'
+    # the configuration used (with the profile of the corpus) is appended to corenlp_runs.jsonl in output_path
+    # progress: a function called with (event, data) as the run goes (e.g., by the GUI, to show a progress bar):
+    #   ('status', {'message'}), ('start', {'documents'}) once the servers are ready,
+    #   ('annotating', {'name', 'port'}) when a document is sent to a server (called from the worker threads),
+    #   ('document', {'name', 'ok', 'error', 'tokens', 'done', 'documents'}) for each document, in input order,
+    #   ('finish', {'processed', 'failed', 'cancelled', 'documents'}) at the end
+    # cancel: a threading.Event; when set, the documents already sent to the servers are completed (and merged),
+    #   the others are reported as cancelled and the run ends normally
+    # returns a summary of the run: {'documents', 'processed', 'failed', 'cancelled', 'merged_file'}, where failed and cancelled
+    #   are the names of the documents; the run stops with an exception when no CoreNLP server can be started
+    if progress is None:
+        progress = lambda event, data: None
+    
+    stanford_core_nlp_path = os.path.join(stanford_core_nlp_path,'*')
+
+    #All the *.txt files of the input directory and of its subdirectories (with recursive), including those in zip and tar archives
+    #   (all-files-in-dir mode), or the file file_name (one-file mode)
+    InputDocs = find_documents(input_path, file_name, recursive == 1)
+
+    #Check that the input directory contains txt files; stop otherwise
+    summary = {'documents': len(InputDocs), 'processed': 0, 'failed': [], 'cancelled': [], 'merged_file': None}
+    if len(InputDocs)==0:
+        print ("There are no txt files in the input directory " + str(input_path) + ". Program will exit.")
+        return summary
+
+    properties = corenlp_properties(annotators, output_path, output_format, extra_columns)
+
+    #Pre-flight profile: heap and parallel requests chosen from the corpus and the machine when 'auto'
+    profile = profile_corpus(InputDocs, properties['annotators'], max(1, num_servers), chunk_size)
+    if assigned_memory == 'auto' or parallel_requests == 'auto':
+        print("Corpus: " + str(profile['documents']) + " documents, " + str(profile['megabytes']) + " MB (median " + str(profile['kb_p50']) +
+              " KB, 90th percentile " + str(profile['kb_p90']) + " KB, largest " + str(profile['kb_max']) + " KB); " + str(profile['cores']) +
+              " cores, " + (str(profile['available_gb']) + " GB" if profile['available_gb'] is not None else "unknown memory") + " available")
+        if assigned_memory == 'auto':
+            assigned_memory = profile['assigned_memory']
+        if parallel_requests == 'auto':
+            parallel_requests = profile['parallel_requests']
+        print("Using " + str(assigned_memory) + " GB of heap per server and " + str(parallel_requests) + " parallel requests per server.")
+        if profile['warning']:
+            print(profile['warning'])
+    assigned_memory = int(assigned_memory)
+    parallel_requests = int(parallel_requests)
+
+    if merge_file_flag != 1 and write_conll_files != 1:
+        print("Without a merged CoNLL table, the CoNLL table of each document is written to the output directory.")
+        write_conll_files = 1
+    conll_output_path = output_path if write_conll_files == 1 else None
+    merged = None
+    merged_index = None
+    if merge_file_flag == 1:
+        if incremental_merge == 1 and merge_format == 'conll':
+            #the settings that shape the records of the merged table; when any of them changed, the merged table is rebuilt
+            merged_index = MergedTableIndex(os.path.join(output_path, "mergedConllTables.conll"),
+                                            {'properties': dict((k, v) for k, v in properties.items() if k not in ('outputDirectory', 'replaceExtension', 'timeout')),
+                                             'corenlp': server_url or corenlp_version(os.path.dirname(stanford_core_nlp_path)),
+                                             'unicode_policy': unicode_policy, 'chunk_size': chunk_size, 'get_date_flag': get_date_flag,
+                                             'sep': sep, 'date_field_position': date_field_position, 'date_format': date_format,
+                                             'extra_columns': extra_column_names(extra_columns)})
+        elif incremental_merge == 1:
+            print("The merged Parquet table cannot be updated in place; it is rebuilt.")
+        merged = merged_table_writer(output_path, merge_format, get_date_flag, sep, date_field_position, date_format, extra_columns, merged_index)
+        if merged.date_parser is not None: #the dates of all the documents are parsed at once, before the run
+            merged.date_parser.parse_all([document_name(file) for file in InputDocs])
+
+    #With resume, the documents completed by an earlier run are taken from their CoNLL tables in the output directory
+    #   (a document that was only merged is re-annotated, or taken from the cache)
+    #   and the documents that failed max_retries times are not sent again.
+    #   Documents whose text and properties are unchanged since an earlier run are taken from the annotation cache;
+    #   only the others (the misses) are sent to the server, which is not even started when there are none
+    manifest = RunManifest(output_path, properties_hash(properties, unicode_policy, chunk_size))
+    cache = None
+    completed = {}
+    if use_cache == 1:
+        cache = AnnotationCache(cache_dir or os.path.join(output_path, 'corenlp_cache'), cache_size_mb * 1048576, corenlp_version(os.path.dirname(stanford_core_nlp_path)) if server_url == '' else server_url)
+    misses = []
+    resumed = 0
+    if merged_index is not None:
+        #the documents merged by earlier runs and unchanged since stay in the merged table as they are
+        for index in range(len(InputDocs)):
+            if merged_index.valid and merged_index.unchanged(InputDocs[index]):
+                completed[index] = (document_name(InputDocs[index]), None, None, {'source': 'merged'})
+        if merged_index.valid:
+            print("Incremental merge: " + str(len(completed)) + " of " + str(len(InputDocs)) + " input documents are already in the merged table and unchanged.")
+        else:
+            print("Incremental merge: no usable index of the merged table (first run, or the settings changed); the merged table is rebuilt.")
+    for index in range(len(InputDocs)):
+        if index in completed:
+            continue
+        if resume == 1:
+            status, detail = manifest.resume_status(InputDocs[index], max_retries)
+            if status == 'failed':
+                completed[index] = (document_name(InputDocs[index]), None, 'failed ' + str(max_retries) + ' times, not retried (' + str(detail) + ')', {'source': 'resume'})
+                continue
+            if status == 'done' and detail is not None and os.path.isfile(detail):
+                with io.open(detail, 'r', encoding='utf-8') as f:
+                    completed[index] = (document_name(InputDocs[index]), f.read(), None, {'source': 'resume', 'bytes': document_size(InputDocs[index])})
+                resumed += 1
+                continue
+        misses.append(index)
+    miss_texts = {} # the texts of the misses read for the cache lookup, kept (up to prefetch texts, MISS_TEXT_CHARS) so that they are not read again
+    if cache is not None:
+        #the texts are read ahead (see DocumentPrefetcher) while the cache is looked up
+        prefetcher = DocumentPrefetcher([InputDocs[index] for index in misses], unicode_policy, prefetch)
+        checked = misses
+        misses = []
+        kept_chars = 0
+        for index in checked:
+            output = None
+            text = None
+            try:
+                text = prefetcher.read(InputDocs[index])
+                output = cache.get(cache.key(text, properties, chunk_size))
+            except (IOError, OSError):
+                pass
+            if output is None:
+                misses.append(index)
+                if text is not None and len(miss_texts) < prefetch and kept_chars + len(text) <= MISS_TEXT_CHARS:
+                    miss_texts[InputDocs[index]] = text
+                    kept_chars += len(text)
+                continue
+            x = document_name(InputDocs[index])
+            if conll_output_path is not None:
+                write_conll_table(output, conll_output_path, x)
+            completed[index] = (x, output, None, {'source': 'cache', 'bytes': document_size(InputDocs[index])})
+            manifest.record(InputDocs[index], 'done', output=os.path.join(conll_output_path, x) + '.conll' if conll_output_path is not None else None)
+        prefetcher.close()
+    if resume == 1:
+        print("Resuming: " + str(resumed) + " input documents were completed by earlier runs.")
+
+    metrics = RunMetrics(output_path)
+    write_run_metadata(output_path, {'run': metrics.run, 'input_path': os.path.abspath(input_path), 'output_path': os.path.abspath(output_path),
+                                     'corenlp': server_url or corenlp_version(os.path.dirname(stanford_core_nlp_path)), 'annotators': properties['annotators'],
+                                     'properties': dict((k, v) for k, v in properties.items() if k != 'outputDirectory'),
+                                     'assigned_memory': assigned_memory, 'parallel_requests': parallel_requests, 'num_servers': max(1, num_servers),
+                                     'keep_server_alive': keep_server_alive, 'output_format': output_format, 'chunk_size': chunk_size, 'batch_bytes': batch_bytes, 'unicode_policy': unicode_policy,
+                                     'use_cache': use_cache, 'write_conll_files': write_conll_files,
+                                     'merge_format': merge_format if merge_file_flag == 1 else None, 'resume': resume,
+                                     'documents': len(InputDocs), 'to_annotate': len(misses), 'profile': profile})
+
+    #The servers are released (and the merged table closed) however the run ends: on an exception (or when the program is interrupted)
+    #   the workers stop taking documents and the servers started by this run are killed rather than left running
+    if cancel is None:
+        cancel = threading.Event()
+    servers = []
+    session = None
+    heartbeat = None
+    prefetcher = None
+    finished = False
+    try:
+        if len(misses) > 0:
+            #Launch the CoreNLP server(s) and wait until they are ready; no fixed wait, startup takes as long as the JVMs need
+            progress('status', {'message': "Starting the Stanford CoreNLP server(s)..."})
+            servers = acquire_servers(stanford_core_nlp_path, assigned_memory, max(1, num_servers), properties, keep_server_alive, idle_timeout, server_url)
+            if len(servers) == 0:
+                print ("No Stanford CoreNLP server could be started. Program will exit.")
+                raise RuntimeError("No Stanford CoreNLP server could be started.")
+        
+        startTime = time.localtime()
+        print("")
+        print("Started running Stanford CoreNLP at " + str(startTime[3]) + ':' + str(startTime[4])) #Prints start time for future reference
+        progress('start', {'documents': len(InputDocs)})
+
+        #The loop below hands each *.txt file in the input directory to a pool of worker threads which pass the text to our local CoreNLP server(s).
+        #   Up to parallel_requests documents are in flight on each server at the same time so that the servers' worker threads are kept busy.
+        #   The documents are spread over the servers by size (see schedule_documents).
+        #   The server then returns our ConLL table in a tab separated format which is then saved as a *.ConLL file
+        #   and appended to the merged ConLL table right away, so that the tables are never read back from disk.
+        #   Results are reported (and merged) in the order of InputDocs (not in the order in which they complete) so that the run summary
+        #   and the merged table are deterministic
+        i = 0.0
+        CorrectlyProcessedFileNames = []
+        FailedFileNames = []
+        CancelledFileNames = []
+        session = get_http_session(parallel_requests, len(servers))
+        queues = schedule_documents(InputDocs, len(servers), misses)
+        #the documents are read ahead in the order in which the workers are expected to take them: in turn from each server's queue
+        order = []
+        for k in range(max([len(q) for q in queues] or [0])):
+            order.extend(InputDocs[q[k]] for q in queues if k < len(q) and InputDocs[q[k]] not in miss_texts)
+        prefetcher = DocumentPrefetcher(order, unicode_policy, prefetch)
+        def read_miss(file, unicode_policy=None):
+            text = miss_texts.pop(file, None)
+            return text if text is not None else prefetcher.read(file)
+        heartbeat = start_registry_heartbeat(servers)
+        runStart = time.time()
+        results = dispatch_documents(servers, queues, InputDocs, session, conll_output_path, properties, parallel_requests, cache, unicode_policy, chunk_size, batch_bytes, progress=progress, cancel=cancel, reader=read_miss)
+        next_doc = 0
+        while next_doc < len(InputDocs):
+            if next_doc not in completed:
+                index, x, output, error, document_metrics = next(results)
+                document_metrics['source'] = 'server'
+                completed[index] = (x, output, error, document_metrics)
+                if error != 'cancelled': # recorded as soon as completed, not in input order, so that nothing is lost if the run is killed
+                    manifest.record(InputDocs[index], 'done' if error is None else 'failed', document_metrics['seconds'], os.path.join(conll_output_path, x) + '.conll' if error is None and conll_output_path is not None else None, error)
+                continue
+            x, output, error, document_metrics = completed.pop(next_doc)
+            next_doc += 1
+            i += 1
+            if document_metrics.get('source') == 'merged': #already in the merged table (see incremental_merge)
+                CorrectlyProcessedFileNames.append(x)
+                if int(100 * i / len(InputDocs)) != int(100 * (i - 1) / len(InputDocs)):
+                    print(str(int(100 * i / len(InputDocs))) + "% Complete")
+                progress('document', {'name': x, 'ok': True, 'error': None, 'tokens': 0, 'done': int(i), 'documents': len(InputDocs)})
+                continue
+            if error is None and merged is not None:
+                start = time.time()
+                try:
+                    merged.append(x, output, source=InputDocs[next_doc - 1])
+                except Exception as e:
+                    error = 'the CoNLL table could not be merged (' + str(e) + ')'
+                document_metrics['merge'] = time.time() - start
+            metrics.record(x, document_metrics, output if error is None else None, error)
+            if error is None:
+                print(("Wrote CoNLL table: " if conll_output_path is not None else "Merged CoNLL table: ") + x)
+                CorrectlyProcessedFileNames.append(x)
+            elif error == 'cancelled':
+                CancelledFileNames.append(x)
+            else:
+                print("")
+                print("Could not create CoNLL table for " + "\""+x+"\""+'. Message returned by Stanford server: '+"\""+error+"\"")
+                print("")
+                FailedFileNames.append(x)
+            if int(100 * i / len(InputDocs)) != int(100 * (i - 1) / len(InputDocs)):
+                print(str(int(100 * i / len(InputDocs))) + "% Complete") #Rough progress bar for reference mid-run (once per percent)
+            progress('document', {'name': x, 'ok': error is None, 'error': error, 'tokens': count_tokens(output) if error is None else 0, 'done': int(i), 'documents': len(InputDocs)})
+        finished = True
+    finally:
+        if not finished:
+            cancel.set()
+        if session is not None:
+            session.close()
+        if heartbeat is not None:
+            heartbeat.set()
+        if prefetcher is not None:
+            prefetcher.close()
+        manifest.close()
+        if merged is not None:
+            merged.close()
+        for server in servers:
+            server.release() #Servers are killed before entire procedure is completed since we no longer need them (unless kept alive for the next run)
+        close_archives()
+        if not finished:
+            metrics.close()
+            if merged is not None and merged.DocNum == 0: #not the merged table of an earlier run (see incremental_merge)
+                os.remove(merged.merged_file)
+    runSeconds = time.time() - runStart
+    endTime = time.localtime()
+    print("")
+    print("Finished running Stanford CoreNLP at " + str(endTime[3]) + ':' + str(endTime[4]))    #Time when ConLL tables finished computing, for future reference
+    print(str(len(CorrectlyProcessedFileNames)) + " of " + str(len(InputDocs)) + " input documents were processed correctly.")
+    if len(FailedFileNames) > 0:
+        print("No CoNLL table was produced for: " + ", ".join(FailedFileNames))
+    if len(CancelledFileNames) > 0:
+        print("The run was cancelled before " + str(len(CancelledFileNames)) + " input documents were processed.")
+    progress('finish', {'processed': len(CorrectlyProcessedFileNames), 'failed': len(FailedFileNames), 'cancelled': len(CancelledFileNames), 'documents': len(InputDocs)})
+    if cache is not None:
+        print(cache.summary())
+    for line in metrics.summary(runSeconds):
+        print(line)
+    metrics.close()
+    print("Per document metrics written to " + metrics.metrics_file)
+    summary.update({'processed': len(CorrectlyProcessedFileNames), 'failed': FailedFileNames, 'cancelled': CancelledFileNames})
+
+    if (len(CorrectlyProcessedFileNames) ==0):
+        print(str(len(InputDocs)) + " input documents were processed. No CoNLL table was produced! Program will exit.")
+        if merged is not None and merged.DocNum == 0:
+            os.remove(merged.merged_file)
+        return summary
+
+    if merged is not None:
+        if merged.DocNum == 0: #no tables were merged
+            os.remove(merged.merged_file)
+            print ("No CoNLL tables produced for the input txt documents. No merged table produced.")
+            return summary
+        summary['merged_file'] = merged.merged_file
+        print("Merged " + str(merged.DocNum) + " CoNLL tables (" + str(merged.RecordNum) + " records) into " + merged.merged_file)
+        if merged_index is not None:
+            print("Incremental merge: " + str(merged.appended) + " CoNLL tables appended, " + str(len(merged.splices)) + " replaced; index written to " + merged_index.index_file)
+        print("Merge memory: " + merged.memory_summary())
+        if merged.date_parser is not None and len(merged.date_parser.failures) > 0:
+            merged.date_parser.write_failures(os.path.join(output_path, 'date_failures.tsv'))
+            print("No " + date_format + " date was found in the name of " + str(len(merged.date_parser.failures)) + " of " + str(len(InputDocs)) +
+                  " input documents (their date is empty); see " + os.path.join(output_path, 'date_failures.tsv'))
+        
+    return summary
+    
+def write_json_file(json_file, entry, suffix='tmp'):
+    # write to a temporary file first so that a reader never sees a half-written file;
+    #   suffix keeps the temporary files of different writers (e.g., queue workers on different hosts) apart
+    temp_file = json_file + '.' + suffix + '.tmp'
+    with io.open(temp_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(entry))
+    os.replace(temp_file, json_file)
+
+def read_json_file(json_file):
+    try:
+        with io.open(json_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+class WorkQueue:
+    # a queue of documents in a shared directory, drained by worker processes on one or several hosts (see RunCoreNLPQueue);
+    #   nothing but the shared filesystem is needed: every change of state is the atomic rename of a small JSON file.
+    #   <queue_dir>/queue.json                    the settings of the queue (input, annotators, ...), written by the process that created it
+    #   <queue_dir>/tasks/<id>.json               the documents waiting to be annotated
+    #   <queue_dir>/leases/<id>.<worker>.json     the documents claimed by a worker; the modification time of the file is the heartbeat
+    #   <queue_dir>/done/<id>.<worker>.json       the documents annotated; their CoNLL tables are in <queue_dir>/conll/<name>.conll
+    #   <queue_dir>/failed/<id>.<worker>.json     the documents that failed max_attempts times
+    #   <queue_dir>/workers/<worker>.json         the workers, with their counts (and their metrics in workers/<worker>/)
+    #   A worker claims a document by renaming its task to a lease with its own name, and renews its leases every lease_seconds / 5 seconds.
+    #   A lease not renewed for lease_seconds (the worker died or hung) is reclaimed by any other process: the document goes back
+    #   to the tasks, and counts as a failed attempt. The worker releases a lease by renaming it to done (or back to the tasks after a failure);
+    #   the rename fails when the lease was reclaimed, so that a document is recorded as done once and only once.
+    #   Time is measured with the clock of the shared filesystem (the modification time of a file just touched), not with the clocks of the hosts
+    STATES = ('tasks', 'leases', 'done', 'failed')
+
+    def __init__(self, queue_dir, worker=None, lease_seconds=300):
+        self.queue_dir = queue_dir
+        self.worker = worker or re.sub('[^A-Za-z0-9-]', '-', socket.gethostname()) + '-' + str(os.getpid())
+        self.lease_seconds = lease_seconds
+        self.queue_file = os.path.join(queue_dir, 'queue.json')
+        self.worker_file = os.path.join(queue_dir, 'workers', self.worker + '.json')
+        self.conll_path = os.path.join(queue_dir, 'conll')
+        self.held = {} # lease file -> task, for the leases held by this process
+        self.counts = {'done': 0, 'failed': 0}
+        self.lock = threading.Lock()
+        for state in self.STATES + ('workers', 'conll'):
+            os.makedirs(os.path.join(queue_dir, state), exist_ok=True)
+
+    def path(self, state, task_id, worker=None):
+        return os.path.join(self.queue_dir, state, task_id + ('.' + worker if worker else '') + '.json')
+
+    def create(self, documents, settings):
+        # enqueue the documents (a list of (name, size)) with the settings of the queue; only the first process to get here does it
+        #   returns False when the queue was already created (by another process or by an earlier run)
+        try:
+            os.close(os.open(os.path.join(self.queue_dir, 'create.lock'), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        for index, (name, size) in enumerate(documents):
+            task_id = '%08d' % index
+            write_json_file(self.path('tasks', task_id), {'id': task_id, 'index': index, 'name': name, 'size': size, 'attempts': 0}, self.worker)
+        settings = dict(settings, documents=len(documents), created=datetime.datetime.now().isoformat(timespec='seconds'), created_by=self.worker)
+        write_json_file(self.queue_file, settings, self.worker) # written last: the workers wait for it (see settings)
+        return True
+
+    def settings(self, timeout=None, interval=2):
+        # the settings of the queue, once it has been created; None after timeout seconds without a queue
+        start = time.time()
+        while True:
+            settings = read_json_file(self.queue_file)
+            if settings is not None:
+                self.lease_seconds = settings.get('lease_seconds', self.lease_seconds)
+                return settings
+            if timeout is not None and time.time() - start > timeout:
+                return None
+            time.sleep(interval)
+
+    def now(self):
+        # the time of the shared filesystem: the modification time of this process's worker file, just touched
+        with self.lock:
+            entry = {'worker': self.worker, 'host': socket.gethostname(), 'pid': os.getpid(), 'leases': len(self.held),
+                     'done': self.counts['done'], 'failed': self.counts['failed']}
+        write_json_file(self.worker_file, entry, self.worker)
+        return os.stat(self.worker_file).st_mtime
+
+    def files(self, state):
+        return sorted(f for f in os.listdir(os.path.join(self.queue_dir, state)) if f.endswith('.json'))
+
+    def status(self):
+        # the number of documents in each state
+        return dict((state, len(self.files(state))) for state in self.STATES)
+
+    def drained(self):
+        # True when no document is waiting nor being annotated
+        return len(self.files('tasks')) == 0 and len(self.files('leases')) == 0
+
+    def claim(self, n):
+        # up to n documents for this worker; the tasks are scanned from a random place, so that workers starting together do not
+        #   all race for the same files (a worker that loses a race simply moves on to the next task)
+        tasks = []
+        waiting = self.files('tasks')
+        start = random.randrange(len(waiting)) if len(waiting) > 0 else 0
+        for task_file in waiting[start:] + waiting[:start]:
+            if len(tasks) == n:
+                break
+            task_id = task_file[:-len('.json')]
+            lease = self.path('leases', task_id, self.worker)
+            try:
+                os.utime(os.path.join(self.queue_dir, 'tasks', task_file), None) # rename keeps the modification time: the lease starts fresh
+                os.rename(os.path.join(self.queue_dir, 'tasks', task_file), lease)
+            except FileNotFoundError: # claimed by another worker
+                continue
+            task = read_json_file(lease)
+            if task is None: # cannot happen with atomic writes; do not lose the document
+                task = {'id': task_id, 'index': int(task_id), 'name': None, 'attempts': 0}
+            with self.lock:
+                self.held[lease] = task
+            task['lease'] = lease
+            tasks.append(task)
+        return tasks
+
+    def renew(self):
+        # the heartbeat: touch the leases held; a lease that is gone was reclaimed (this worker was too slow) and is dropped
+        with self.lock:
+            leases = list(self.held)
+        for lease in leases:
+            try:
+                os.utime(lease, None)
+            except OSError:
+                with self.lock:
+                    task = self.held.pop(lease, None)
+                if task is not None:
+                    print("Lost the lease of " + str(task['name']) + " (not renewed in time); another worker will annotate it.")
+        self.now()
+
+    def start_heartbeat(self):
+        # renew the leases every lease_seconds / 5 seconds while this process works; returns the event that stops the heartbeat
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(max(1.0, self.lease_seconds / 5.0)):
+                self.renew()
+
+        thread = threading.Thread(target=heartbeat)
+        thread.daemon = True
+        thread.start()
+        return stop
+
+    def release(self, task, target):
+        # rename the lease of the task to target; False when the lease was reclaimed in the meantime
+        with self.lock:
+            self.held.pop(task['lease'], None)
+        try:
+            os.rename(task['lease'], target)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, task, output, metrics=None):
+        # record an annotated document: its CoNLL table first (written atomically; if the lease was lost, the other worker writes
+        #   the same table), then the rename of the lease to done. Returns False when the lease was lost
+        table = os.path.join(self.conll_path, task['name'] + '.conll')
+        os.makedirs(os.path.dirname(table), exist_ok=True)
+        temp_file = table + '.' + self.worker + '.tmp'
+        with io.open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(output)
+        os.replace(temp_file, table)
+        done_file = self.path('done', task['id'], self.worker)
+        if not self.release(task, done_file):
+            return False
+        record = dict((k, v) for k, v in task.items() if k != 'lease')
+        record.update({'worker': self.worker, 'seconds': round((metrics or {}).get('seconds', 0.0), 3),
+                       'finished': datetime.datetime.now().isoformat(timespec='seconds')})
+        write_json_file(done_file, record, self.worker)
+        with self.lock:
+            self.counts['done'] += 1
+        return True
+
+    def fail(self, task, error, max_attempts=3):
+        # record a failed attempt: the document goes back to the tasks, or to failed after max_attempts attempts
+        failed_file = self.path('failed', task['id'], self.worker)
+        if not self.release(task, failed_file):
+            return False
+        self.failed_attempt(failed_file, dict((k, v) for k, v in task.items() if k != 'lease'), error, max_attempts)
+        return True
+
+    def failed_attempt(self, failed_file, task, error, max_attempts):
+        # failed_file belongs to this process alone (it was renamed there by this process)
+        task.update({'attempts': task.get('attempts', 0) + 1, 'error': error, 'worker': os.path.basename(failed_file).split('.')[1]})
+        write_json_file(failed_file, task, self.worker)
+        if task['attempts'] < max_attempts:
+            os.rename(failed_file, self.path('tasks', task['id']))
+        else:
+            with self.lock:
+                self.counts['failed'] += 1
+
+    def abandon(self, task):
+        # give a claimed document back to the queue without counting an attempt (e.g., no server could be started)
+        self.release(task, self.path('tasks', task['id']))
+
+    def reclaim(self, max_attempts=3):
+        # put back the documents whose lease expired (not renewed for lease_seconds); returns their number
+        now = self.now()
+        reclaimed = 0
+        for lease_file in self.files('leases'):
+            lease = os.path.join(self.queue_dir, 'leases', lease_file)
+            with self.lock:
+                if lease in self.held:
+                    continue
+            try:
+                if now - os.stat(lease).st_mtime <= self.lease_seconds:
+                    continue
+            except FileNotFoundError: # released in the meantime
+                continue
+            task_id, worker = lease_file.split('.')[:2]
+            failed_file = self.path('failed', task_id, worker)
+            try:
+                os.rename(lease, failed_file) # only one process wins the rename
+            except FileNotFoundError:
+                continue
+            task = read_json_file(failed_file) or {'id': task_id, 'index': int(task_id), 'name': None, 'attempts': 0}
+            print("The lease of " + str(task['name']) + " held by " + worker + " expired; the document goes back to the queue.")
+            self.failed_attempt(failed_file, task, 'the lease expired (worker ' + worker + ' stopped renewing it)', max_attempts)
+            reclaimed += 1
+        return reclaimed
+
+    def records(self, state):
+        # the records of the documents done (or failed), in input order
+        records = [read_json_file(os.path.join(self.queue_dir, state, f)) for f in self.files(state)]
+        return sorted([record for record in records if record is not None], key=lambda record: record['index'])
+
+def run_queue_worker(work_queue, settings, stanford_core_nlp_path, input_path, assigned_memory, parallel_requests=4, num_servers=1, keep_server_alive=0, idle_timeout=30, server_url='', cache=None, batch_bytes=0, prefetch=16, poll_seconds=10):
+    # annotate documents of the queue with local server(s) until the queue is drained: claim a few documents per server thread,
+    #   annotate them (see dispatch_documents), record them as done or failed, and claim more; when no document is waiting but some
+    #   are still leased by other workers, wait (and reclaim the leases that expire). The servers are only started once a document is claimed.
+    #   input_path: the input directory as seen from this host (the documents are found by name, relative to it)
+    #   returns the number of documents annotated and failed by this worker
+    properties = corenlp_properties(settings['annotators'], work_queue.conll_path, settings.get('output_format', 'conll'), settings.get('extra_columns', ''))
+    max_attempts = settings.get('max_attempts', 3)
+    files = dict((document_name(file), file) for file in find_documents(input_path, settings.get('file_name', ''), settings.get('recursive', True)))
+    worker_path = os.path.join(work_queue.queue_dir, 'workers', work_queue.worker)
+    os.makedirs(worker_path, exist_ok=True)
+    metrics = RunMetrics(worker_path)
+    servers = None
+    session = None
+    server_heartbeat = None
+    heartbeat = work_queue.start_heartbeat()
+    processed = 0
+    failed = 0
+    runStart = time.time()
+    try:
+        while True:
+            work_queue.reclaim(max_attempts)
+            tasks = work_queue.claim(4 * max(1, parallel_requests) * (len(servers) if servers else max(1, num_servers)))
+            if len(tasks) == 0:
+                if work_queue.drained():
+                    break
+                time.sleep(poll_seconds) # the last documents are being annotated by other workers
+                continue
+            if servers is None:
+                print("Starting the Stanford CoreNLP server(s) of worker " + work_queue.worker + "...")
+                servers = acquire_servers(os.path.join(stanford_core_nlp_path, '*'), assigned_memory, max(1, num_servers), properties, keep_server_alive, idle_timeout, server_url)
+                if len(servers) == 0:
+                    for task in tasks:
+                        work_queue.abandon(task)
+                    raise RuntimeError("No Stanford CoreNLP server could be started.")
+                session = get_http_session(parallel_requests, len(servers))
+                server_heartbeat = start_registry_heartbeat(servers)
+            InputDocs = []
+            claimed = []
+            for task in tasks:
+                if task['name'] not in files:
+                    work_queue.fail(task, 'not found in ' + str(input_path) + ' on ' + socket.gethostname(), max_attempts)
+                    continue
+                InputDocs.append(files[task['name']])
+                claimed.append(task)
+            queues = schedule_documents(InputDocs, len(servers))
+            order = []
+            for k in range(max([len(q) for q in queues] or [0])):
+                order.extend(InputDocs[q[k]] for q in queues if k < len(q))
+            prefetcher = DocumentPrefetcher(order, settings.get('unicode_policy', 'transliterate'), prefetch)
+            for index, x, output, error, document_metrics in dispatch_documents(servers, queues, InputDocs, session, None, properties, parallel_requests, cache,
+                                                                                settings.get('unicode_policy', 'transliterate'), settings.get('chunk_size', 0),
+                                                                                batch_bytes, reader=prefetcher.read):
+                document_metrics['source'] = 'server'
+                if error is None:
+                    if work_queue.complete(claimed[index], output, document_metrics):
+                        print("Wrote CoNLL table: " + x)
+                        processed += 1
+                else:
+                    print("Could not create CoNLL table for " + "\""+x+"\""+'. Message returned by Stanford server: '+"\""+error+"\"")
+                    work_queue.fail(claimed[index], error, max_attempts)
+                    failed += 1
+                metrics.record(x, document_metrics, output if error is None else None, error)
+            prefetcher.close()
+    finally:
+        heartbeat.set()
+        if server_heartbeat is not None:
+            server_heartbeat.set()
+        if session is not None:
+            session.close()
+        for server in servers or []:
+            server.release()
+        close_archives()
+        for line in metrics.summary(time.time() - runStart):
+            print(line)
+        metrics.close()
+        work_queue.now() # the final counts of the worker
+    return processed, failed
+
+def merge_work_queue(work_queue, output_path, merge_format='conll', get_date_flag=0, sep='_', date_field_position=3, date_format='mm-dd-yyyy', extra_columns=''):
+    # merge the CoNLL tables of the documents done by all the workers, in input order, into the merged table in output_path;
+    #   one process merges (merge.lock), and only when documents were done since the last merge (merged.json)
+    #   returns the merged file, or None when there was nothing (new) to merge or another process is merging
+    lock = os.path.join(work_queue.queue_dir, 'merge.lock')
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        if work_queue.now() - os.stat(lock).st_mtime <= work_queue.lease_seconds:
+            print("Another process is merging the CoNLL tables of the queue.")
+            return None
+        os.remove(lock) # left by a process that died while merging
+        return merge_work_queue(work_queue, output_path, merge_format, get_date_flag, sep, date_field_position, date_format, extra_columns)
+    try:
+        done = work_queue.records('done')
+        merged_record = read_json_file(os.path.join(work_queue.queue_dir, 'merged.json'))
+        if merged_record is not None and merged_record['done'] == len(done) and os.path.isfile(merged_record['merged_file']):
+            print("The CoNLL tables of the queue were already merged into " + merged_record['merged_file'])
+            return None
+        merged = merged_table_writer(output_path, merge_format, get_date_flag, sep, date_field_position, date_format, extra_columns)
+        if merged.date_parser is not None:
+            merged.date_parser.parse_all([record['name'] for record in done])
+        for n, record in enumerate(done):
+            try:
+                merged.append(record['name'], os.path.join(work_queue.conll_path, record['name'] + '.conll'), from_file=True)
+            except (IOError, OSError) as e:
+                print("Could not merge the CoNLL table of " + record['name'] + ": " + str(e))
+            if n % 1000 == 999:
+                os.utime(lock, None)
+        merged.close()
+        if merged.DocNum == 0:
+            os.remove(merged.merged_file)
+            print("No CoNLL tables produced for the input txt documents. No merged table produced.")
+            return None
+        print("Merged " + str(merged.DocNum) + " CoNLL tables (" + str(merged.RecordNum) + " records) into " + merged.merged_file)
+        print("Merge memory: " + merged.memory_summary())
+        if merged.date_parser is not None and len(merged.date_parser.failures) > 0:
+            merged.date_parser.write_failures(os.path.join(output_path, 'date_failures.tsv'))
+            print("No " + date_format + " date was found in the name of " + str(len(merged.date_parser.failures)) + " of " + str(len(done)) +
+                  " documents (their date is empty); see " + os.path.join(output_path, 'date_failures.tsv'))
+        write_json_file(os.path.join(work_queue.queue_dir, 'merged.json'), {'done': len(done), 'merged_file': os.path.abspath(merged.merged_file),
+                                                                             'merged': datetime.datetime.now().isoformat(timespec='seconds')}, work_queue.worker)
+        return merged.merged_file
+    finally:
+        os.remove(lock)
+
+def RunCoreNLPQueue(queue_dir, stanford_core_nlp_path, input_path, output_path, assigned_memory, merge_file_flag, get_date_flag=0, sep='_', date_field_position=3, date_format='mm-dd-yyyy', file_name='', role='all', lease_seconds=300, parallel_requests=4, num_servers=1, keep_server_alive=0, idle_timeout=30, server_url='', cache_dir='', cache_size_mb=1024, merge_format='conll', unicode_policy='transliterate', chunk_size=0, batch_bytes=0, annotators='parse', recursive=1, prefetch=16, max_retries=3, output_format='conll', extra_columns='', poll_seconds=10):
+    # the distributed mode: several processes, on one or several hosts, each with its own CoreNLP server(s), annotate one corpus
+    #   through a work queue in the shared directory queue_dir (see WorkQueue). Every host runs the same command:
+    #   role 'coordinator' creates the queue (the *.txt files of input_path, annotated with the annotators, unicode_policy, chunk_size,
+    #   output_format and extra_columns given here, whatever the workers are given), waits until it is drained, reclaiming expired leases, and merges the CoNLL tables
+    #   of all the workers into output_path (with merge_file_flag); role 'worker' annotates documents of the queue (see run_queue_worker);
+    #   role 'all' does both (the first process to get there creates the queue, the first to finish merges).
+    #   The CoNLL table of each document is in <queue_dir>/conll; a document failing max_retries times is left out.
+    #   cache_dir: an annotation cache for this host (none by default: the cache is not shared between processes)
+    #   returns a summary of the queue: {'documents', 'processed', 'failed', 'merged_file'}
+    work_queue = WorkQueue(queue_dir, lease_seconds=lease_seconds)
+    if role in ('all', 'coordinator'):
+        InputDocs = find_documents(input_path, file_name, recursive == 1)
+        settings = {'input_path': os.path.abspath(input_path), 'file_name': file_name, 'recursive': recursive == 1,
+                    'annotators': ANNOTATOR_PRESETS.get(annotators, annotators), 'unicode_policy': unicode_policy, 'chunk_size': chunk_size,
+                    'output_format': output_format, 'extra_columns': ','.join(extra_column_names(extra_columns)),
+                    'lease_seconds': lease_seconds, 'max_attempts': max_retries}
+        if work_queue.create([(document_name(file), document_size(file)) for file in InputDocs], settings):
+            print("Created the work queue in " + queue_dir + " with " + str(len(InputDocs)) + " input documents.")
+    print("Waiting for the work queue in " + queue_dir + "...")
+    settings = work_queue.settings()
+    status = work_queue.status()
+    print("Work queue: " + str(settings['documents']) + " documents, " + str(status['tasks']) + " waiting, " + str(status['leases']) + " being annotated, " +
+          str(status['done']) + " done, " + str(status['failed']) + " failed.")
+    if role in ('all', 'worker'):
+        if assigned_memory == 'auto' or parallel_requests == 'auto': # chosen from the documents as seen from this host (see profile_corpus)
+            profile = profile_corpus(find_documents(input_path, settings.get('file_name', ''), settings.get('recursive', True)), settings['annotators'], max(1, num_servers), settings.get('chunk_size', 0))
+            assigned_memory = profile['assigned_memory'] if assigned_memory == 'auto' else assigned_memory
+            parallel_requests = profile['parallel_requests'] if parallel_requests == 'auto' else parallel_requests
+            print("Using " + str(assigned_memory) + " GB of heap per server and " + str(parallel_requests) + " parallel requests per server.")
+        cache = None
+        if cache_dir:
+            cache = AnnotationCache(cache_dir, cache_size_mb * 1048576, corenlp_version(stanford_core_nlp_path) if server_url == '' else server_url)
+        processed, failed = run_queue_worker(work_queue, settings, stanford_core_nlp_path, input_path, int(assigned_memory), int(parallel_requests), num_servers,
+                                             keep_server_alive, idle_timeout, server_url, cache, batch_bytes, prefetch, poll_seconds)
+        print("Worker " + work_queue.worker + ": " + str(processed) + " input documents processed, " + str(failed) + " failed attempts.")
+    merged_file = None
+    if role in ('all', 'coordinator'):
+        while not work_queue.drained():
+            work_queue.reclaim(settings.get('max_attempts', 3))
+            status = work_queue.status()
+            print("Work queue: " + str(status['tasks']) + " waiting, " + str(status['leases']) + " being annotated, " + str(status['done']) + " done, " + str(status['failed']) + " failed.")
+            time.sleep(poll_seconds)
+        if merge_file_flag == 1:
+            merged_file = merge_work_queue(work_queue, output_path, merge_format, get_date_flag, sep, date_field_position, date_format, settings.get('extra_columns', ''))
+    failures = work_queue.records('failed')
+    if len(failures) > 0:
+        print("No CoNLL table was produced for: " + ", ".join(str(record['name']) + " (" + str(record.get('error')) + ")" for record in failures))
+    return {'documents': settings['documents'], 'processed': len(work_queue.files('done')), 'failed': [record['name'] for record in failures], 'cancelled': [], 'merged_file': merged_file}
+
+def peak_rss_mb():
+    # peak resident set size of this process in MB, or None where the resource module is not available (Windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1048576.0 if sys.platform == 'darwin' else peak / 1024.0 # bytes on macOS, KB on Linux
+
+#%%
+text_label = """For information about this program, hit \"Read Me\"\nTo run the program, select the Stanford CoreNLP and corpus txt files paths and hit buttons below.\nTo exit the program, hit \"Quit\""""
+
+introduction_main = """reserved for introduction"""
+
+#%%
+"""
+########################
+            GUI
+#######################
+"""
+queries_x_cord = 120
+
+
+label_x_cord = 342
+label_x_cord_wn = 375
+
+#second column of options
+right_queries_x_cord = 560
+right_label_x_cord = 720
+
+help_button_x_cord = 50
+labels_x_cord = 150
+entry_box_x_cord = 350
+basic_y_cord = 90
+y_step = 40
+
+def main_gui():
+    # the window: choose the paths and options, then run RunCoreNLP in the background
+    import tkinter as tk
+    import tkinter.messagebox as mb
+    from tkinter import filedialog
+    from tkinter import ttk
+
+    def exit_window():
+        # QUIT or the window closed, possibly in the middle of a run: the run is cancelled and the servers it started are killed
+        #   (the run's background thread ends with the program, before it can release them)
+        cancel_run.set()
+        kill_started_servers()
+        window.destroy()
+        exit()
+
+    def empty():
+        print('empty function for debug')
+        return 
+
+    """
+    msgboxes
+    """
+    def main_msgbox():
+        mb.showinfo(title='Introduction', message=introduction_main)
+
+    def helper_buttons(canvas,x_cord,y_cord,text_title,text_msg):
+
+        def msg_box():
+            mb.showinfo(title=text_title, message=text_msg)
+        tk.Button(canvas, text='? HELP', command=msg_box).place(x=x_cord,y=y_cord)
+
+    """
+    button-associated functions
+    """
+    def select_output_dir():
+
+        file_path = filedialog.askdirectory(initialdir = os.getcwd())
+        output_file_path.set(file_path)
+        print(file_path)
+        return file_path
+
+    def select_stanford_corenlp_dir():
+
+        file_path = filedialog.askdirectory(initialdir = os.getcwd())
+        stanford_core_NLP_path.set(file_path)
+        print(file_path)
+        return file_path
+
+    def select_input_path():
+        file_path = filedialog.askdirectory(initialdir = os.getcwd())
+        input_file_path.set(file_path)
+        print(file_path)
+        return file_path
+
+    def memory_dropdown():
+        print(assigned_memory.get())
+
+    def test_input_and_run_query():
+
+        CoreNLPPath = stanford_core_NLP_path.get()
+
+        Path = input_file_path.get()
+
+        Output = output_file_path.get()
+
+        mem = memory_var.get()
+
+        mergeFiles = merge_file_or_not.get()
+
+        getDate = find_date_or_not.get()
+
+        separator = separator_var.get()
+
+        DateFieldLocation = date_loc_var.get()
+
+        DateFormat = date_format.get()
+
+        parallelRequests = parallel_requests_var.get()
+
+        numServers = num_servers_var.get()
+
+        keepServerAlive = keep_server_or_not.get()
+
+        useCache = use_cache_or_not.get()
+
+        writeConllFiles = write_conll_files_or_not.get()
+
+        mergeFormat = merge_format_var.get()
+
+        unicodePolicy = unicode_policy_var.get()
+
+        chunkSize = chunk_size_var.get()
+
+        resumeRun = resume_or_not.get()
+
+        annotatorPreset = annotators_var.get()
+
+        batchBytes = batch_bytes_var.get()
+
+        recursive = recursive_or_not.get()
+
+        print(CoreNLPPath, Path, Output,mem,mergeFiles,getDate,separator,DateFieldLocation,DateFormat,parallelRequests,numServers,keepServerAlive,useCache,writeConllFiles,mergeFormat,unicodePolicy,chunkSize,resumeRun,annotatorPreset,batchBytes,recursive)
+
+        #The run goes on in a background thread so that the window stays responsive; RunCoreNLP reports its progress
+        #   through run_events, which the window reads every 100 ms (see poll_run_events): Tk widgets are only touched by the main thread
+        def run():
+            try:
+                RunCoreNLP(CoreNLPPath, Path, Output,mem,mergeFiles,getDate,separator,DateFieldLocation,DateFormat,parallel_requests=parallelRequests,num_servers=numServers,keep_server_alive=keepServerAlive,use_cache=useCache,write_conll_files=writeConllFiles,merge_format=mergeFormat,unicode_policy=unicodePolicy,chunk_size=chunkSize,resume=resumeRun,annotators=annotatorPreset,batch_bytes=batchBytes,recursive=recursive,progress=lambda event, data: run_events.put((event, data)),cancel=cancel_run)
+            except Exception as e:
+                run_events.put(('status', {'message': "Error: " + str(e)}))
+            run_events.put(('exit', {}))
+
+        cancel_run.clear()
+        run_state.clear()
+        run_state.update({'documents': 0, 'done': 0, 'tokens': 0, 'start': None, 'in_flight': {}, 'message': 'Starting...'})
+        progress_bar.configure(value=0, maximum=1)
+        failures_list.delete(0, tk.END)
+        execute_button.configure(state='disabled')
+        cancel_button.configure(state='normal')
+        update_progress_status()
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        window.after(100, poll_run_events)
+        return
+
+    def cancel_run_query():
+        # the documents already sent to the servers are completed (and merged); the others are skipped
+        cancel_run.set()
+        cancel_button.configure(state='disabled')
+        run_state['message'] = 'Cancelling: waiting for the documents being annotated...'
+        update_progress_status()
+
+    def update_progress_status():
+        # docs/sec, tokens/sec and ETA since the servers were ready, and the document annotated for the longest time
+        #   (a document in flight for a long time on a server that still answers is a long document, not a stalled server)
+        status = run_state.get('message', '')
+        if run_state.get('start') is not None:
+            elapsed = max(time.time() - run_state['start'], 0.001)
+            done = run_state['done']
+            docs_per_sec = done / elapsed
+            status = str(done) + " of " + str(run_state['documents']) + " documents, " + str(round(docs_per_sec, 2)) + " docs/sec, " + str(int(run_state['tokens'] / elapsed)) + " tokens/sec"
+            if 0 < done < run_state['documents']:
+                status += ", ETA " + str(datetime.timedelta(seconds=int((run_state['documents'] - done) / docs_per_sec)))
+            if len(run_state['in_flight']) > 0:
+                name, since = min(run_state['in_flight'].items(), key=lambda item: item[1])
+                status += "\n" + str(len(run_state['in_flight'])) + " in flight; longest: " + name + " (" + str(int(time.time() - since)) + " s)"
+            if run_state.get('message'):
+                status += "\n" + run_state['message']
+        progress_status.config(text=status)
+
+    def poll_run_events():
+        while True:
+            try:
+                event, data = run_events.get_nowait()
+            except queue.Empty:
+                break
+            if event == 'status':
+                run_state['message'] = data['message']
+            elif event == 'start':
+                run_state['start'] = time.time()
+                run_state['documents'] = data['documents']
+                run_state['message'] = ''
+                progress_bar.configure(maximum=max(1, data['documents']))
+            elif event == 'annotating':
+                run_state['in_flight'][data['name']] = time.time()
+            elif event == 'document':
+                run_state['in_flight'].pop(data['name'], None)
+                run_state['done'] = data['done']
+                run_state['tokens'] += data['tokens']
+                progress_bar.configure(value=data['done'])
+                if not data['ok'] and data['error'] != 'cancelled':
+                    failures_list.insert(tk.END, data['name'] + ": " + data['error'])
+            elif event == 'finish':
+                run_state['finished'] = True
+                run_state['message'] = "Finished: " + str(data['processed']) + " of " + str(data['documents']) + " documents processed, " + str(data['failed']) + " failed" + (", " + str(data['cancelled']) + " cancelled" if data['cancelled'] > 0 else "") + "."
+            elif event == 'exit':
+                run_state['in_flight'] = {}
+                if not run_state.get('finished') and not run_state['message'].startswith('Error: '):
+                    run_state['message'] = 'Stopped; see the console for details.'
+                update_progress_status()
+                execute_button.configure(state='normal')
+                cancel_button.configure(state='disabled')
+                return
+        update_progress_status()
+        window.after(100, poll_run_events)
+
+    window = tk.Tk()
+    window.title('Noun and Verb Analysis')
+    window.geometry('1000x820')
+
+    """
+    variables
+    """
+
+    stanford_core_NLP_path = tk.StringVar()
+    stanford_core_NLP_path.set('')
+
+    input_file_path = tk.StringVar()
+    input_file_path.set('')
+
+    output_file_path = tk.StringVar()
+    output_file_path.set('')
+
+    memory_var = tk.StringVar()
+    memory_var.set('4')
+
+    separator_var = tk.StringVar()
+    separator_var.set('_')
+
+    date_loc_var = tk.IntVar()
+    date_loc_var.set(3)
+
+    date_format = tk.StringVar()
+    date_format.set('mm-dd-yyyy')
+
+    parallel_requests_var = tk.StringVar()
+    parallel_requests_var.set('4')
+
+    num_servers_var = tk.IntVar()
+    num_servers_var.set(1)
+
+    keep_server_or_not = tk.IntVar()
+    keep_server_or_not.set(1)
+
+    use_cache_or_not = tk.IntVar()
+    use_cache_or_not.set(1)
+
+    write_conll_files_or_not = tk.IntVar()
+    write_conll_files_or_not.set(1)
+
+    merge_format_var = tk.StringVar()
+    merge_format_var.set('conll')
+
+    unicode_policy_var = tk.StringVar()
+    unicode_policy_var.set('transliterate')
+
+    chunk_size_var = tk.IntVar()
+    chunk_size_var.set(0)
+
+    resume_or_not = tk.IntVar()
+    resume_or_not.set(0)
+
+    annotators_var = tk.StringVar()
+    annotators_var.set('parse')
+
+    batch_bytes_var = tk.IntVar()
+    batch_bytes_var.set(0)
+
+    recursive_or_not = tk.IntVar()
+    recursive_or_not.set(1)
+
+    #state of the run in the background thread
+    run_events = queue.Queue()
+    cancel_run = threading.Event()
+    run_state = {}
+
+
+
+
+    # Create a Tkinter variable
+
+
+
+    #For more information about a specific button, hit the \"? HELP\" button next to it.
+
+    intro = tk.Label(window, 
+                     anchor = 'w',
+                     text=text_label)
+    intro.pack()
+
+
+    quit_button = tk.Button(window, text='QUIT', width=20,height=2, command=exit_window)
+    quit_button.place(x=550,y=580)
+
+    execute_button = tk.Button(window, text='Execute StanfordCoreNLP', width=20,height=2, command=test_input_and_run_query)
+    execute_button.place(x=350,y=580)
+
+    intro_button = tk.Button(window, text='Read Me',command=main_msgbox,width=20,height=2)
+    intro_button.place(x=150,y=580)
+
+    cancel_button = tk.Button(window, text='Cancel', width=20,height=2, command=cancel_run_query, state='disabled')
+    cancel_button.place(x=750,y=580)
+
+    progress_bar = ttk.Progressbar(window, orient='horizontal', length=750, mode='determinate')
+    progress_bar.place(x=150,y=635)
+    progress_status = tk.Label(window, text='', anchor='w', justify='left')
+    progress_status.place(x=150,y=660)
+    failures_list_lb = tk.Label(window, text='Failed: ')
+    failures_list_lb.place(x=queries_x_cord-50,y=720)
+    failures_list = tk.Listbox(window, width=125, height=4)
+    failures_list.place(x=150,y=720)
+
+
+    select_input_dir_button=tk.Button(window, width = 22,text='select CoreNLP file directory', command=select_stanford_corenlp_dir)
+    select_input_dir_button.place(x=queries_x_cord,y=basic_y_cord)
+    tk.Label(window, textvariable=stanford_core_NLP_path).place(x=label_x_cord, y= basic_y_cord)
+
+    select_input_dir_button=tk.Button(window, width = 22,text='select INPUT file directory', command=select_input_path)
+    select_input_dir_button.place(x=queries_x_cord,y=basic_y_cord+y_step)
+    tk.Label(window, textvariable=input_file_path).place(x=label_x_cord, y= basic_y_cord+y_step)
+
+    select_save_file_button=tk.Button(window, width = 22,text='select OUTPUT file directory', command=select_output_dir)
+    select_save_file_button.place(x=queries_x_cord,y=basic_y_cord+y_step*2)
+    tk.Label(window, textvariable=output_file_path).place(x=label_x_cord, y= basic_y_cord+y_step*2)
+
+    """
+    check box
+    """
+    def print_checkboxes():
+        if merge_file_or_not.get() == 1:
+            merge_file_checkbox_msg.config(text="A merged CoNLL table will be produced")
+        elif merge_file_or_not.get() == 0:
+            merge_file_checkbox_msg.config(text="No merged CoNLL table will be produced")
+
+        if find_date_or_not.get() == 1:
+            find_date_checkbox_msg.config(text="Date Option On.")
+            date_format_menu.configure(state="normal")
+            entry_sep.configure(state="normal")
+            loc_menu.configure(state='normal')
+        elif find_date_or_not.get() == 0:
+            find_date_checkbox_msg.config(text="Date Option Off.")
+            date_format_menu.configure(state="disabled")
+            entry_sep.configure(state="disabled")
+            loc_menu.configure(state="disabled")
+            #w.config(state=DISABLED)
+
+
+
+    merge_file_checkbox_msg = tk.Label(window, text='A merged CoNLL table will be produced.')
+    merge_file_checkbox_msg.place(x=label_x_cord_wn,y=basic_y_cord+y_step*3)
+    merge_file_or_not = tk.IntVar()
+    merge_file_or_not.set(1)
+    merge_file_checkbox = tk.Checkbutton(window, text='Merge CoNLL tables?', variable=merge_file_or_not, onvalue=1, offvalue=0,
+                        command=print_checkboxes)
+    merge_file_checkbox.place(x=queries_x_cord,y=basic_y_cord+y_step*3)
+    merge_file_checkbox_msg.place(x=label_x_cord,y=basic_y_cord+y_step*3)
+
+    find_date_checkbox_msg = tk.Label(window, text='Date Option Off.')
+    find_date_checkbox_msg.place(x=label_x_cord_wn,y=basic_y_cord+y_step*5)
+    find_date_or_not = tk.IntVar()
+    find_date_or_not.set(0)
+    find_date_checkbox = tk.Checkbutton(window, text='Find Date?', variable=find_date_or_not, onvalue=1, offvalue=0,
+                        command=print_checkboxes)
+    find_date_checkbox.place(x=queries_x_cord,y=basic_y_cord+y_step*5)
+    find_date_checkbox_msg.place(x=label_x_cord,y=basic_y_cord+y_step*5)
+
+    date_format_lb = tk.Label(window,text='Date Format: ')
+    date_format_lb.place(x=queries_x_cord,y=basic_y_cord+y_step*6)
+    date_format_menu = tk.OptionMenu(window, date_format, *DATE_FORMATS)
+    date_format_menu.configure(width=10)
+    date_format_menu.place(x=label_x_cord, y = basic_y_cord+y_step*6)
+    if find_date_or_not.get() == 0:
+        date_format_menu.configure(state='disabled')    
+
+    mem_menu_lb = tk.Label(window, text='Memory Option: ')
+    mem_menu_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*4)
+    mem_menu = tk.OptionMenu(window,memory_var,'auto','1','2','3','4','6','8','12','16')
+    mem_menu.configure(width=10)
+    mem_menu.place(x=label_x_cord,y=basic_y_cord+y_step*4)
+
+    parallel_menu_lb = tk.Label(window, text='Parallel Requests: ')
+    parallel_menu_lb.place(x=right_queries_x_cord, y = basic_y_cord+y_step*3)
+    parallel_menu = tk.OptionMenu(window,parallel_requests_var,'auto','1','2','4','8','16')
+    parallel_menu.configure(width=10)
+    parallel_menu.place(x=right_label_x_cord,y=basic_y_cord+y_step*3)
+
+    servers_menu_lb = tk.Label(window, text='CoreNLP Servers: ')
+    servers_menu_lb.place(x=right_queries_x_cord, y = basic_y_cord+y_step*4)
+    servers_menu = tk.OptionMenu(window,num_servers_var,1,2,3,4,6,8)
+    servers_menu.configure(width=10)
+    servers_menu.place(x=right_label_x_cord,y=basic_y_cord+y_step*4)
+
+    keep_server_checkbox = tk.Checkbutton(window, text='Keep CoreNLP running between runs?', variable=keep_server_or_not, onvalue=1, offvalue=0)
+    keep_server_checkbox.place(x=right_queries_x_cord,y=basic_y_cord+y_step*5)
+
+    use_cache_checkbox = tk.Checkbutton(window, text='Re-use CoNLL tables of unchanged files?', variable=use_cache_or_not, onvalue=1, offvalue=0)
+    use_cache_checkbox.place(x=right_queries_x_cord,y=basic_y_cord+y_step*6)
+
+    write_conll_files_checkbox = tk.Checkbutton(window, text='Write a CoNLL table per file?', variable=write_conll_files_or_not, onvalue=1, offvalue=0)
+    write_conll_files_checkbox.place(x=right_queries_x_cord,y=basic_y_cord+y_step*7)
+
+    merge_format_menu_lb = tk.Label(window, text='Merged Table Format: ')
+    merge_format_menu_lb.place(x=right_queries_x_cord, y = basic_y_cord+y_step*8)
+    merge_format_menu = tk.OptionMenu(window,merge_format_var,'conll','parquet')
+    merge_format_menu.configure(width=10)
+    merge_format_menu.place(x=right_label_x_cord,y=basic_y_cord+y_step*8)
+
+    unicode_policy_menu_lb = tk.Label(window, text='Non-ASCII Characters: ')
+    unicode_policy_menu_lb.place(x=right_queries_x_cord, y = basic_y_cord+y_step*9)
+    unicode_policy_menu = tk.OptionMenu(window,unicode_policy_var,'transliterate','unicode','ascii')
+    unicode_policy_menu.configure(width=10)
+    unicode_policy_menu.place(x=right_label_x_cord,y=basic_y_cord+y_step*9)
+
+    chunk_size_menu_lb = tk.Label(window, text='Split Documents Over (chars): ')
+    chunk_size_menu_lb.place(x=right_queries_x_cord, y = basic_y_cord+y_step*10)
+    chunk_size_menu = tk.OptionMenu(window,chunk_size_var,0,20000,50000,100000,500000)
+    chunk_size_menu.configure(width=10)
+    chunk_size_menu.place(x=right_label_x_cord+40,y=basic_y_cord+y_step*10)
+
+    batch_bytes_menu_lb = tk.Label(window, text='Batch Short Documents (bytes): ')
+    batch_bytes_menu_lb.place(x=right_queries_x_cord, y = basic_y_cord+y_step*11)
+    batch_bytes_menu = tk.OptionMenu(window,batch_bytes_var,0,8192,32768,131072)
+    batch_bytes_menu.configure(width=10)
+    batch_bytes_menu.place(x=right_label_x_cord+40,y=basic_y_cord+y_step*11)
+
+    entry_sep_lb = tk.Label(window, text='Date Separator: ')
+    entry_sep_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*7)
+    entry_sep = tk.Entry(window, textvariable=separator_var)
+    entry_sep.place(x=label_x_cord,y=basic_y_cord+y_step*7)
+    if find_date_or_not.get() == 0:
+        entry_sep.configure(state='disabled') 
+
+    loc_menu_lb = tk.Label(window, text='Date Position: ')
+    loc_menu_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*8)
+    loc_menu = tk.OptionMenu(window,date_loc_var,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30)
+    loc_menu.configure(width=10)
+    loc_menu.place(x=label_x_cord,y=basic_y_cord+y_step*8)
+    if find_date_or_not.get() == 0:
+        loc_menu.configure(state='disabled') 
+
+    resume_checkbox = tk.Checkbutton(window, text='Resume the previous run (skip completed files)?', variable=resume_or_not, onvalue=1, offvalue=0)
+    resume_checkbox.place(x=queries_x_cord,y=basic_y_cord+y_step*9)
+
+    annotators_menu_lb = tk.Label(window, text='Annotators: ')
+    annotators_menu_lb.place(x=queries_x_cord, y = basic_y_cord+y_step*10)
+    annotators_menu = tk.OptionMenu(window,annotators_var,'parse','depparse','ner','pos-lemma')
+    annotators_menu.configure(width=10)
+    annotators_menu.place(x=label_x_cord,y=basic_y_cord+y_step*10)
+
+    recursive_checkbox = tk.Checkbutton(window, text='Include subdirectories (and zip/tar archives)?', variable=recursive_or_not, onvalue=1, offvalue=0)
+    recursive_checkbox.place(x=queries_x_cord,y=basic_y_cord+y_step*11)
+
+    window.protocol('WM_DELETE_WINDOW', exit_window)
+    window.mainloop()
+
+def main(argv=None):
+    # the command line (see the arguments at the top of this file); without arguments, the window opens
+    import argparse
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 0:
+        main_gui()
+        return 0
+    parser = argparse.ArgumentParser(description="Runs Stanford CoreNLP on the *.txt files of a directory and writes (and merges) their CoNLL tables.",
+                                     usage="%(prog)s CORENLP_PATH INPUT_PATH [FILE_NAME] OUTPUT_PATH [MEMORY [MERGE [GET_DATE [SEPARATOR DATE_FIELD_POSITION DATE_FORMAT]]]] [options]")
+    parser.add_argument('arguments', nargs='*', help="the arguments described at the top of this file; MEMORY is in GB or auto (default auto), MERGE (default 1) and GET_DATE (default 0) are 1 or 0")
+    parser.add_argument('--gui', action='store_true', help="open the graphical user interface")
+    parser.add_argument('--parallel-requests', default='4', help="documents sent to each server at the same time, or auto (default 4)")
+    parser.add_argument('--servers', type=int, default=1, help="number of CoreNLP servers started (default 1)")
+    parser.add_argument('--keep-server-alive', action='store_true', help="leave the server(s) running for the next runs")
+    parser.add_argument('--idle-timeout', type=int, default=30, help="minutes after which a server kept alive and unused is shut down (default 30)")
+    parser.add_argument('--server-url', default='', help="URL of an already running CoreNLP server to use instead of starting one")
+    parser.add_argument('--no-cache', action='store_true', help="do not use the annotation cache")
+    parser.add_argument('--cache-dir', default='', help="directory of the annotation cache (default OUTPUT_PATH/corenlp_cache)")
+    parser.add_argument('--cache-size-mb', type=int, default=1024, help="size limit of the annotation cache in MB (default 1024)")
+    parser.add_argument('--no-conll-files', action='store_true', help="only write the merged table, not the CoNLL table of each document")
+    parser.add_argument('--merge-format', choices=['conll', 'parquet'], default='conll', help="format of the merged table (default conll)")
+    parser.add_argument('--unicode-policy', choices=['transliterate', 'unicode', 'ascii'], default='transliterate', help="non-ASCII characters of the input (default transliterate)")
+    parser.add_argument('--chunk-size', type=int, default=0, help="characters per chunk of the long documents, 0 for no chunks (default 0)")
+    parser.add_argument('--batch-bytes', type=int, default=0, help="bytes per request of the batches of short documents, 0 for no batches (default 0)")
+    parser.add_argument('--annotators', default='parse', help="annotator preset (" + ', '.join(sorted(ANNOTATOR_PRESETS)) + ") or list of annotators (default parse)")
+    parser.add_argument('--output-format', choices=sorted(OUTPUT_FORMATS), default='conll', help="format of the server's answers, converted to CoNLL tables here (default conll)")
+    parser.add_argument('--extra-columns', default='', help="with --output-format json or protobuf, columns added to the CoNLL tables: offsets, ner-spans (comma separated)")
+    parser.add_argument('--no-recursive', action='store_true', help="only take the *.txt files of INPUT_PATH, not of its subdirectories and archives")
+    parser.add_argument('--prefetch', type=int, default=16, help="documents read ahead of the annotation (default 16)")
+    parser.add_argument('--resume', action='store_true', help="skip the documents completed by earlier runs in OUTPUT_PATH")
+    parser.add_argument('--max-retries', type=int, default=3, help="with --resume, times a failed document is tried (default 3)")
+    parser.add_argument('--incremental-merge', action='store_true', help="update the merged CoNLL table of an earlier run in OUTPUT_PATH: only the new and changed documents are annotated and merged")
+    parser.add_argument('--queue', metavar='QUEUE_DIR', help="distributed mode: annotate through a work queue in the shared directory QUEUE_DIR, with the other hosts running the same command (see RunCoreNLPQueue)")
+    parser.add_argument('--queue-role', choices=['all', 'coordinator', 'worker'], default='all', help="with --queue: create, wait and merge (coordinator), annotate (worker) or both (default all)")
+    parser.add_argument('--lease-seconds', type=int, default=300, help="with --queue: seconds after which the documents of a worker that stopped renewing its leases are reclaimed (default 300)")
+    parser.add_argument('--server-watchdog', metavar='REGISTRY', help=argparse.SUPPRESS) # idle watchdog of a persistent server (see CoreNLPServer.register)
+    parser.add_argument('--benchmark', nargs='*', metavar='N', help="offline benchmark against a fake server: [DOCUMENTS [MEAN_KB [LATENCY_MS [PARALLEL_REQUESTS [BATCH_BYTES [OUTPUT_FORMAT]]]]]]")
+    parser.add_argument('--benchmark-normalization', nargs='?', type=int, const=8, metavar='MB', help="benchmark of the text normalization on MB megabytes (default 8)")
+    options = parser.parse_args(argv)
+
+    # commands run without opening the window
+    if options.gui:
+        main_gui()
+        return 0
+    if options.server_watchdog is not None:
+        run_server_watchdog(options.server_watchdog)
+        return 0
+    if options.benchmark is not None: # see benchmark_corenlp.py
+        import benchmark_corenlp
+        return benchmark_corenlp.main(options.benchmark)
+    if options.benchmark_normalization is not None:
+        import benchmark_corenlp
+        benchmark_corenlp.benchmark_normalization(options.benchmark_normalization)
+        return 0
+
+    # if the third argument is a file of the input path, the run is on that file only (one-file mode); else it is the output path
+    arguments = list(options.arguments)
+    one_file = len(arguments) >= 3 and os.path.isfile(os.path.join(arguments[1], arguments[2]))
+    if len(arguments) < (4 if one_file else 3):
+        parser.error("CORENLP_PATH, INPUT_PATH and OUTPUT_PATH are required")
+    file_name = ''
+    if one_file:
+        file_name = arguments.pop(2)
+    corenlp_path, input_path = arguments[:2]
+    output_path, memory, merge, get_date, separator, date_field_position, date_format = (arguments[2:] + [None] * 6)[:7]
+    try:
+        os.makedirs(output_path, exist_ok=True)
+        if options.queue is not None:
+            summary = RunCoreNLPQueue(options.queue, corenlp_path, input_path, output_path, memory or 'auto', int(merge or 1), int(get_date or 0),
+                                      separator or '_', int(date_field_position or 3), date_format or 'mm-dd-yyyy', file_name,
+                                      role=options.queue_role, lease_seconds=options.lease_seconds, parallel_requests=options.parallel_requests,
+                                      num_servers=options.servers, keep_server_alive=int(options.keep_server_alive), idle_timeout=options.idle_timeout,
+                                      server_url=options.server_url, cache_dir=options.cache_dir, cache_size_mb=options.cache_size_mb, merge_format=options.merge_format,
+                                      unicode_policy=options.unicode_policy, chunk_size=options.chunk_size, batch_bytes=options.batch_bytes,
+                                      annotators=options.annotators, recursive=int(not options.no_recursive), prefetch=options.prefetch, max_retries=options.max_retries,
+                                      output_format=options.output_format, extra_columns=options.extra_columns)
+            return 1 if len(summary['failed']) > 0 else 0
+        summary = RunCoreNLP(corenlp_path, input_path, output_path, memory or 'auto', int(merge or 1), int(get_date or 0),
+                             separator or '_', int(date_field_position or 3), date_format or 'mm-dd-yyyy', file_name,
+                             parallel_requests=options.parallel_requests, num_servers=options.servers, keep_server_alive=int(options.keep_server_alive),
+                             idle_timeout=options.idle_timeout, server_url=options.server_url, use_cache=int(not options.no_cache), cache_dir=options.cache_dir,
+                             cache_size_mb=options.cache_size_mb, write_conll_files=int(not options.no_conll_files), merge_format=options.merge_format,
+                             unicode_policy=options.unicode_policy, chunk_size=options.chunk_size, resume=int(options.resume), max_retries=options.max_retries,
+                             annotators=options.annotators, batch_bytes=options.batch_bytes, recursive=int(not options.no_recursive), prefetch=options.prefetch,
+                             output_format=options.output_format, extra_columns=options.extra_columns, incremental_merge=int(options.incremental_merge))
+    except Exception as e:
+        print("\nError: " + str(e))
+        return 1
+    return 1 if len(summary['failed']) > 0 else 0 # for scripts: 1 when a document could not be annotated
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+    -*- coding: utf-8 -*-
+    Offline benchmark of StanfordCoreNLP_GUI.py: a local fake CoreNLP server (no Java, CoreNLP or network) and a synthetic corpus,
+    to measure the reading, dispatch, post-processing, writing and merging of RunCoreNLP, and micro-benchmarks of the normalization
+
+    python benchmark_corenlp.py [documents [mean KB [latency ms [parallel requests [batch bytes [output format]]]]]]
+    python benchmark_corenlp.py --normalization [MB]
+    (also python StanfordCoreNLP_GUI.py --benchmark ... and --benchmark-normalization [MB])
+
+    start_fake_server and synthetic_corpus can also be used on their own, e.g., to try RunCoreNLP(..., server_url=url) without CoreNLP
+"""
+
+import os
+import io
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import threading
+
+import StanfordCoreNLP_GUI as corenlp
+
+def benchmark_normalization(megabytes=8):
+    # micro-benchmark of the post-processing of the CoNLL tables (bracket restoring) and of the pre-processing of the text (unicode_policy),
+    #   in milliseconds per MB of synthetic CoNLL table / text
+    #   python benchmark_corenlp.py --normalization [MB] (or python StanfordCoreNLP_GUI.py --benchmark-normalization [MB])
+    def restore_brackets_chained(output): # the twelve str.replace calls used before restore_brackets
+        return output.replace("-LRB-","(").replace("-lrb-","(") .replace("-RRB-",")") .replace("-rrb-",")") .replace("-LCB-","{") .replace("-lcb-","{") .replace("-RCB-","}") .replace("-rcb-","}") .replace("-LSB-","[") .replace("-lsb-","[") .replace("-RSB-","]") .replace("-rsb-","]")
+
+    def milliseconds_per_mb(function, data, repeats=3):
+        start = time.time()
+        for repeat in range(repeats):
+            function(data)
+        return (time.time() - start) / repeats * 1000 / (len(data.encode('utf-8')) / 1048576.0)
+
+    random.seed(0)
+    records = []
+    size = 0
+    while size < megabytes * 1048576:
+        for token in range(1, 25):
+            if random.random() < 0.02:
+                record = str(token) + '\t-LRB-\t-lrb-\t-LRB-\tO\t' + str(token - 1) + '\tpunct'
+            else:
+                record = str(token) + '\tnewspaper\tnewspaper\tNN\tO\t' + str(token - 1) + '\tnsubj'
+            records.append(record)
+            size += len(record) + 1
+        records.append('')
+    output = '\n'.join(records)
+    words = ['newspaper', 'article', 'caf\u00e9', '\u201cquoted\u201d', 'na\u00efve', 'Stra\u00dfe', 'report']
+    text = ' '.join(random.choice(words) for n in range(megabytes * 1048576 // 9))
+    print("Bracket restoring, " + str(megabytes) + " MB CoNLL table:")
+    print("    chained str.replace: " + str(round(milliseconds_per_mb(restore_brackets_chained, output), 2)) + " ms/MB")
+    print("    restore_brackets:    " + str(round(milliseconds_per_mb(corenlp.restore_brackets, output), 2)) + " ms/MB")
+    print("Text normalization, " + str(megabytes) + " MB text with non-ASCII characters:")
+    for unicode_policy in ['ascii', 'transliterate', 'unicode']:
+        print("    " + (unicode_policy + ':').ljust(18) + str(round(milliseconds_per_mb(lambda text: corenlp.normalize_text(text, unicode_policy), text), 2)) + " ms/MB")
+
+BENCHMARK_WORDS = ['the', 'newspaper', 'reported', 'that', 'council', 'members', 'voted', 'on', 'a', 'new', 'budget', 'for', 'schools',
+                   'and', 'roads', 'in', 'city', 'after', 'long', 'debate', '(', ')', 'Mr.', 'Smith', 'said', 'it', 'was', 'fair']
+
+def fake_conll_table(text):
+    # a CoNLL table shaped like the server's (7 columns, sentences separated by blank lines) for a text: a token per word, a sentence every
+    #   word ending with a period and at every blank line
+    records = []
+    for paragraph in corenlp.PARAGRAPH_BREAK.split(text):
+        token = 0
+        for word in paragraph.split():
+            token += 1
+            word = corenlp.BRACKETS.get(word, word.replace('(', '-LRB-').replace(')', '-RRB-'))
+            records.append(str(token) + '\t' + word + '\t' + word.lower() + '\tNN\tO\t' + str(token - 1) + '\tdep')
+            if word.endswith('.') and word != 'Mr.':
+                records.append('')
+                token = 0
+        if token > 0:
+            records.append('')
+    return '\n'.join(records) + '\n'
+
+def fake_json_document(text):
+    # the document of fake_conll_table as the server's json output (the same tokens, with their character offsets)
+    sentences = []
+    tokens = []
+    start = 0
+    for match in list(corenlp.PARAGRAPH_BREAK.finditer(text)) + [None]:
+        end = match.start() if match is not None else len(text)
+        for word in re.finditer(r'\S+', text[start:end]):
+            value = corenlp.BRACKETS.get(word.group(0), word.group(0).replace('(', '-LRB-').replace(')', '-RRB-'))
+            tokens.append({'index': len(tokens) + 1, 'word': value, 'originalText': word.group(0), 'lemma': value.lower(), 'pos': 'NN', 'ner': 'O',
+                           'characterOffsetBegin': start + word.start(), 'characterOffsetEnd': start + word.end()})
+            if value.endswith('.') and value != 'Mr.':
+                sentences.append(tokens)
+                tokens = []
+        if len(tokens) > 0:
+            sentences.append(tokens)
+            tokens = []
+        if match is not None:
+            start = match.end()
+    return json.dumps({'sentences': [{'index': n, 'tokens': tokens,
+                                      'basicDependencies': [{'dep': 'dep', 'governor': token['index'] - 1, 'dependent': token['index']} for token in tokens]}
+                                     for n, tokens in enumerate(sentences)]}, separators=(',', ':'))
+
+def start_fake_server(latency_ms=5.0, ms_per_kb=1.0):
+    # a local HTTP server answering like StanfordCoreNLPServer: GET /ready, and POST / with a text, answered after latency_ms
+    #   plus ms_per_kb per KB of text with a synthetic CoNLL table (see fake_conll_table), or its json document with outputFormat json
+    #   (see fake_json_document); returns the server and its URL (the server counts the most requests it had in flight in max_in_flight)
+    import http.server
+    import socketserver
+    import urllib.parse
+
+    class FakeCoreNLPHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1' # keep-alive, like the real server
+
+        def reply(self, body):
+            with self.server.lock:
+                self.server.bytes_sent += len(body)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.reply(b'ready')
+
+        def do_POST(self):
+            text = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+            with self.server.lock:
+                self.server.in_flight += 1
+                self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            time.sleep((latency_ms + ms_per_kb * len(text) / 1024.0) / 1000.0)
+            with self.server.lock:
+                self.server.in_flight -= 1
+            properties = json.loads(urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).get('properties', ['{}'])[0])
+            if properties.get('outputFormat') == 'json':
+                self.reply(fake_json_document(text).encode('utf-8'))
+            else:
+                self.reply(fake_conll_table(text).encode('utf-8'))
+
+        def log_message(self, format, *args):
+            pass
+
+    class FakeCoreNLPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+
+    server = FakeCoreNLPServer(('localhost', 0), FakeCoreNLPHandler)
+    server.bytes_sent = 0 # the bytes of the answers, to compare the output formats
+    server.in_flight = 0 # the requests being answered, and their most at any time
+    server.max_in_flight = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, 'http://localhost:' + str(server.server_address[1])
+
+def synthetic_corpus(input_path, documents=200, mean_kb=20.0, sigma=1.0, seed=0):
+    # documents *.txt files of sizes drawn from a log-normal distribution with a mean of mean_kb KB (sigma: the spread of the sizes);
+    #   returns the total size in bytes
+    import numpy as np
+    random.seed(seed)
+    mu = np.log(mean_kb * 1024) - sigma ** 2 / 2
+    total = 0
+    for n in range(documents):
+        size = max(64, int(random.lognormvariate(mu, sigma)))
+        words = []
+        length = 0
+        while length < size:
+            word = random.choice(BENCHMARK_WORDS) + ('.' if random.random() < 0.06 else '')
+            words.append(word)
+            length += len(word) + 1
+        text = ' '.join(words)
+        with io.open(os.path.join(input_path, 'doc_' + str(n).zfill(5) + '_01-01-2000.txt'), 'w', encoding='utf-8') as f:
+            f.write(text)
+        total += len(text)
+    return total
+
+def benchmark(documents=200, mean_kb=20.0, latency_ms=5.0, ms_per_kb=1.0, parallel_requests=4, merge_format='conll', chunk_size=0, write_conll_files=1, sigma=1.0, batch_bytes=0, output_format='conll'):
+    # end-to-end benchmark of RunCoreNLP (reading, dispatch, post-processing, writing, merging) against a local fake server
+    #   (see start_fake_server) on a synthetic corpus (see synthetic_corpus), without Java, CoreNLP or network;
+    #   reports docs/sec, MB/sec, peak RSS, merge time and the bytes received from the server. Everything is written to a temporary directory which is removed at the end
+    #   python benchmark_corenlp.py [documents] [mean KB] [latency ms] [parallel requests] [batch bytes] [output format]
+    server, server_url = start_fake_server(latency_ms, ms_per_kb)
+    work_path = tempfile.mkdtemp(prefix='corenlp_benchmark_')
+    input_path = os.path.join(work_path, 'input')
+    output_path = os.path.join(work_path, 'output')
+    os.mkdir(input_path)
+    os.mkdir(output_path)
+    try:
+        total_bytes = synthetic_corpus(input_path, documents, mean_kb, sigma)
+        print("Benchmark: " + str(documents) + " documents, " + str(round(total_bytes / 1048576.0, 2)) + " MB, fake server latency " +
+              str(latency_ms) + " ms + " + str(ms_per_kb) + " ms/KB, " + str(parallel_requests) + " parallel requests, merge format " + merge_format + (", batches of " + str(batch_bytes) + " bytes" if batch_bytes > 0 else "") + ", output format " + output_format)
+        start = time.time()
+        with io.open(os.devnull, 'w') as devnull:
+            stdout = sys.stdout
+            sys.stdout = devnull
+            try:
+                corenlp.RunCoreNLP('', input_path, output_path, 1, 1, parallel_requests=parallel_requests, server_url=server_url, use_cache=0,
+                           write_conll_files=write_conll_files, merge_format=merge_format, chunk_size=chunk_size, batch_bytes=batch_bytes, output_format=output_format)
+            finally:
+                sys.stdout = stdout
+        seconds = time.time() - start
+        with io.open(os.path.join(output_path, 'corenlp_metrics.jsonl'), 'r', encoding='utf-8') as f:
+            summary = json.loads(f.readlines()[-1])
+        peak = corenlp.peak_rss_mb()
+        print("    " + str(summary['documents']) + " documents in " + str(round(seconds, 2)) + " s (including the server warm-up)")
+        print("    " + str(round(summary['documents'] / seconds, 2)) + " docs/sec, " + str(round(total_bytes / 1048576.0 / seconds, 3)) + " MB/sec, " +
+              str(int(summary['tokens'] / seconds)) + " tokens/sec")
+        print("    merge time: " + str(summary['merge']['total'] if 'merge' in summary else 0) + " s, peak RSS: " + (str(round(peak, 1)) + " MB" if peak is not None else "n/a"))
+        print("    server answers: " + str(round(server.bytes_sent / 1048576.0, 2)) + " MB")
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(work_path, ignore_errors=True)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) > 0 and argv[0] == '--normalization':
+        benchmark_normalization(int(argv[1]) if len(argv) > 1 else 8)
+        return 0
+    benchmark(**dict(zip(['documents', 'mean_kb', 'latency_ms', 'parallel_requests', 'batch_bytes', 'output_format'],
+                         [arg if arg in corenlp.OUTPUT_FORMATS else float(arg) if '.' in arg else int(arg) for arg in argv])))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
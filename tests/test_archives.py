@@ -0,0 +1,72 @@
+# documents read from zip and tar archives (the fake server of benchmark_corenlp): an archive replaced between two runs
+#   in the same process is read anew
+import os
+import io
+import sys
+import shutil
+import tarfile
+import zipfile
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+class ArchiveTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.server_url = benchmark_corenlp.start_fake_server(0, 0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.work_path = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.work_path, 'input')
+        self.output_path = os.path.join(self.work_path, 'output')
+        os.mkdir(self.input_path)
+        os.mkdir(self.output_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def write_zip(self, documents):
+        with zipfile.ZipFile(os.path.join(self.input_path, 'corpus.zip'), 'w') as z:
+            for name, text in documents:
+                z.writestr(name, text)
+
+    def write_tar(self, documents):
+        with tarfile.open(os.path.join(self.input_path, 'corpus.tar'), 'w') as t:
+            for name, text in documents:
+                data = text.encode('utf-8')
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                t.addfile(info, io.BytesIO(data))
+
+    def run_corenlp(self):
+        # the words of the merged table, per document
+        with contextlib.redirect_stdout(io.StringIO()):
+            corenlp.RunCoreNLP('', self.input_path, self.output_path, 1, 1, server_url=self.server_url, use_cache=0)
+        words = {}
+        with io.open(os.path.join(self.output_path, 'mergedConllTables.conll'), encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                words.setdefault(fields[-1], []).append(fields[1])
+        self.assertEqual(corenlp.open_archives, {})
+        return words
+
+    def test_replaced_archives(self):
+        for write in (self.write_zip, self.write_tar):
+            write([('a.txt', 'First words here.'), ('c.txt', 'Third text.')])
+            self.assertEqual(sorted(self.run_corenlp().values()), [['First', 'words', 'here.'], ['Third', 'text.']])
+            write([('b.txt', 'Completely different, and longer, second text.'), ('c.txt', 'Replaced.')])
+            self.assertEqual(sorted(self.run_corenlp().values()), [['Completely', 'different,', 'and', 'longer,', 'second', 'text.'], ['Replaced.']])
+            os.remove(os.path.join(self.input_path, os.listdir(self.input_path)[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+# split_batch_table: the CoNLL table of a batch of documents (see annotate_batch) cut back into one table per document
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+class SplitBatchTableTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        texts = ['First document. Two sentences.', 'Second one (with brackets).\n\nAnd a paragraph.', 'Third.']
+        batch = ('\n\n' + corenlp.BATCH_MARKER + '\n\n').join(texts)
+        tables = corenlp.split_batch_table(benchmark_corenlp.fake_conll_table(batch), len(texts))
+        self.assertEqual(tables, [benchmark_corenlp.fake_conll_table(text) for text in texts])
+
+    def test_wrong_count(self):
+        batch = ('\n\n' + corenlp.BATCH_MARKER + '\n\n').join(['One.', 'Two.'])
+        self.assertIsNone(corenlp.split_batch_table(benchmark_corenlp.fake_conll_table(batch), 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+# restore_brackets: the brackets escaped by the server (-LRB- ...) restored in the word and lemma columns only
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+
+class RestoreBracketsTest(unittest.TestCase):
+
+    def test_word_and_lemma_only(self):
+        output = ('1\t-LRB-\t-lrb-\t-LRB-\tO\t2\tpunct\n'
+                  '2\tword\tword\tNN\tO\t0\tROOT\n'
+                  '3\t-RSB-\t-rsb-\t-RRB-\tO\t2\tpunct\n'
+                  '4\t-LCB-x\t-lcb-x\tNN\tO\t2\tdep\n')
+        self.assertEqual(corenlp.restore_brackets(output),
+                         '1\t(\t(\t-LRB-\tO\t2\tpunct\n'
+                         '2\tword\tword\tNN\tO\t0\tROOT\n'
+                         '3\t]\t]\t-RRB-\tO\t2\tpunct\n'
+                         '4\t-LCB-x\t-lcb-x\tNN\tO\t2\tdep\n')
+
+    def test_last_field(self):
+        self.assertEqual(corenlp.restore_brackets('1\t-RCB-'), '1\t}')
+
+if __name__ == '__main__':
+    unittest.main()
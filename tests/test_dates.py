@@ -0,0 +1,35 @@
+# the dates in the names of the documents (FilenameDateParser)
+import os
+import sys
+import datetime
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+
+class FilenameDateParserTest(unittest.TestCase):
+
+    def dates(self, date_format, fields):
+        parser = corenlp.FilenameDateParser('_', 3, date_format)
+        names = ['a_b_' + field + '.txt' for field in fields]
+        parser.parse_all(names)
+        return [parser.date(name) for name in names]
+
+    def test_iso_keeps_the_date_as_written(self):
+        # the UTC offset of a timestamp does not move its date to another day
+        fields = ['2019-05-01', '2019-05-01T00:00:00+02:00', '2019-05-01T23:30:00-05:00', '2019-05-01T00:00:00Z', '20190501T000000+0200', '2019-05-01T10:00']
+        self.assertEqual(self.dates('iso', fields), [datetime.date(2019, 5, 1)] * len(fields))
+
+    def test_formats(self):
+        self.assertEqual(self.dates('mm-dd-yyyy', ['05-01-2019', '5.1.2019']), [datetime.date(2019, 5, 1)] * 2)
+        self.assertEqual(self.dates('dd-month-yyyy', ['01-May-2019', '1 may 2019']), [datetime.date(2019, 5, 1)] * 2)
+        self.assertEqual(self.dates('yyyy-mm', ['2019-05']), [datetime.date(2019, 5, 1)])
+
+    def test_failures(self):
+        parser = corenlp.FilenameDateParser('_', 3, 'iso')
+        self.assertEqual(parser.parse_all(['a_b_notadate.txt', 'a_b.txt', 'a_b_2019-05-01.txt']), 2)
+        self.assertIsNone(parser.date('a_b.txt'))
+        self.assertEqual(len(parser.failures), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# dispatch_documents over several servers (the fake server of benchmark_corenlp): a server that dies and cannot be restarted
+#   hands its documents to the servers still alive
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+class DispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_path = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.work_path, 'input')
+        self.output_path = os.path.join(self.work_path, 'output')
+        os.mkdir(self.input_path)
+        os.mkdir(self.output_path)
+        benchmark_corenlp.synthetic_corpus(self.input_path, 20, 1.0)
+        self.documents = [os.path.join(self.input_path, document) for document in sorted(os.listdir(self.input_path))]
+        self.fake_servers = [benchmark_corenlp.start_fake_server(5, 0) for k in range(2)]
+
+    def tearDown(self):
+        for server, url in self.fake_servers:
+            server.server_close()
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def dispatch(self, batch_bytes=0, parallel_requests=2, chunk_size=0):
+        servers = [corenlp.CoreNLPServer.at_url(url) for server, url in self.fake_servers]
+        queues = corenlp.schedule_documents(self.documents, len(servers))
+        properties = corenlp.corenlp_properties('parse', self.output_path)
+        session = corenlp.get_http_session(parallel_requests, len(servers))
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = list(corenlp.dispatch_documents(servers, queues, self.documents, session, self.output_path, properties, parallel_requests,
+                                                      chunk_size=chunk_size, batch_bytes=batch_bytes))
+        session.close()
+        return results
+
+    def test_dead_server(self):
+        # the first server is down from the start: every document is annotated by the second one
+        for batch_bytes in (0, 4096):
+            self.fake_servers[0][0].shutdown()
+            self.fake_servers[0][0].server_close()
+            results = self.dispatch(batch_bytes)
+            self.assertEqual(sorted(index for index, x, output, error, metrics in results), list(range(len(self.documents))))
+            self.assertEqual([error for index, x, output, error, metrics in results if error is not None], [])
+
+    def test_requests_in_flight(self):
+        # the chunks of long documents share the parallel_requests slots of their server with the other documents
+        shutil.rmtree(self.input_path)
+        os.mkdir(self.input_path)
+        benchmark_corenlp.synthetic_corpus(self.input_path, 12, 40.0, sigma=0.1)
+        self.documents = [os.path.join(self.input_path, document) for document in sorted(os.listdir(self.input_path))]
+        for batch_bytes in (0, 1048576):
+            results = self.dispatch(batch_bytes, parallel_requests=4, chunk_size=5000)
+            self.assertEqual([error for index, x, output, error, metrics in results if error is not None], [])
+            self.assertTrue(all(metrics['chunks'] > 1 for index, x, output, error, metrics in results))
+            for server, url in self.fake_servers:
+                self.assertGreater(server.max_in_flight, 1)
+                self.assertLessEqual(server.max_in_flight, 4)
+
+    def test_all_servers_dead(self):
+        # with no server left, the documents are failed (not left waiting, nor reported as cancelled)
+        for server, url in self.fake_servers:
+            server.shutdown()
+            server.server_close()
+        results = self.dispatch()
+        self.assertEqual(len(results), len(self.documents))
+        self.assertTrue(all(error is not None and error != 'cancelled' for index, x, output, error, metrics in results))
+
+if __name__ == '__main__':
+    unittest.main()
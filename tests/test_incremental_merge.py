@@ -0,0 +1,101 @@
+# the incremental merge (RunCoreNLP with incremental_merge=1) against a full rebuild, on the fake server of benchmark_corenlp:
+#   documents appended, grown, shrunk and emptied in place, and a merged table left with a half-written tail by an interrupted run
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+MERGED_FILE = 'mergedConllTables.conll'
+
+class IncrementalMergeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.server_url = benchmark_corenlp.start_fake_server(0, 0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.work_path = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.work_path, 'input')
+        self.output_path = os.path.join(self.work_path, 'output')
+        os.mkdir(self.input_path)
+        benchmark_corenlp.synthetic_corpus(self.input_path, 12, 2.0)
+        self.documents = sorted(os.listdir(self.input_path))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def run_merge(self, output_path, incremental_merge=1, get_date_flag=0):
+        # the merged table written by a run over the input (what the run printed is kept in self.log)
+        os.makedirs(output_path, exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            corenlp.RunCoreNLP('', self.input_path, output_path, 1, 1, get_date_flag, '_', 3, 'mm-dd-yyyy',
+                               server_url=self.server_url, use_cache=0, incremental_merge=incremental_merge)
+        self.log = log.getvalue()
+        with open(os.path.join(output_path, MERGED_FILE), 'rb') as f:
+            return f.read()
+
+    def full_rebuild(self, get_date_flag=0):
+        return self.run_merge(tempfile.mkdtemp(dir=self.work_path), 0, get_date_flag)
+
+    def write_document(self, k, text):
+        with io.open(os.path.join(self.input_path, self.documents[k]), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_unchanged_and_appended(self):
+        self.assertEqual(self.run_merge(self.output_path), self.full_rebuild())
+        self.assertEqual(self.run_merge(self.output_path), self.full_rebuild())
+        for k in range(2):
+            shutil.copy(os.path.join(self.input_path, self.documents[k]), os.path.join(self.input_path, 'zz_' + self.documents[k]))
+        self.assertEqual(self.run_merge(self.output_path), self.full_rebuild())
+
+    def test_splice_grown_and_shrunk(self):
+        for get_date_flag in (0, 1):
+            shutil.rmtree(self.output_path, ignore_errors=True)
+            benchmark_corenlp.synthetic_corpus(self.input_path, 12, 2.0)
+            self.run_merge(self.output_path, get_date_flag=get_date_flag)
+            with io.open(os.path.join(self.input_path, self.documents[7]), encoding='utf-8') as f:
+                grown = f.read() * 3
+            self.write_document(3, 'Short text. Two sentences.')
+            self.write_document(7, grown)
+            merged = self.run_merge(self.output_path, get_date_flag=get_date_flag)
+            self.assertIn('0 CoNLL tables appended, 2 replaced', self.log)
+            self.assertEqual(merged, self.full_rebuild(get_date_flag))
+
+    def test_splice_emptied(self):
+        # an emptied document keeps its DocNum in the incremental table (a full rebuild does not count it): the tables are the same
+        #   but for DocNum, and the same again once the document has text
+        self.run_merge(self.output_path)
+        self.write_document(2, ' ')
+        incremental = self.run_merge(self.output_path).decode('utf-8').split('\n')
+        self.assertIn('1 replaced', self.log)
+        full = self.full_rebuild().decode('utf-8').split('\n')
+        self.assertEqual(len(incremental), len(full))
+        for line, expected in zip(incremental, full):
+            fields, expected_fields = line.split('\t'), expected.split('\t')
+            self.assertEqual(fields[:-3] + fields[-2:], expected_fields[:-3] + expected_fields[-2:])
+        self.write_document(2, 'Back again. Yes.')
+        self.assertEqual(self.run_merge(self.output_path), self.full_rebuild())
+
+    def test_truncate_half_written_tail(self):
+        self.run_merge(self.output_path)
+        self.write_document(5, 'Changed text. Another sentence. And a third.')
+        with open(os.path.join(self.output_path, MERGED_FILE), 'ab') as f:
+            f.write(b'1\tjunk\tjunk\t')
+        merged = self.run_merge(self.output_path)
+        self.assertNotIn('rebuilt', self.log)
+        self.assertEqual(merged, self.full_rebuild())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# the merged CoNLL table (MergedConllWriter): records numbered over the tables, and a table that cannot be merged leaves nothing behind
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+
+TABLE = '1\tThe\tthe\tDT\tO\t2\tdet\n2\tcouncil\tcouncil\tNN\tO\t3\tnsubj\n3\tvoted\tvote\tVBD\tO\t0\tROOT\n\n1\tYes\tyes\tUH\tO\t0\tROOT\n\n'
+
+class MergedConllWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def merge(self, tables, chunksize=2):
+        # the merged table of the tables (name, table) and the names of the tables that could not be merged
+        writer = corenlp.MergedConllWriter(os.path.join(self.work_path, 'merged.conll'), chunksize=chunksize)
+        failed = []
+        for x, table in tables:
+            try:
+                writer.append(x, table)
+            except Exception:
+                failed.append(x)
+        writer.close()
+        with io.open(writer.merged_file, encoding='utf-8', newline='') as f:
+            return f.read(), failed
+
+    def test_numbering(self):
+        merged, failed = self.merge([('a.txt', TABLE), ('empty.txt', '\n'), ('b.txt', TABLE)])
+        lines = merged.split('\n')[:-1]
+        self.assertEqual(failed, [])
+        self.assertEqual(len(lines), 8)
+        self.assertEqual([line.split('\t')[7:] for line in lines[3:5]], [['4', '1', '2', 'a.txt'], ['5', '2', '1', 'b.txt']])
+
+    def test_bad_table_truncated(self):
+        # the first chunk of the bad table (chunksize 2) is written before its second chunk fails the column check
+        bad = TABLE.replace('3\tvoted\tvote\tVBD', '3\tvoted\tvote')
+        merged, failed = self.merge([('a.txt', TABLE), ('bad.txt', bad), ('b.txt', TABLE)])
+        self.assertEqual(failed, ['bad.txt'])
+        self.assertEqual(merged, self.merge([('a.txt', TABLE), ('b.txt', TABLE)])[0])
+
+if __name__ == '__main__':
+    unittest.main()
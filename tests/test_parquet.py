@@ -0,0 +1,65 @@
+# the merged table as a Parquet file (merge_format 'parquet', the fake server of benchmark_corenlp): the same records as the merged
+#   CoNLL table, with typed columns and one date per document
+import os
+import io
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+@unittest.skipIf(pyarrow is None, 'requires pyarrow')
+class MergedParquetTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.server_url = benchmark_corenlp.start_fake_server(0, 0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.work_path = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.work_path, 'input')
+        os.mkdir(self.input_path)
+        benchmark_corenlp.synthetic_corpus(self.input_path, 4, 1.0)
+        with io.open(os.path.join(self.input_path, 'doc_x_nodate.txt'), 'w', encoding='utf-8') as f:
+            f.write('No date in this name. None at all.')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def run_corenlp(self, merge_format):
+        output_path = os.path.join(self.work_path, merge_format)
+        os.mkdir(output_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            corenlp.RunCoreNLP('', self.input_path, output_path, 1, 1, 1, '_', 3, 'mm-dd-yyyy', server_url=self.server_url, use_cache=0, merge_format=merge_format)
+        return os.path.join(output_path, 'mergedConllTables.' + merge_format)
+
+    def test_same_records_as_conll(self):
+        table = pyarrow.parquet.read_table(self.run_corenlp('parquet'))
+        with io.open(self.run_corenlp('conll'), encoding='utf-8') as f:
+            records = [line.rstrip('\n').split('\t') for line in f]
+        self.assertEqual(table.num_rows, len(records))
+        self.assertEqual(table.column('word').to_pylist(), [record[1] for record in records])
+        self.assertEqual(table.column('RecordNum').to_pylist(), [int(record[7]) for record in records])
+        self.assertEqual(table.column('DocNum').to_pylist(), [int(record[8]) for record in records])
+        self.assertEqual(table.schema.field('date').type, pyarrow.date32())
+        self.assertEqual(table.column('date').to_pylist(),
+                         [datetime.datetime.strptime(record[-1], '%Y-%m-%d').date() if record[-1] else None for record in records])
+        self.assertIn(None, table.column('date').to_pylist())
+
+if __name__ == '__main__':
+    unittest.main()
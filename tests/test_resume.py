@@ -0,0 +1,59 @@
+# resumed runs (RunCoreNLP with resume=1, the fake server of benchmark_corenlp): the tables of an earlier run are only taken back
+#   when they were made with the same settings
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+class ResumeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.server_url = benchmark_corenlp.start_fake_server(0, 0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.work_path = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.work_path, 'input')
+        self.output_path = os.path.join(self.work_path, 'output')
+        os.mkdir(self.input_path)
+        os.mkdir(self.output_path)
+        benchmark_corenlp.synthetic_corpus(self.input_path, 4, 1.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def run_corenlp(self, **options):
+        # what the run printed, and the number of columns of the records of the merged table
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            corenlp.RunCoreNLP('', self.input_path, self.output_path, 1, 1, server_url=self.server_url, use_cache=0, resume=1, **options)
+        with io.open(os.path.join(self.output_path, 'mergedConllTables.conll'), encoding='utf-8') as f:
+            columns = set(line.count('\t') + 1 for line in f if line.strip())
+        return log.getvalue(), columns
+
+    def test_same_settings(self):
+        log, columns = self.run_corenlp(output_format='json', extra_columns='offsets,ner-spans')
+        log, resumed_columns = self.run_corenlp(output_format='json', extra_columns='offsets,ner-spans')
+        self.assertIn('Resuming: 4 input documents', log)
+        self.assertEqual(resumed_columns, columns)
+
+    def test_other_settings(self):
+        log, columns = self.run_corenlp(output_format='json', extra_columns='offsets,ner-spans')
+        log, other_columns = self.run_corenlp(annotators='pos-lemma')
+        self.assertIn('Resuming: 0 input documents', log)
+        self.assertEqual(len(other_columns), 1)
+        self.assertLess(max(other_columns), max(columns))
+
+if __name__ == '__main__':
+    unittest.main()
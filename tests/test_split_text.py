@@ -0,0 +1,92 @@
+# split_text: long documents cut into chunks at paragraph breaks or at the sentence ends found by the server
+#   (the fake server of benchmark_corenlp)
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+import benchmark_corenlp
+
+class SplitTextTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.server_url = benchmark_corenlp.start_fake_server(0, 0)
+        cls.session = requests.Session()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def split(self, text, chunk_size):
+        # the chunks of text, cut at the sentence ends given by the server; the chunks put back together must be the text,
+        #   and no piece sent to the server is longer than a chunk and its margin
+        pieces = []
+
+        def sentence_ends(piece):
+            pieces.append(piece)
+            return corenlp.sentence_ends(self.session, self.server_url, piece)
+
+        chunks = corenlp.split_text(text, chunk_size, sentence_ends)
+        self.assertEqual(''.join(chunks), text)
+        self.assertTrue(all(len(chunk) <= chunk_size for chunk in chunks))
+        self.assertTrue(all(len(piece) <= chunk_size + corenlp.SENTENCE_MARGIN for piece in pieces))
+        self.pieces = pieces
+        return chunks
+
+    def test_no_cut(self):
+        text = 'A short text. Two sentences.'
+        self.assertEqual(corenlp.split_text(text, 0), [text])
+        self.assertEqual(corenlp.split_text(text, len(text)), [text])
+
+    def test_paragraph_breaks(self):
+        text = 'First paragraph. It ends here.\n\nSecond paragraph.\n  \nThird one, a bit longer than the others.'
+        chunks = corenlp.split_text(text, 50)
+        self.assertEqual(chunks, ['First paragraph. It ends here.\n\n', 'Second paragraph.\n  \n', 'Third one, a bit longer than the others.'])
+
+    def test_sentence_ends(self):
+        # no cut after the abbreviation Mr., which the server does not take for a sentence end
+        text = 'The council voted. Mr. Smith said it was fair. Roads passed. Schools too.'
+        self.assertEqual(self.split(text, 30), ['The council voted.', ' Mr. Smith said it was fair.', ' Roads passed. Schools too.'])
+
+    def test_windows(self):
+        # a long text without blank lines: the server is asked for the sentence ends of each window, never of the whole text;
+        #   the sentence running past a window is not taken for a sentence end
+        text = 'The council voted on a new budget. ' * 2000
+        chunks = self.split(text, 5000)
+        self.assertEqual(len(self.pieces), len(chunks) - 1)
+        self.assertTrue(all(chunk.endswith('budget.') for chunk in chunks[:-1]))
+        self.assertTrue(all(chunk.startswith(' The council') for chunk in chunks[1:]))
+
+    def test_paragraph_break_no_request(self):
+        text = ('A short paragraph. ' * 10 + '\n\n') * 10
+        self.split(text, 500)
+        self.assertEqual(self.pieces, [])
+
+    def test_runaway_sentence(self):
+        # a sentence longer than chunk_size is cut at a space
+        text = 'the newspaper reported that council members voted on a new budget for schools and roads in the city.'
+        chunks = self.split(text, 30)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.endswith(' ') for chunk in chunks[:-1]))
+
+    def test_corpus_round_trip(self):
+        input_path = tempfile.mkdtemp()
+        try:
+            benchmark_corenlp.synthetic_corpus(input_path, 5, 4.0)
+            for document in sorted(os.listdir(input_path)):
+                with io.open(os.path.join(input_path, document), encoding='utf-8') as f:
+                    self.split(f.read(), 500)
+        finally:
+            shutil.rmtree(input_path, ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
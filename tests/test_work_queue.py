@@ -0,0 +1,111 @@
+# the shared queue of documents (WorkQueue): leases that expire, documents completed twice, and workers racing to reclaim a lease
+import os
+import io
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import StanfordCoreNLP_GUI as corenlp
+
+class WorkQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.queue_dir = tempfile.mkdtemp()
+        self.first = corenlp.WorkQueue(self.queue_dir, 'first', lease_seconds=60)
+        self.second = corenlp.WorkQueue(self.queue_dir, 'second', lease_seconds=60)
+        self.assertTrue(self.first.create([('doc_%d.txt' % k, 100) for k in range(4)], {'lease_seconds': 60}))
+        self.assertFalse(self.second.create([('doc_0.txt', 100)], {}))
+
+    def tearDown(self):
+        shutil.rmtree(self.queue_dir, ignore_errors=True)
+
+    def expire(self, task):
+        # the lease of task as if it had not been renewed for twice lease_seconds
+        past = os.stat(task['lease']).st_mtime - 2 * self.first.lease_seconds
+        os.utime(task['lease'], (past, past))
+
+    def test_claim(self):
+        tasks = self.first.claim(3)
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual(len(self.second.claim(3)), 1)
+        self.assertEqual(self.first.claim(1), [])
+        self.assertEqual(self.first.status(), {'tasks': 0, 'leases': 4, 'done': 0, 'failed': 0})
+
+    def test_lease_expiry(self):
+        task = self.first.claim(1)[0]
+        self.assertEqual(self.second.reclaim(), 0) # not expired
+        self.assertEqual(self.first.reclaim(), 0) # a process never reclaims its own leases
+        self.expire(task)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self.second.reclaim(), 1)
+            self.first.renew() # the heartbeat finds the lease gone and drops it
+        self.assertEqual(self.first.held, {})
+        self.assertEqual(self.first.status(), {'tasks': 4, 'leases': 0, 'done': 0, 'failed': 0})
+        retried = corenlp.read_json_file(self.first.path('tasks', task['id']))
+        self.assertEqual(retried['attempts'], 1)
+        self.assertIn('expired', retried['error'])
+
+    def test_lease_expiry_max_attempts(self):
+        # a document whose lease expires max_attempts times is failed
+        for attempt in range(2):
+            tasks = self.first.claim(4)
+            self.assertEqual(len(tasks), 4)
+            for task in tasks:
+                self.expire(task)
+            self.first.held.clear() # the worker died
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(self.second.reclaim(max_attempts=2), 4)
+        self.assertEqual(self.first.status(), {'tasks': 0, 'leases': 0, 'done': 0, 'failed': 4})
+        self.assertEqual(self.second.counts['failed'], 4)
+        self.assertTrue(self.first.drained())
+
+    def test_complete_twice(self):
+        task = self.first.claim(1)[0]
+        self.assertTrue(self.first.complete(task, '1\tword\tword\tNN\tO\t0\tROOT\n\n'))
+        self.assertFalse(self.first.complete(task, '1\tword\tword\tNN\tO\t0\tROOT\n\n'))
+        self.assertEqual(self.first.counts['done'], 1)
+        self.assertEqual(len(self.first.records('done')), 1)
+
+    def test_complete_after_reclaim(self):
+        # the slow worker's lease was reclaimed and the document annotated by another worker: it is done once only
+        task = self.first.claim(1)[0]
+        self.expire(task)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self.second.reclaim(), 1)
+        retry = [t for t in self.second.claim(4) if t['id'] == task['id']][0]
+        self.assertTrue(self.second.complete(retry, 'second\n'))
+        self.assertFalse(self.first.complete(task, 'first\n'))
+        self.assertFalse(self.first.fail(task, 'too late'))
+        records = self.first.records('done')
+        self.assertEqual([(record['id'], record['worker']) for record in records], [(task['id'], 'second')])
+        self.assertEqual(self.first.counts['done'], 0)
+
+    def test_reclaim_race(self):
+        # several processes reclaim the same expired leases at the same time: each lease goes back to the tasks once
+        tasks = self.first.claim(4)
+        for task in tasks:
+            self.expire(task)
+        queues = [corenlp.WorkQueue(self.queue_dir, 'reclaimer-%d' % k, lease_seconds=60) for k in range(4)]
+        reclaimed = [0] * len(queues)
+        start = threading.Barrier(len(queues))
+
+        def reclaim(k):
+            start.wait()
+            reclaimed[k] = queues[k].reclaim()
+
+        threads = [threading.Thread(target=reclaim, args=(k,)) for k in range(len(queues))]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sum(reclaimed), len(tasks))
+        self.assertEqual(self.first.status(), {'tasks': 4, 'leases': 0, 'done': 0, 'failed': 0})
+        self.assertTrue(all(corenlp.read_json_file(self.first.path('tasks', task['id']))['attempts'] == 1 for task in tasks))
+
+if __name__ == '__main__':
+    unittest.main()